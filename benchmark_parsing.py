@@ -0,0 +1,236 @@
+"""
+Microbenchmark of HTML parsing for link discovery + extraction.
+
+    python benchmark_parsing.py                 # pages from the HTTP cache (output_data/http_cache)
+    python benchmark_parsing.py page1.html dir/ # saved pages / directories of .html files
+
+Compares, per hub page (links + extraction):
+  twice/html.parser  each consumer parses the page itself (the old behaviour)
+  shared/html.parser one ParsedPage shared by both consumers
+  shared/lxml        the same with the lxml tree builder (default when installed)
+and reports pages whose extracted items differ between the tree builders.
+
+It then times extraction alone on already parsed pages, with the title and
+content lookup done by the old per-selector ``soup.find`` loop (kept below as
+a reference) vs the compiled SelectorPlan vs per-host templates learned on a
+first pass (the repeat-crawl case), and checks the first two pick the same
+elements. Finally it times link discovery alone, on a freshly built tree vs
+the streaming anchor scan that skips the tree, and checks both find the same
+links.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from scraper_lib import extractor
+from scraper_lib.constants import CONTENT_SELECTORS, TITLE_SELECTORS
+from scraper_lib.document import DEFAULT_PARSER, ParsedPage
+from scraper_lib.extraction_templates import TemplateCache
+from scraper_lib.extractor import extract_data_from_html_page
+from scraper_lib.parser import find_relevant_links
+from scraper_lib.selector_plan import select_title_and_content
+from webapp.scrape_context import HTTP_CACHE_DIR
+
+KEYWORDS = [{"word": w, "category_id": None} for w in (
+    "baugebiet", "bebauungsplan", "flächennutzungsplan", "grundstück", "bauplatz", "bauland",
+    "ausschreibung", "verkauf", "entwicklung", "neubaugebiet", "sanierung",
+)]
+KEYWORD_STRINGS = [k["word"] for k in KEYWORDS]
+
+
+def pages_from_cache(directory: str) -> list[tuple[str, str]]:
+    index = os.path.join(directory, "index.sqlite3")
+    if not os.path.exists(index):
+        return []
+    db = sqlite3.connect(f"file:{index}?mode=ro", uri=True)
+    pages = []
+    for key, url, encoding in db.execute("SELECT key, url, encoding FROM entries"):
+        if url.lower().endswith(".pdf"):
+            continue
+        try:
+            with open(os.path.join(directory, "bodies", key), "rb") as f:
+                body = f.read()
+        except OSError:
+            continue
+        if body[:5] == b"%PDF-":
+            continue
+        pages.append((url, body.decode(encoding or "utf-8", errors="replace")))
+    return pages
+
+
+def pages_from_paths(paths: list[str]) -> list[tuple[str, str]]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += [os.path.join(path, n) for n in sorted(os.listdir(path)) if n.endswith((".html", ".htm"))]
+        else:
+            files.append(path)
+    pages = []
+    for name in files:
+        with open(name, encoding="utf-8", errors="replace") as f:
+            pages.append((f"https://example.org/{os.path.basename(name)}", f.read()))
+    return pages
+
+
+def run_variant(pages, shared: bool, parser: str, repeat: int) -> tuple[float, list]:
+    results = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the extractor prints every date it finds
+        _run(pages, shared, parser, repeat, results)
+    return time.perf_counter() - start, results
+
+
+def _run(pages, shared: bool, parser: str, repeat: int, results: list) -> None:
+    for _ in range(repeat):
+        results.clear()
+        for url, html in pages:
+            if shared:
+                page = ParsedPage(html, url, parser)
+                links = find_relevant_links(page, url, KEYWORD_STRINGS)
+                items = extract_data_from_html_page(url, page, KEYWORDS, "Benchmark")
+            else:
+                links = find_relevant_links(ParsedPage(html, url, parser), url, KEYWORD_STRINGS)
+                items = extract_data_from_html_page(url, ParsedPage(html, url, parser), KEYWORDS, "Benchmark")
+            results.append((sorted(links[0]), sorted(links[1]), items))
+
+
+def per_selector_find(soup):
+    """The title/content lookup as it was before SelectorPlan: one soup.find per selector."""
+    title_element = None
+    for selector in TITLE_SELECTORS:
+        if '.' in selector:
+            tag, cls = selector.split('.', 1)
+            title_element = soup.find(tag or True, class_=re.compile(cls, re.I))
+        elif '[' in selector:
+            tag, attr_full = selector.split('[', 1)
+            key, val = attr_full.split(']')[0].split('=')
+            title_element = soup.find(tag or True, {key: re.compile(val.strip('"\''), re.I)})
+        else:
+            title_element = soup.find(selector)
+        if title_element:
+            break
+    content_area = None
+    for selector in CONTENT_SELECTORS:
+        if '#' in selector:
+            tag, elem_id = selector.split('#', 1)
+            content_area = soup.find(tag or True, id=elem_id)
+        elif '.' in selector:
+            tag, cls = selector.split('.', 1)
+            content_area = soup.find(tag or 'div', class_=re.compile(r'\b' + re.escape(cls) + r'\b', re.I))
+        elif '[' in selector:
+            tag, attr_full = selector.split('[', 1)
+            key, val = attr_full.split(']')[0].split('=')
+            content_area = soup.find(tag or True, {key: re.compile(val.strip('"\''), re.I)})
+        else:
+            content_area = soup.find(selector)
+        if content_area:
+            break
+    return title_element, content_area, soup.title, soup.body
+
+
+def compare_selectors(pages, repeat: int) -> None:
+    parsed = [ParsedPage(html, url) for url, html in pages]
+    for page in parsed:
+        page.soup  # parse up front, only extraction is timed
+    differing = [page.url for page in parsed
+                 if any(a is not b for a, b in zip(per_selector_find(page.soup), select_title_and_content(page.soup)))]
+
+    # Host templates as a repeat crawl finds them: learned on a first pass over the pages
+    templates = TemplateCache()
+    for page in parsed:
+        templates.select(page.soup, page.url)
+    check = TemplateCache(dict(templates.known))
+    for page in parsed:
+        check.select(page.soup, page.url)
+    template_misses = sum(check.misses.values())
+
+    print(f"\nextraction only ({DEFAULT_PARSER} trees):")
+    baseline = None
+    variants = (("per-selector find", per_selector_find, None),
+                ("selector plan", select_title_and_content, None),
+                ("host templates", select_title_and_content, templates))
+    for name, lookup, page_templates in variants:
+        extractor.select_title_and_content = lookup
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    for page in parsed:
+                        extract_data_from_html_page(page.url, page, KEYWORDS, "Benchmark", page_templates)
+                seconds = time.perf_counter() - start
+        finally:
+            extractor.select_title_and_content = select_title_and_content
+        baseline = baseline or seconds
+        print(f"{name:20s} {seconds / (len(parsed) * repeat) * 1000:8.2f} ms/page  {baseline / seconds:5.2f}x")
+    print(f"pages where the selector plan picks other elements: {len(differing)}")
+    print(f"pages the host templates miss (full cascade): {template_misses}")
+    for url in differing[:10]:
+        print(f"  {url}")
+
+
+def compare_link_scans(pages, repeat: int) -> None:
+    """Link discovery alone (an unchanged hub page): a fresh tree vs the streaming anchor scan."""
+    variants = (("tree (ParsedPage)", lambda url, html: find_relevant_links(ParsedPage(html, url), url, KEYWORD_STRINGS)),
+                ("streaming scan", lambda url, html: find_relevant_links(html, url, KEYWORD_STRINGS)))
+    print(f"\nlink discovery only ({DEFAULT_PARSER}):")
+    baseline = None
+    outputs = {}
+    for name, scan in variants:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            outputs[name] = [scan(url, html) for url, html in pages]
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{name:20s} {seconds / (len(pages) * repeat) * 1000:8.2f} ms/page  {baseline / seconds:5.2f}x")
+    differing = [url for (url, _), a, b in zip(pages, *outputs.values()) if a != b]
+    print(f"pages where the streaming scan finds other links: {len(differing)}")
+    for url in differing[:10]:
+        print(f"  {url}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("paths", nargs="*", help="HTML files or directories (default: the HTTP cache)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = pages_from_paths(args.paths) if args.paths else pages_from_cache(HTTP_CACHE_DIR)
+    if not pages:
+        sys.exit("No HTML pages found; scrape some targets first or pass saved pages.")
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB, {args.repeat} repetitions")
+
+    variants = [("twice/html.parser", False, "html.parser"), ("shared/html.parser", True, "html.parser")]
+    try:
+        import lxml  # noqa: F401
+        variants.append(("shared/lxml", True, "lxml"))
+    except ImportError:
+        print("lxml is not installed; skipping the lxml variant")
+
+    baseline = None
+    outputs = {}
+    for name, shared, tree_builder in variants:
+        seconds, outputs[name] = run_variant(pages, shared, tree_builder, args.repeat)
+        per_page = seconds / (len(pages) * args.repeat) * 1000
+        baseline = baseline or seconds
+        print(f"{name:20s} {per_page:8.2f} ms/page  {baseline / seconds:5.2f}x")
+
+    if "shared/lxml" in outputs:
+        differing = [url for (url, _), a, b in zip(pages, outputs["shared/html.parser"], outputs["shared/lxml"])
+                     if a != b]
+        print(f"pages with different results html.parser vs lxml: {len(differing)}")
+        for url in differing[:10]:
+            print(f"  {url}")
+
+    compare_selectors(pages, args.repeat)
+    compare_link_scans(pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,108 +1,187 @@
+import itertools
 import requests
-import time
 import threading
+from collections import deque
 from datetime import datetime
 
-from scraper_lib.fetcher import fetch_html, download_pdf_to_text
-from scraper_lib.parser import find_relevant_links
+from scraper_lib.fetcher import fetch_html, fetch_pdf_bytes, pdf_bytes_to_text
+from scraper_lib.fingerprint import FingerprintTracker, keyword_set_version
+from scraper_lib.rate_limiter import HostRateLimiter
+from scraper_lib.http_cache import HttpCache
+from scraper_lib.cancellation import raise_if_cancelled
+from scraper_lib.target_stats import TargetStats
+from scraper_lib.document import ParsedPage
+from scraper_lib.frontier import Frontier
+from scraper_lib.link_scoring import LinkScorer, PatternYield
+from scraper_lib.parser import collect_links
 from scraper_lib.extractor import extract_data_from_html_page, extract_data_from_pdf_text
+from scraper_lib.extraction_templates import TemplateCache
 
 class Scraper:
-    _log_buffer = []
+    # Ring buffer of (seq, message, progress); seq keeps counting across clears,
+    # so clients can poll or stream "everything after seq N".
+    _log_buffer: deque = deque(maxlen=1000)
     _log_lock = threading.Lock()
-    _max_logs = 1000
+    _log_added = threading.Condition(_log_lock)
+    _log_seq = 0
+    _log_dropped_seq = 0  # last seq pushed out by the size limit (not by clear_logs)
 
     @classmethod
-    def log(cls, message: str):
+    def log(cls, message: str, progress: tuple[int, int] | None = None):
+        """Record a log line; ``progress=(done, total)`` marks it as a run progress event."""
         timestamp = datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}"
         print(formatted_message)
         with cls._log_lock:
-            cls._log_buffer.append(formatted_message)
-            if len(cls._log_buffer) > cls._max_logs:
-                cls._log_buffer.pop(0)
+            cls._log_seq += 1
+            if len(cls._log_buffer) == cls._log_buffer.maxlen:
+                cls._log_dropped_seq = cls._log_buffer[0][0]
+            cls._log_buffer.append((cls._log_seq, formatted_message, progress))
+            cls._log_added.notify_all()
 
     @classmethod
     def get_logs(cls):
         with cls._log_lock:
-            return list(cls._log_buffer)
+            return [message for _, message, _ in cls._log_buffer]
+
+    @classmethod
+    def get_log_entries(cls, since: int = 0, timeout: float | None = None) -> tuple[list[tuple], int, bool]:
+        """
+        Entries with a sequence number above ``since``, as (seq, message, progress).
+        With ``timeout``, waits that long for new entries if there are none yet.
+        Returns (entries, last_seq, truncated); truncated means lines after
+        ``since`` were already pushed out of the buffer. A cursor ahead of the
+        counter (from before a restart) starts over from the beginning.
+        """
+        with cls._log_lock:
+            if since > cls._log_seq:
+                since = 0
+            if timeout and cls._log_seq <= since:
+                cls._log_added.wait_for(lambda: cls._log_seq > since, timeout)
+            last_seq = cls._log_seq
+            if last_seq <= since:
+                return [], last_seq, False
+            first_seq = cls._log_buffer[0][0] if cls._log_buffer else last_seq + 1
+            # seq numbers in the buffer are consecutive, so the start is an index computation
+            start = max(0, since + 1 - first_seq)
+            entries = list(itertools.islice(cls._log_buffer, start, None))
+            return entries, last_seq, since < cls._log_dropped_seq
 
     @classmethod
     def clear_logs(cls):
         with cls._log_lock:
             cls._log_buffer.clear()
 
-    def __init__(self, keywords: list[dict], max_html_links: int = 15, max_pdf_links: int = 10, delay: float = 0.5):
+    def __init__(self, keywords: list[dict], max_html_links: int = 15, max_pdf_links: int = 10, delay: float = 0.5,
+                 rate_limiter: HostRateLimiter | None = None, http_cache: HttpCache | None = None,
+                 fingerprints: FingerprintTracker | None = None, session: requests.Session | None = None,
+                 cancel_event: threading.Event | None = None, stats: TargetStats | None = None,
+                 max_pdf_bytes: int | None = None, max_pdf_pages: int | None = None,
+                 hub_depth: int = 2, max_per_external_host: int | None = None,
+                 link_yields: PatternYield | None = None, templates: TemplateCache | None = None):
         if not keywords:
             raise ValueError("Scraper must be initialized with a list of keywords.")
         self.keywords = keywords
         self.max_html_links = max_html_links
         self.max_pdf_links = max_pdf_links
+        # Larger PDFs are not downloaded; only the first max_pdf_pages pages are read
+        self.max_pdf_bytes = max_pdf_bytes
+        self.max_pdf_pages = max_pdf_pages
+        # Hub pages are expanded this many levels deep; other hosts get a small fetch budget each
+        self.hub_depth = hub_depth
+        self.max_per_external_host = max_per_external_host
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Shared per-host limiter; `delay` is only the starting delay for unseen hosts
+        self.rate_limiter = rate_limiter or HostRateLimiter(start_delay=delay)
+        self.http_cache = http_cache
+        # Pages whose body and keyword set are unchanged since the last run skip extraction
+        self.fingerprints = fingerprints or FingerprintTracker(None, keyword_set_version(keywords))
+        # Share of pages with results per URL pattern; ranks the links of the frontier
+        self.link_yields = link_yields or PatternYield()
+        # Title/content selectors learned per host, tried before the full selector cascade
+        self.templates = templates or TemplateCache()
+        # A session passed in by the caller is reused across targets (keep-alive, no new TLS handshakes)
+        self.session = session or requests.Session()
+        if session is None:
+            self.session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            })
+        # Set by the run when it is stopped; checked before every fetch (raises ScrapeCancelled)
+        self.cancel_event = cancel_event
+        # Request counts, bytes and extraction timings of this target
+        self.stats = stats or TargetStats()
 
     def scrape_site(self, site_name: str, site_url: str) -> list[dict]:
         self.log(f"--- Processing {site_name} ({site_url}) ---")
         all_data = []
-        processed_urls = set()
 
-        main_page_html = fetch_html(self.session, site_url)
+        raise_if_cancelled(self.cancel_event)
+        main_page_html = fetch_html(self.session, site_url, self.rate_limiter, self.http_cache, self.stats,
+                                    self.cancel_event)
+        self.stats.main_page_fetched = bool(main_page_html)
         if not main_page_html:
             self.log(f"  [ERROR] Could not fetch main page: {site_url}")
             return []
 
         keyword_strings = [k['word'].lower() for k in self.keywords]
-        html_links, pdf_links = find_relevant_links(main_page_html, site_url, keyword_strings)
-        self.log(f"Found {len(html_links)} relevant HTML links and {len(pdf_links)} PDF links.")
-
-        i = 0
-        while i < len(html_links) and i < self.max_html_links:
-            link_url = html_links[i]
-            i += 1
-            
-            if link_url in processed_urls:
-                continue
+        links = collect_links(main_page_html, site_url, keyword_strings)
+        pdf_count = sum(link.is_pdf for link in links)
+        self.log(f"Found {len(links) - pdf_count} relevant HTML links and {pdf_count} PDF links.")
+        frontier = self._new_frontier(site_url)
+        frontier.add_links(links)
 
-            time.sleep(self.delay)
+        while (entry := frontier.next_html()) is not None:
+            link_url, depth = entry
+            raise_if_cancelled(self.cancel_event)
             self.log(f"  Scraping HTML: {link_url}...")
-            page_html = fetch_html(self.session, link_url)
+            page_html = fetch_html(self.session, link_url, self.rate_limiter, self.http_cache, self.stats,
+                                   self.cancel_event)
             if page_html:
-                from scraper_lib.parser import NAV_KEYWORDS
-                if any(nav in link_url.lower() for nav in NAV_KEYWORDS):
+                unchanged = self.fingerprints.unchanged(link_url, page_html)
+                page = ParsedPage(page_html, link_url)  # parsed once, shared by links and extraction
+                discovered = 0
+                if frontier.should_expand(link_url, depth):
                     self.log(f"    -> Crawling Hub Page: {link_url}")
-                    sub_html_links, sub_pdf_links = find_relevant_links(page_html, link_url, keyword_strings)
-                    
-                    for sub_link in sub_html_links:
-                        if sub_link not in html_links and sub_link not in processed_urls:
-                            html_links.append(sub_link)
-                            
-                    for sub_pdf in sub_pdf_links:
-                        if sub_pdf not in pdf_links:
-                            pdf_links.append(sub_pdf)
-                
-                data = extract_data_from_html_page(link_url, page_html, self.keywords, site_name)
-                if data:
-                    self.log(f"    [MATCH] Found {len(data)} items on page.")
-                all_data.extend(data)
-                processed_urls.add(link_url)
+                    # Unchanged pages are not extracted: scan their links without building a tree
+                    hub = page.html if unchanged else page
+                    discovered = frontier.add_links(collect_links(hub, link_url, keyword_strings), depth + 1)
 
-        for i, pdf_url in enumerate(pdf_links):
-            if i >= self.max_pdf_links:
-                break
-            if pdf_url in processed_urls:
-                continue
+                if unchanged:
+                    self.log(f"    [UNCHANGED] Skipping extraction: {link_url}")
+                else:
+                    with self.stats.timer("extraction_seconds"):
+                        data = extract_data_from_html_page(link_url, page, self.keywords, site_name, self.templates)
+                    if data:
+                        self.log(f"    [MATCH] Found {len(data)} items on page.")
+                    all_data.extend(data)
+                    # A hub page pays off through the links it adds
+                    self.link_yields.record(link_url, bool(data) or discovered > 0)
 
-            time.sleep(self.delay)
+        for pdf_url in frontier.take_pdfs():
+            raise_if_cancelled(self.cancel_event)
             self.log(f"  Scraping PDF: {pdf_url}...")
-            pdf_text = download_pdf_to_text(self.session, pdf_url)
+            pdf_bytes = fetch_pdf_bytes(self.session, pdf_url, self.rate_limiter, self.http_cache, self.stats,
+                                        self.max_pdf_bytes, self.cancel_event)
+            if pdf_bytes and self.fingerprints.unchanged(pdf_url, pdf_bytes):
+                self.log(f"    [UNCHANGED] Skipping extraction: {pdf_url}")
+                continue
+            raise_if_cancelled(self.cancel_event)
+            with self.stats.timer("pdf_seconds"):
+                pdf_text = (pdf_bytes_to_text(pdf_bytes, pdf_url, self.keywords, self.max_pdf_pages)
+                            if pdf_bytes else None)
             if pdf_text:
-                data = extract_data_from_pdf_text(pdf_url, pdf_text, self.keywords, site_name)
+                with self.stats.timer("extraction_seconds"):
+                    data = extract_data_from_pdf_text(pdf_url, pdf_text, self.keywords, site_name)
                 if data:
                     self.log(f"    [MATCH] Found {len(data)} items in PDF.")
                 all_data.extend(data)
-                processed_urls.add(pdf_url)
+                self.link_yields.record(pdf_url, bool(data))
+            elif pdf_bytes:
+                self.fingerprints.discard(pdf_url)
+
+        self.log(f"  Frontier: {frontier.summary()}.")
+        return all_data
 
-        return all_data
\ No newline at end of file
+    def _new_frontier(self, site_url: str) -> Frontier:
+        return Frontier(site_url, self.max_html_links, self.max_pdf_links, self.hub_depth,
+                        self.max_per_external_host, LinkScorer(self.keywords, self.link_yields))
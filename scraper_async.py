@@ -0,0 +1,204 @@
+"""
+Async scraper: httpx-based variant of the requests ``Scraper``.
+
+Uses the same fetcher/parser/extractor pipeline, but fetches the HTML links
+and PDFs of a site concurrently (bounded by ``max_concurrency`` per site)
+instead of one request after another.
+
+Links are fetched in waves: every wave takes the best queued HTML links of
+the frontier within the ``max_html_links`` budget, fetches them concurrently
+and then processes the pages in score order. Links found on the hub pages of
+a wave compete for the rest of the budget in the next one; with a tight budget
+the sequential engine, which re-ranks after every page, may therefore pick a
+few different URLs.
+"""
+
+import asyncio
+import threading
+from functools import partial
+
+import httpx
+
+from scraper import Scraper
+from scraper_lib.async_fetcher import fetch_html_async, fetch_pdf_bytes_async
+from scraper_lib.fetcher import pdf_bytes_to_text
+from scraper_lib.fingerprint import FingerprintTracker, keyword_set_version
+from scraper_lib.document import ParsedPage
+from scraper_lib.link_scoring import PatternYield
+from scraper_lib.parser import collect_links
+from scraper_lib.extractor import extract_data_from_html_page, extract_data_from_pdf_text
+from scraper_lib.extraction_templates import TemplateCache
+from scraper_lib.rate_limiter import HostRateLimiter
+from scraper_lib.http_cache import HttpCache
+from scraper_lib.cancellation import raise_if_cancelled
+from scraper_lib.target_stats import TargetStats
+
+
+class AsyncScraper:
+    """Scraper that fetches pages concurrently with an asyncio HTTP client.
+
+    The public interface mirrors the original ``Scraper`` class so that it can
+    be used as a drop-in replacement in ``routes.py``. Logging is delegated to
+    ``Scraper`` so all engines share one log buffer.
+    """
+
+    log = Scraper.log
+    get_logs = Scraper.get_logs
+    clear_logs = Scraper.clear_logs
+    _new_frontier = Scraper._new_frontier
+
+    def __init__(
+        self,
+        keywords: list[dict],
+        max_html_links: int = 15,
+        max_pdf_links: int = 10,
+        delay: float = 0.5,
+        max_concurrency: int = 5,
+        rate_limiter: HostRateLimiter | None = None,
+        http_cache: HttpCache | None = None,
+        fingerprints: FingerprintTracker | None = None,
+        cancel_event: threading.Event | None = None,
+        stats: TargetStats | None = None,
+        max_pdf_bytes: int | None = None,
+        max_pdf_pages: int | None = None,
+        hub_depth: int = 2,
+        max_per_external_host: int | None = None,
+        link_yields: PatternYield | None = None,
+        templates: TemplateCache | None = None,
+    ):
+        if not keywords:
+            raise ValueError("Scraper must be initialized with a list of keywords.")
+        self.keywords = keywords
+        self.max_html_links = max_html_links
+        self.max_pdf_links = max_pdf_links
+        self.max_pdf_bytes = max_pdf_bytes
+        self.max_pdf_pages = max_pdf_pages
+        self.hub_depth = hub_depth
+        self.max_per_external_host = max_per_external_host
+        self.delay = delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or HostRateLimiter(start_delay=delay)
+        self.http_cache = http_cache
+        self.fingerprints = fingerprints or FingerprintTracker(None, keyword_set_version(keywords))
+        self.link_yields = link_yields or PatternYield()
+        self.templates = templates or TemplateCache()
+        self.cancel_event = cancel_event
+        self.stats = stats or TargetStats()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_concurrency),
+            headers={
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) "
+                    "Chrome/91.0.4472.124 Safari/537.36"
+                )
+            },
+        )
+
+    async def _polite(self, semaphore: asyncio.Semaphore, coro_fn, *args):
+        """Run one request under the per-site concurrency limit and the per-host rate limiter."""
+        raise_if_cancelled(self.cancel_event)
+        async with semaphore:
+            # Requests queued behind the semaphore may have waited out a stop request
+            raise_if_cancelled(self.cancel_event)
+            return await coro_fn(*args, self.rate_limiter, self.http_cache, self.stats,
+                                 cancel_event=self.cancel_event)
+
+    def _pdf_to_text(self, body: bytes, url: str):
+        # Runs in a worker thread; pdf_seconds sums the CPU time of all PDFs
+        with self.stats.timer("pdf_seconds"):
+            return pdf_bytes_to_text(body, url, self.keywords, self.max_pdf_pages)
+
+    def scrape_site(self, site_name: str, site_url: str) -> list[dict]:
+        """Synchronous entry point, used by routes.py like the other engines."""
+        return asyncio.run(self.scrape_site_async(site_name, site_url))
+
+    async def scrape_site_async(self, site_name: str, site_url: str) -> list[dict]:
+        self.log(f"--- [async] Processing {site_name} ({site_url}) ---")
+        all_data: list[dict] = []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._new_client() as client:
+            raise_if_cancelled(self.cancel_event)
+            main_page_html = await fetch_html_async(client, site_url, self.rate_limiter, self.http_cache, self.stats,
+                                                    self.cancel_event)
+            self.stats.main_page_fetched = bool(main_page_html)
+            if not main_page_html:
+                self.log(f"  [ERROR] Could not fetch main page: {site_url}")
+                return []
+
+            keyword_strings = [k['word'].lower() for k in self.keywords]
+            links = collect_links(main_page_html, site_url, keyword_strings)
+            pdf_count = sum(link.is_pdf for link in links)
+            self.log(f"Found {len(links) - pdf_count} relevant HTML links and {pdf_count} PDF links.")
+            frontier = self._new_frontier(site_url)
+            frontier.add_links(links)
+
+            # 1. HTML links, one concurrent wave at a time
+            while wave := frontier.take_html():
+                self.log(f"  Fetching {len(wave)} HTML pages concurrently…")
+                pages = await asyncio.gather(
+                    *(self._polite(semaphore, fetch_html_async, client, url) for url, _ in wave)
+                )
+
+                for (link_url, depth), page_html in zip(wave, pages):
+                    if not page_html:
+                        continue
+                    unchanged = self.fingerprints.unchanged(link_url, page_html)
+                    page = ParsedPage(page_html, link_url)  # parsed once, shared by links and extraction
+                    discovered = 0
+                    if frontier.should_expand(link_url, depth):
+                        self.log(f"    -> Crawling Hub Page: {link_url}")
+                        hub = page.html if unchanged else page
+                        discovered = frontier.add_links(collect_links(hub, link_url, keyword_strings), depth + 1)
+
+                    if unchanged:
+                        self.log(f"    [UNCHANGED] Skipping extraction: {link_url}")
+                    else:
+                        with self.stats.timer("extraction_seconds"):
+                            data = extract_data_from_html_page(link_url, page, self.keywords, site_name,
+                                                               self.templates)
+                        if data:
+                            self.log(f"    [MATCH] Found {len(data)} items on page.")
+                        all_data.extend(data)
+                        self.link_yields.record(link_url, bool(data) or discovered > 0)
+
+            # 2. PDFs, all within the budget concurrently
+            pdf_batch = frontier.take_pdfs()
+            if pdf_batch:
+                self.log(f"  Fetching {len(pdf_batch)} PDFs concurrently…")
+            pdf_bodies = await asyncio.gather(
+                *(self._polite(semaphore, partial(fetch_pdf_bytes_async, max_bytes=self.max_pdf_bytes), client, url)
+                  for url in pdf_batch)
+            )
+
+        changed_pdfs = []
+        for pdf_url, pdf_bytes in zip(pdf_batch, pdf_bodies):
+            if not pdf_bytes:
+                continue
+            if self.fingerprints.unchanged(pdf_url, pdf_bytes):
+                self.log(f"    [UNCHANGED] Skipping extraction: {pdf_url}")
+                continue
+            changed_pdfs.append((pdf_url, pdf_bytes))
+
+        # Text extraction / OCR is CPU-bound: run it in worker threads
+        raise_if_cancelled(self.cancel_event)
+        pdf_texts = await asyncio.gather(
+            *(asyncio.to_thread(self._pdf_to_text, body, url) for url, body in changed_pdfs)
+        )
+        for (pdf_url, _), pdf_text in zip(changed_pdfs, pdf_texts):
+            if not pdf_text:
+                self.fingerprints.discard(pdf_url)
+                continue
+            with self.stats.timer("extraction_seconds"):
+                data = extract_data_from_pdf_text(pdf_url, pdf_text, self.keywords, site_name)
+            if data:
+                self.log(f"    [MATCH] Found {len(data)} items in PDF.")
+            all_data.extend(data)
+            self.link_yields.record(pdf_url, bool(data))
+
+        self.log(f"  Frontier: {frontier.summary()}.")
+        return all_data
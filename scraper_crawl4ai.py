@@ -16,7 +16,8 @@ Fallback behaviour:
   the requests engine based on the user's config.
 """
 
-import time
+import threading
+
 import requests as _requests
 from typing import Optional
 
@@ -27,9 +28,17 @@ from scraper_lib.crawl4ai_fetcher import (
     fetch_html_crawl4ai_remote,
     fetch_many_crawl4ai_remote,
 )
-from scraper_lib.fetcher import download_pdf_to_text
-from scraper_lib.parser import find_relevant_links, NAV_KEYWORDS
+from scraper_lib.fetcher import fetch_pdf_bytes, pdf_bytes_to_text
+from scraper_lib.fingerprint import FingerprintTracker, keyword_set_version
+from scraper_lib.rate_limiter import HostRateLimiter
+from scraper_lib.http_cache import HttpCache
+from scraper_lib.cancellation import raise_if_cancelled
+from scraper_lib.target_stats import TargetStats
+from scraper_lib.document import ParsedPage
+from scraper_lib.link_scoring import PatternYield
+from scraper_lib.parser import collect_links
 from scraper_lib.extractor import extract_data_from_html_page, extract_data_from_pdf_text
+from scraper_lib.extraction_templates import TemplateCache
 
 
 class Crawl4AIScraper:
@@ -47,6 +56,7 @@ class Crawl4AIScraper:
     log = Scraper.log
     get_logs = Scraper.get_logs
     clear_logs = Scraper.clear_logs
+    _new_frontier = Scraper._new_frontier
 
     def __init__(
         self,
@@ -55,13 +65,39 @@ class Crawl4AIScraper:
         max_pdf_links: int = 10,
         delay: float = 0.5,
         server_url: Optional[str] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        http_cache: Optional[HttpCache] = None,
+        fingerprints: Optional[FingerprintTracker] = None,
+        session: Optional[_requests.Session] = None,
+        cancel_event: Optional[threading.Event] = None,
+        stats: Optional[TargetStats] = None,
+        max_pdf_bytes: Optional[int] = None,
+        max_pdf_pages: Optional[int] = None,
+        hub_depth: int = 2,
+        max_per_external_host: Optional[int] = None,
+        link_yields: Optional[PatternYield] = None,
+        templates: Optional[TemplateCache] = None,
     ):
         if not keywords:
             raise ValueError("Scraper must be initialized with a list of keywords.")
         self.keywords = keywords
         self.max_html_links = max_html_links
         self.max_pdf_links = max_pdf_links
+        self.max_pdf_bytes = max_pdf_bytes
+        self.max_pdf_pages = max_pdf_pages
+        self.hub_depth = hub_depth
+        self.max_per_external_host = max_per_external_host
         self.delay = delay
+        self.rate_limiter = rate_limiter or HostRateLimiter(start_delay=delay)
+        # Only used for PDFs: browser-rendered pages are not revalidated
+        self.http_cache = http_cache
+        self.fingerprints = fingerprints or FingerprintTracker(None, keyword_set_version(keywords))
+        self.link_yields = link_yields or PatternYield()
+        self.templates = templates or TemplateCache()
+        # requests session for PDF downloads; created lazily unless shared by the caller
+        self.session = session
+        self.cancel_event = cancel_event
+        self.stats = stats or TargetStats()
         # Normalise: empty string → None (= use local browser)
         self.server_url: Optional[str] = server_url.strip() if server_url else None
 
@@ -71,13 +107,20 @@ class Crawl4AIScraper:
 
     def _fetch_one(self, url: str) -> Optional[str]:
         if self.server_url:
-            return fetch_html_crawl4ai_remote(url, self.server_url)
-        return fetch_html_crawl4ai(url)
+            return fetch_html_crawl4ai_remote(url, self.server_url, self.rate_limiter, self.cancel_event)
+        return fetch_html_crawl4ai(url, self.rate_limiter, self.cancel_event)
 
     def _fetch_many(self, urls: list[str]) -> dict[str, Optional[str]]:
         if self.server_url:
-            return fetch_many_crawl4ai_remote(urls, self.server_url)
-        return fetch_many_crawl4ai(urls)
+            return fetch_many_crawl4ai_remote(urls, self.server_url, self.rate_limiter, self.cancel_event)
+        return fetch_many_crawl4ai(urls, self.rate_limiter, self.cancel_event)
+
+    def _count_page(self, html: Optional[str]) -> None:
+        # Crawl4AI hides the raw response: count the rendered HTML instead
+        if html:
+            self.stats.record_fetch(len(html.encode("utf-8")))
+        else:
+            self.stats.record_error()
 
     # ------------------------------------------------------------------
     # Main entry point
@@ -87,88 +130,95 @@ class Crawl4AIScraper:
         mode = f"remote ({self.server_url})" if self.server_url else "local"
         self.log(f"--- [Crawl4AI/{mode}] Processing {site_name} ({site_url}) ---")
         all_data: list[dict] = []
-        processed_urls: set[str] = set()
 
         # 1. Fetch the main page
         #    Connection/import errors propagate → routes.py handles fallback
+        raise_if_cancelled(self.cancel_event)
         main_page_html = self._fetch_one(site_url)
+        self._count_page(main_page_html)
+        self.stats.main_page_fetched = bool(main_page_html)
         if not main_page_html:
             self.log(f"  [WARN] No content returned for main page: {site_url}")
             return []
 
         keyword_strings = [k["word"].lower() for k in self.keywords]
-        html_links, pdf_links = find_relevant_links(main_page_html, site_url, keyword_strings)
+        links = collect_links(main_page_html, site_url, keyword_strings)
+        pdf_count = sum(link.is_pdf for link in links)
         self.log(
-            f"  Found {len(html_links)} relevant HTML links and {len(pdf_links)} PDF links."
+            f"  Found {len(links) - pdf_count} relevant HTML links and {pdf_count} PDF links."
         )
+        frontier = self._new_frontier(site_url)
+        frontier.add_links(links)
 
         # 2. Crawl HTML links in batches of 5
-        i = 0
-        while i < len(html_links) and i < self.max_html_links:
-            batch_urls: list[str] = []
-            while len(batch_urls) < 5 and i < len(html_links) and i < self.max_html_links:
-                url = html_links[i]
-                i += 1
-                if url not in processed_urls:
-                    batch_urls.append(url)
-
-            if not batch_urls:
-                continue
-
-            self.log(f"  Batch-fetching {len(batch_urls)} HTML pages…")
-            pages = self._fetch_many(batch_urls)
-
-            for link_url in batch_urls:
+        while batch := frontier.take_html(5):
+            raise_if_cancelled(self.cancel_event)
+            self.log(f"  Batch-fetching {len(batch)} HTML pages…")
+            pages = self._fetch_many([url for url, _ in batch])
+            for url, _ in batch:
+                self._count_page(pages.get(url))
+
+            for link_url, depth in batch:
                 page_html = pages.get(link_url)
                 if not page_html:
                     self.log(f"    [SKIP] No content for {link_url}")
                     continue
 
+                unchanged = self.fingerprints.unchanged(link_url, page_html)
+                page = ParsedPage(page_html, link_url)  # parsed once, shared by links and extraction
+
                 # Expand hub pages (news/announcements) like the original scraper
-                if any(nav in link_url.lower() for nav in NAV_KEYWORDS):
+                discovered = 0
+                if frontier.should_expand(link_url, depth):
                     self.log(f"    -> Crawling Hub Page: {link_url}")
-                    sub_html_links, sub_pdf_links = find_relevant_links(
-                        page_html, link_url, keyword_strings
+                    hub = page.html if unchanged else page
+                    discovered = frontier.add_links(
+                        collect_links(hub, link_url, keyword_strings), depth + 1
                     )
-                    for sub_link in sub_html_links:
-                        if sub_link not in html_links and sub_link not in processed_urls:
-                            html_links.append(sub_link)
-                    for sub_pdf in sub_pdf_links:
-                        if sub_pdf not in pdf_links:
-                            pdf_links.append(sub_pdf)
-
-                data = extract_data_from_html_page(link_url, page_html, self.keywords, site_name)
-                if data:
-                    self.log(f"    [MATCH] Found {len(data)} items on page.")
-                all_data.extend(data)
-                processed_urls.add(link_url)
 
-            time.sleep(self.delay)
+                if unchanged:
+                    self.log(f"    [UNCHANGED] Skipping extraction: {link_url}")
+                else:
+                    with self.stats.timer("extraction_seconds"):
+                        data = extract_data_from_html_page(link_url, page, self.keywords, site_name, self.templates)
+                    if data:
+                        self.log(f"    [MATCH] Found {len(data)} items on page.")
+                    all_data.extend(data)
+                    self.link_yields.record(link_url, bool(data) or discovered > 0)
 
         # 3. Crawl PDF links (always via requests — PDFs don't need a browser)
-        session = _requests.Session()
-        session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/91.0.4472.124 Safari/537.36"
-            )
-        })
-
-        for j, pdf_url in enumerate(pdf_links):
-            if j >= self.max_pdf_links:
-                break
-            if pdf_url in processed_urls:
-                continue
-
-            time.sleep(self.delay)
+        session = self.session
+        if session is None:
+            session = _requests.Session()
+            session.headers.update({
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) "
+                    "Chrome/91.0.4472.124 Safari/537.36"
+                )
+            })
+
+        for pdf_url in frontier.take_pdfs():
+            raise_if_cancelled(self.cancel_event)
             self.log(f"  Scraping PDF: {pdf_url}…")
-            pdf_text = download_pdf_to_text(session, pdf_url)
+            pdf_bytes = fetch_pdf_bytes(session, pdf_url, self.rate_limiter, self.http_cache, self.stats,
+                                        self.max_pdf_bytes, self.cancel_event)
+            if pdf_bytes and self.fingerprints.unchanged(pdf_url, pdf_bytes):
+                self.log(f"    [UNCHANGED] Skipping extraction: {pdf_url}")
+                continue
+            raise_if_cancelled(self.cancel_event)
+            with self.stats.timer("pdf_seconds"):
+                pdf_text = (pdf_bytes_to_text(pdf_bytes, pdf_url, self.keywords, self.max_pdf_pages)
+                            if pdf_bytes else None)
             if pdf_text:
-                data = extract_data_from_pdf_text(pdf_url, pdf_text, self.keywords, site_name)
+                with self.stats.timer("extraction_seconds"):
+                    data = extract_data_from_pdf_text(pdf_url, pdf_text, self.keywords, site_name)
                 if data:
                     self.log(f"    [MATCH] Found {len(data)} items in PDF.")
                 all_data.extend(data)
-                processed_urls.add(pdf_url)
+                self.link_yields.record(pdf_url, bool(data))
+            elif pdf_bytes:
+                self.fingerprints.discard(pdf_url)
 
+        self.log(f"  Frontier: {frontier.summary()}.")
         return all_data
@@ -0,0 +1,137 @@
+"""
+Asynchronous HTTP fetching for scraper_lib, built on httpx.
+
+Mirrors ``fetcher.py``: the same timeouts and error handling, but the calls
+can be awaited concurrently. PDF text extraction (PyPDF2 / OCR) is CPU-bound;
+the async scraper runs ``pdf_bytes_to_text`` in a worker thread so it does
+not block the event loop.
+"""
+
+from __future__ import annotations
+import io
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from .fetcher import PdfTooLarge, check_content_length
+from .rate_limiter import HostRateLimiter
+from .http_cache import HttpCache
+from .target_stats import TargetStats
+from . import metrics
+
+
+async def _limited_get(client: httpx.AsyncClient, url: str, timeout: int,
+                       rate_limiter: Optional[HostRateLimiter], headers: Optional[dict] = None,
+                       stream: bool = False, cancel_event: Optional[threading.Event] = None) -> httpx.Response:
+    """GET through the per-host rate limiter, reporting latency and status back to it."""
+    if rate_limiter is not None:
+        await rate_limiter.acquire_async(url, cancel_event)
+    start = time.monotonic()
+    try:
+        request = client.build_request("GET", url, timeout=timeout, headers=headers)
+        response = await client.send(request, stream=stream)
+    except httpx.HTTPError:
+        metrics.HTTP_RESPONSES.inc(engine="async", status="error")
+        if rate_limiter is not None:
+            rate_limiter.record(url, time.monotonic() - start)
+        raise
+    metrics.HTTP_RESPONSES.inc(engine="async", status=response.status_code)
+    if rate_limiter is not None:
+        rate_limiter.record(url, time.monotonic() - start, response.status_code,
+                            response.headers.get("Retry-After"))
+    return response
+
+
+async def _read_capped(response: httpx.Response, url: str, max_bytes: int) -> bytes:
+    buffer = io.BytesIO()
+    async for chunk in response.aiter_bytes(64 * 1024):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise PdfTooLarge(f"{url} exceeds the limit of {max_bytes / 1048576:.0f} MB")
+    return buffer.getvalue()
+
+
+async def _get_body(client: httpx.AsyncClient, url: str, timeout: int,
+                    rate_limiter: Optional[HostRateLimiter], cache: Optional[HttpCache],
+                    stats: Optional[TargetStats] = None, kind: str = "html",
+                    max_bytes: Optional[int] = None,
+                    cancel_event: Optional[threading.Event] = None) -> tuple[bytes, Optional[str]]:
+    """
+    GETs a URL, revalidating against the HTTP cache when one is given.
+    Returns (body, encoding); a 304 answer is served from the cache.
+    With ``max_bytes`` the body is streamed and the download is refused or
+    aborted (PdfTooLarge) once it is known to be over the limit.
+    """
+    stream = max_bytes is not None
+    if cache is not None:
+        response = await _limited_get(client, url, timeout, rate_limiter, cache.conditional_headers(url), stream,
+                                      cancel_event)
+        if response.status_code == 304:
+            await response.aclose()
+            cached = cache.get(url)
+            if cached is not None:
+                if stats:
+                    stats.record_fetch(0, cached=True)
+                return cached
+            response = await _limited_get(client, url, timeout, rate_limiter, stream=stream,
+                                          cancel_event=cancel_event)
+    else:
+        response = await _limited_get(client, url, timeout, rate_limiter, stream=stream,
+                                      cancel_event=cancel_event)
+    try:
+        response.raise_for_status()
+        check_content_length(response.headers, url, max_bytes)
+        body = await _read_capped(response, url, max_bytes) if stream else response.content
+    finally:
+        await response.aclose()
+    if cache is not None:
+        cache.store(url, response.headers, body, response.encoding)
+    metrics.FETCH_BYTES.observe(len(body), engine="async", kind=kind)
+    if stats:
+        stats.record_fetch(len(body))
+    return body, response.encoding
+
+
+async def fetch_html_async(client: httpx.AsyncClient, url: str,
+                           rate_limiter: Optional[HostRateLimiter] = None,
+                           cache: Optional[HttpCache] = None,
+                           stats: Optional[TargetStats] = None,
+                           cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+    """Fetches HTML content from a URL."""
+    print(f"Fetching: {url}")
+    try:
+        with metrics.FETCH_SECONDS.time(engine="async", kind="html"):
+            body, encoding = await _get_body(client, url, 20, rate_limiter, cache, stats,
+                                             cancel_event=cancel_event)
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except httpx.HTTPError as e:
+        print(f"Error fetching {url}: {e}")
+        if stats:
+            stats.record_error()
+        return None
+
+
+async def fetch_pdf_bytes_async(client: httpx.AsyncClient, pdf_url: str,
+                                rate_limiter: Optional[HostRateLimiter] = None,
+                                cache: Optional[HttpCache] = None,
+                                stats: Optional[TargetStats] = None,
+                                max_bytes: Optional[int] = None,
+                                cancel_event: Optional[threading.Event] = None) -> Optional[bytes]:
+    """Downloads a PDF and returns its raw bytes, or None on failure or if it is over ``max_bytes``."""
+    print(f"Downloading PDF: {pdf_url}")
+    try:
+        with metrics.FETCH_SECONDS.time(engine="async", kind="pdf"):
+            content, _ = await _get_body(client, pdf_url, 45, rate_limiter, cache, stats, kind="pdf",
+                                         max_bytes=max_bytes, cancel_event=cancel_event)
+        return content
+    except PdfTooLarge as e:
+        print(f"Skipping PDF: {e}")
+        metrics.PDF_SKIPPED.inc(reason="too_large")
+        return None
+    except httpx.HTTPError as e:
+        print(f"Error downloading PDF {pdf_url}: {e}")
+        if stats:
+            stats.record_error()
+        return None
@@ -0,0 +1,21 @@
+"""
+Cooperative cancellation for the scrapers.
+
+A run owns one ``threading.Event``; stopping the run sets it. The scrapers call
+``raise_if_cancelled`` before every page or PDF fetch (and before expensive
+extraction), so a stop request takes effect within one request instead of only
+between targets. ``threading.Event.is_set`` is non-blocking, so the same event
+is checked from the async engine's coroutines.
+"""
+
+from __future__ import annotations
+import threading
+
+
+class ScrapeCancelled(Exception):
+    """Raised inside a scraper when its run has been cancelled."""
+
+
+def raise_if_cancelled(cancel_event: threading.Event | None) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScrapeCancelled()
@@ -1,16 +1,27 @@
 import asyncio
+import threading
+import time
 from typing import Optional
 
 import requests as _requests  # alias to avoid collision with function param names
 
+from .cancellation import ScrapeCancelled
+from .rate_limiter import HostRateLimiter
+from . import metrics
+
 
 # ---------------------------------------------------------------------------
 # Remote server mode  (HTTP POST to an external Crawl4AI server)
 # ---------------------------------------------------------------------------
 
-def fetch_html_crawl4ai_remote(url: str, server_url: str) -> Optional[str]:
+def fetch_html_crawl4ai_remote(url: str, server_url: str,
+                               rate_limiter: Optional[HostRateLimiter] = None,
+                               cancel_event: Optional[threading.Event] = None) -> Optional[str]:
     """Fetch a URL via an external Crawl4AI server (POST /crawl).
 
+    The rate limiter is keyed by the *crawled* URL's host, not the server's,
+    so politeness towards the municipality holds regardless of engine.
+
     Raises requests.RequestException on connection/timeout errors so that the
     caller (routes.py) can catch them and trigger the fallback engine.
     """
@@ -19,16 +30,31 @@ def fetch_html_crawl4ai_remote(url: str, server_url: str) -> Optional[str]:
         "urls": [url],
         "crawler_config": {"page_timeout": 30000},
     }
-    resp = _requests.post(endpoint, json=payload, timeout=60)
-    resp.raise_for_status()
+    if rate_limiter:
+        rate_limiter.acquire(url, cancel_event)
+    start = time.monotonic()
+    try:
+        resp = _requests.post(endpoint, json=payload, timeout=60)
+        resp.raise_for_status()
+    except _requests.RequestException:
+        metrics.HTTP_RESPONSES.inc(engine="crawl4ai-remote", status="error")
+        raise
     data = resp.json()
+    elapsed = time.monotonic() - start
+    metrics.FETCH_SECONDS.observe(elapsed, engine="crawl4ai-remote", kind="html")
+    metrics.HTTP_RESPONSES.inc(engine="crawl4ai-remote", status=data.get("status_code") or "unknown")
+    if rate_limiter:
+        rate_limiter.record(url, elapsed, data.get("status_code"))
     if data.get("success"):
+        metrics.FETCH_BYTES.observe(len(data.get("html") or ""), engine="crawl4ai-remote", kind="html")
         return data.get("html")
     print(f"Crawl4AI remote: unsuccessful result for {url}: {data.get('error_message')}")
     return None
 
 
-def fetch_many_crawl4ai_remote(urls: list[str], server_url: str) -> dict[str, Optional[str]]:
+def fetch_many_crawl4ai_remote(urls: list[str], server_url: str,
+                               rate_limiter: Optional[HostRateLimiter] = None,
+                               cancel_event: Optional[threading.Event] = None) -> dict[str, Optional[str]]:
     """Fetch multiple URLs via the remote server, one at a time.
 
     Raises on the first connection-level error (server unreachable).
@@ -37,8 +63,8 @@ def fetch_many_crawl4ai_remote(urls: list[str], server_url: str) -> dict[str, Op
     results: dict[str, Optional[str]] = {}
     for url in urls:
         try:
-            results[url] = fetch_html_crawl4ai_remote(url, server_url)
-        except _requests.RequestException:
+            results[url] = fetch_html_crawl4ai_remote(url, server_url, rate_limiter, cancel_event)
+        except (_requests.RequestException, ScrapeCancelled):
             # Re-raise connection-level errors so the fallback can kick in
             raise
         except Exception as e:
@@ -47,24 +73,53 @@ def fetch_many_crawl4ai_remote(urls: list[str], server_url: str) -> dict[str, Op
     return results
 
 
-async def _fetch_html_async(url: str) -> Optional[str]:
+async def _limited_arun(crawler, url: str, run_cfg, rate_limiter: Optional[HostRateLimiter],
+                        cancel_event: Optional[threading.Event] = None):
+    """Run one crawl through the per-host rate limiter."""
+    if rate_limiter is not None:
+        await rate_limiter.acquire_async(url, cancel_event)
+    start = time.monotonic()
+    try:
+        result = await crawler.arun(url=url, config=run_cfg)
+    except Exception:
+        metrics.HTTP_RESPONSES.inc(engine="crawl4ai", status="error")
+        if rate_limiter is not None:
+            rate_limiter.record(url, time.monotonic() - start)
+        raise
+    elapsed = time.monotonic() - start
+    status = getattr(result, "status_code", None)
+    metrics.FETCH_SECONDS.observe(elapsed, engine="crawl4ai", kind="html")
+    metrics.HTTP_RESPONSES.inc(engine="crawl4ai", status=status or "unknown")
+    if getattr(result, "success", False):
+        metrics.FETCH_BYTES.observe(len(result.html or ""), engine="crawl4ai", kind="html")
+    if rate_limiter is not None:
+        rate_limiter.record(url, elapsed, status)
+    return result
+
+
+async def _fetch_html_async(url: str, rate_limiter: Optional[HostRateLimiter] = None,
+                            cancel_event: Optional[threading.Event] = None) -> Optional[str]:
     """Fetch a URL using Crawl4AI's async crawler (supports JavaScript rendering)."""
     try:
         from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
         browser_cfg = BrowserConfig(headless=True)
         run_cfg = CrawlerRunConfig(wait_until="networkidle", page_timeout=30000)
         async with AsyncWebCrawler(config=browser_cfg) as crawler:
-            result = await crawler.arun(url=url, config=run_cfg)
+            result = await _limited_arun(crawler, url, run_cfg, rate_limiter, cancel_event)
             if result.success:
                 return result.html
             print(f"Crawl4AI: unsuccessful result for {url}")
             return None
+    except ScrapeCancelled:
+        raise
     except Exception as e:
         print(f"Crawl4AI error fetching {url}: {e}")
         return None
 
 
-async def _fetch_many_async(urls: list[str]) -> dict[str, Optional[str]]:
+async def _fetch_many_async(urls: list[str],
+                            rate_limiter: Optional[HostRateLimiter] = None,
+                            cancel_event: Optional[threading.Event] = None) -> dict[str, Optional[str]]:
     """Fetch multiple URLs concurrently using a single Crawl4AI crawler instance."""
     try:
         from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
@@ -72,9 +127,11 @@ async def _fetch_many_async(urls: list[str]) -> dict[str, Optional[str]]:
         run_cfg = CrawlerRunConfig(wait_until="networkidle", page_timeout=30000)
         results: dict[str, Optional[str]] = {}
         async with AsyncWebCrawler(config=browser_cfg) as crawler:
-            tasks = [crawler.arun(url=url, config=run_cfg) for url in urls]
+            tasks = [_limited_arun(crawler, url, run_cfg, rate_limiter, cancel_event) for url in urls]
             responses = await asyncio.gather(*tasks, return_exceptions=True)
             for url, resp in zip(urls, responses):
+                if isinstance(resp, ScrapeCancelled):
+                    raise resp
                 if isinstance(resp, Exception):
                     print(f"Crawl4AI error fetching {url}: {resp}")
                     results[url] = None
@@ -83,16 +140,21 @@ async def _fetch_many_async(urls: list[str]) -> dict[str, Optional[str]]:
                 else:
                     results[url] = None
         return results
+    except ScrapeCancelled:
+        raise
     except Exception as e:
         print(f"Crawl4AI batch fetch error: {e}")
         return {url: None for url in urls}
 
 
-def fetch_html_crawl4ai(url: str) -> Optional[str]:
+def fetch_html_crawl4ai(url: str, rate_limiter: Optional[HostRateLimiter] = None,
+                        cancel_event: Optional[threading.Event] = None) -> Optional[str]:
     """Synchronous wrapper: fetch a single URL with Crawl4AI."""
-    return asyncio.run(_fetch_html_async(url))
+    return asyncio.run(_fetch_html_async(url, rate_limiter, cancel_event))
 
 
-def fetch_many_crawl4ai(urls: list[str]) -> dict[str, Optional[str]]:
+def fetch_many_crawl4ai(urls: list[str],
+                        rate_limiter: Optional[HostRateLimiter] = None,
+                        cancel_event: Optional[threading.Event] = None) -> dict[str, Optional[str]]:
     """Synchronous wrapper: fetch multiple URLs concurrently with Crawl4AI."""
-    return asyncio.run(_fetch_many_async(urls))
+    return asyncio.run(_fetch_many_async(urls, rate_limiter, cancel_event))
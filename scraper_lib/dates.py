@@ -0,0 +1,82 @@
+"""
+Publication dates: finding them in page/PDF text and normalising them to ISO.
+
+All DATE_PATTERNS are joined into one precompiled alternation, so a text is
+scanned once instead of once per pattern. The pattern order still decides:
+if the text contains several kinds of dates, the match of the earliest
+pattern in DATE_PATTERNS wins, as it did with one re.search per pattern.
+The scan does not return overlapping matches, so a lower-ranked match can
+hide a higher-ranked one that starts inside it ("1/2/03.04.2024"); the
+patterns ranked above the scan's best match are therefore searched once
+more on their own. Texts without any date, the common case, cost one scan.
+"""
+
+from __future__ import annotations
+import re
+from datetime import date
+
+from .constants import DATE_PATTERNS
+
+# Only the beginning of a text is searched; dates further down are rarely the publication date
+DATE_SEARCH_LIMIT = 4000
+
+_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in DATE_PATTERNS]
+_ANY_DATE = re.compile(
+    "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(DATE_PATTERNS)), re.IGNORECASE
+)
+
+_NUMERIC = re.compile(r"(\d+)\D+(\d+)\D+(\d+)")
+_NAMED_MONTH = re.compile(r"(\d{1,2})\.\s*([a-zä]+)\.?\s*(\d{4})", re.IGNORECASE)
+_MONTHS = {
+    "jan": 1, "feb": 2, "mär": 3, "mrz": 3, "apr": 4, "mai": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "okt": 10, "nov": 11, "dez": 12,
+}
+
+
+def find_date(text: str) -> str | None:
+    """The date string as written in ``text`` ("3. März 2024", "03.03.24"), or None."""
+    text = text[:DATE_SEARCH_LIMIT]
+    best_index, best = len(_PATTERNS), None
+    for match in _ANY_DATE.finditer(text):
+        index = int(match.lastgroup[1:])
+        if index < best_index:
+            best_index, best = index, match.group(match.lastgroup)
+            if index == 0:
+                return best
+    # A higher-ranked date may overlap a match the scan consumed
+    for pattern in _PATTERNS[:best_index]:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return best
+
+
+def _year(value: str) -> int | None:
+    if len(value) == 4:
+        return int(value)
+    if len(value) == 2:
+        year = int(value)
+        return 2000 + year if year < 70 else 1900 + year
+    return None
+
+
+def parse_date(raw: str | None) -> date | None:
+    """Normalise a date string found by ``find_date`` (or already ISO); None if it is no valid date."""
+    if not raw:
+        return None
+    raw = raw.strip()
+    try:
+        named = _NAMED_MONTH.fullmatch(raw)
+        if named:
+            month = _MONTHS.get(named.group(2).lower()[:3])
+            return date(int(named.group(3)), month, int(named.group(1))) if month else None
+        numeric = _NUMERIC.fullmatch(raw)
+        if not numeric:
+            return None
+        first, second, third = numeric.groups()
+        if len(first) == 4:  # 2024-03-05
+            return date(int(first), int(second), int(third))
+        year = _year(third)  # day first: 05.03.2024, 05-03-24, 05/03/2024
+        return date(year, int(second), int(first)) if year else None
+    except ValueError:  # 31.02.2024, month 13, ...
+        return None
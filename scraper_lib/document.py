@@ -0,0 +1,47 @@
+"""
+A fetched HTML page, parsed at most once.
+
+The scrapers hand the same ParsedPage to ``find_relevant_links`` (hub pages)
+and ``extract_data_from_html_page``, so a page is turned into a tree once
+instead of once per consumer. The tree is built lazily: a page that is
+neither a hub nor changed since the last run is never parsed at all.
+
+lxml is used as BeautifulSoup's tree builder when it is installed (several
+times faster than the pure-Python html.parser); both builders produce the same
+BeautifulSoup API, so the consumers do not care which one was used.
+"""
+
+from __future__ import annotations
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+
+class ParsedPage:
+    __slots__ = ("html", "url", "parser", "_soup")
+
+    def __init__(self, html: str, url: str | None = None, parser: str | None = None):
+        self.html = html
+        self.url = url
+        self.parser = parser or DEFAULT_PARSER
+        self._soup: BeautifulSoup | None = None
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """The parsed tree; consumers must not modify it, it is shared."""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, self.parser)
+        return self._soup
+
+    @property
+    def parsed(self) -> bool:
+        return self._soup is not None
+
+
+def as_page(html: str | ParsedPage, url: str | None = None) -> ParsedPage:
+    """Accept raw HTML or an already parsed page."""
+    return html if isinstance(html, ParsedPage) else ParsedPage(html, url)
@@ -0,0 +1,71 @@
+"""
+Per-host extraction templates: the title and content selector a site's CMS uses.
+
+All pages of one municipality come out of the same CMS template, so the
+selectors that found title and content on one page find them on the next.
+``TemplateCache.select`` remembers that pair per host and, for the next page
+of the host, runs a ``SelectorPlan`` of just those two selectors. That plan
+tests two rules per element instead of 26 and stops walking the tree as soon
+as both are found. When the template misses (a page of another kind, a
+relaunch), the full cascade runs and its selectors become the host's template.
+
+A template hit takes the first element matching the learned selector; the
+cascade would pick the same unless a page also matches a selector ranked
+above it, which pages of one template do not.
+
+Like the fingerprints, the cache holds the templates of one target's scrape:
+the webapp loads ``known`` before and stores ``changed`` and the hit/miss
+counts afterwards.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple
+
+from bs4 import BeautifulSoup, Tag
+
+from .frontier import host_of
+from .selector_plan import DEFAULT_PLAN, SelectorPlan
+from . import metrics
+
+
+class ExtractionTemplate(NamedTuple):
+    title_selector: str
+    content_selector: str
+
+
+@lru_cache(maxsize=256)
+def template_plan(template: ExtractionTemplate) -> SelectorPlan:
+    return SelectorPlan([template.title_selector], [template.content_selector])
+
+
+class TemplateCache:
+    """Learned title/content selectors by host, with hit and miss counts of this scrape."""
+
+    def __init__(self, known: dict[str, ExtractionTemplate] | None = None):
+        self.known = known or {}
+        self.changed: set[str] = set()
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def select(self, soup: BeautifulSoup, url: str) -> tuple[Tag | None, Tag | None, Tag | None, Tag | None]:
+        """(title_element, content_element, <title>, <body>) as ``select_title_and_content`` returns them."""
+        host = host_of(url)
+        template = self.known.get(host)
+        if template is not None:
+            match = template_plan(template).match(soup)
+            if match.title is not None and match.content is not None:
+                self.hits[host] += 1
+                metrics.EXTRACTION_TEMPLATES.inc(result="hit")
+                return match[:4]
+            self.misses[host] += 1
+        metrics.EXTRACTION_TEMPLATES.inc(result="miss" if template is not None else "none")
+
+        match = DEFAULT_PLAN.match(soup)
+        if match.title_selector and match.content_selector:
+            learned = ExtractionTemplate(match.title_selector, match.content_selector)
+            if learned != template:
+                self.known[host] = learned
+                self.changed.add(host)
+        return match[:4]
@@ -1,7 +1,15 @@
 import re
 from datetime import datetime
 from bs4 import BeautifulSoup
-from .constants import TITLE_SELECTORS, CONTENT_SELECTORS, DATE_PATTERNS
+from .dates import find_date, parse_date
+from .document import ParsedPage, as_page
+from .extraction_templates import TemplateCache
+from .keyword_matcher import keyword_matcher
+from .selector_plan import select_title_and_content
+from . import metrics
+
+# Snippets taken from a PDF's text; the PDF reader stops once this many keywords were found
+MAX_PDF_SNIPPETS = 3
 
 def _find_date(content_area: BeautifulSoup | str) -> str | None:
     """Finds a date in a BeautifulSoup tag or a block of text."""
@@ -9,65 +17,40 @@ def _find_date(content_area: BeautifulSoup | str) -> str | None:
         return None
 
     text_for_date_search = content_area if isinstance(content_area, str) else content_area.get_text(separator=' ', strip=True)
-    text_for_date_search = text_for_date_search[:4000]
+    return find_date(text_for_date_search)
+
+def _iso(date_str: str | None) -> str | None:
+    parsed = parse_date(date_str)
+    return parsed.isoformat() if parsed else None
 
-    for pattern in DATE_PATTERNS:
-        match = re.search(pattern, text_for_date_search, re.IGNORECASE)
-        if match:
-            return match.group(1)
-    return None
+def _first_keyword_category(matcher, keywords: list[dict], text: str):
+    """Category of the first keyword (in list order) that occurs in ``text``."""
+    indices = {hit.index for hit in matcher.find_all(text)}
+    return keywords[min(indices)].get('category_id') if indices else None
 
-def extract_data_from_html_page(page_url: str, html_content: str, keywords: list[dict], source_municipality_name: str) -> list[dict]:
-    """Extracts title, description, date, etc., from an HTML page."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+@metrics.EXTRACTION_SECONDS.time(source="html")
+def extract_data_from_html_page(page_url: str, html_content: str | ParsedPage, keywords: list[dict], source_municipality_name: str,
+                                templates: TemplateCache | None = None) -> list[dict]:
+    """
+    Extracts title, description, date, etc., from an HTML page (raw HTML or a ParsedPage).
+    With ``templates``, the selectors learned for the page's host are tried first.
+    """
+    soup = as_page(html_content, page_url).soup
+    matcher = keyword_matcher(keywords)
     extracted_items = []
     
-    # 1. Title Extraction
-    title = ""
-    for selector in TITLE_SELECTORS:
-        found_title = None
-        if '.' in selector:
-            tag, cls = selector.split('.', 1)
-            found_title = soup.find(tag or True, class_=re.compile(cls, re.I))
-        elif '[' in selector:
-            tag = selector.split('[')[0]
-            attr_full = selector.split('[')[1].split(']')[0]
-            key, val = attr_full.split('=')
-            found_title = soup.find(tag or True, {key: re.compile(val.strip('"\''), re.I)})
-        else:
-            found_title = soup.find(selector)
-        
-        if found_title:
-            title = found_title.get_text(strip=True)
-            break
-    
-    if not title and soup.title:
-        title = soup.title.string.strip() if soup.title.string else ""
+    # 1. Title and content area, found in one pass over the tree
+    if templates is not None:
+        title_element, content_area, title_tag, body_tag = templates.select(soup, page_url)
+    else:
+        title_element, content_area, title_tag, body_tag = select_title_and_content(soup)
+    title = title_element.get_text(strip=True) if title_element else ""
+    if not title and title_tag:
+        title = title_tag.string.strip() if title_tag.string else ""
 
-    # 2. Content Area Extraction
-    content_area = None
-    for selector in CONTENT_SELECTORS:
-        if '#' in selector:
-            tag, elem_id = selector.split('#', 1)
-            content_area = soup.find(tag or True, id=elem_id)
-        elif '.' in selector:
-            tag = 'div' if selector.startswith('.') else selector.split('.', 1)[0]
-            cls = selector[1:] if selector.startswith('.') else selector.split('.', 1)[1]
-            content_area = soup.find(tag, class_=re.compile(r'\b' + re.escape(cls) + r'\b', re.I))
-        elif '[' in selector:
-            tag = selector.split('[')[0]
-            try:
-                attr_full = selector.split('[')[1].split(']')[0]
-                key, val = attr_full.split('=')
-                content_area = soup.find(tag or True, {key: re.compile(val.strip('"\''), re.I)})
-            except (IndexError, ValueError): pass
-        else:
-            content_area = soup.find(selector)
-        
-        if content_area: break
-    
+    # 2. Content area falls back to the whole body
     if not content_area:
-        content_area = soup.body
+        content_area = body_tag
 
     description_snippets = []
     if content_area:
@@ -83,38 +66,34 @@ def extract_data_from_html_page(page_url: str, html_content: str, keywords: list
             if len(block_text) < 40 and len(block.find_all(['a','strong','b'])) > 0:
                 continue
             if not block_text: continue
-            for keyword_obj in keywords:
-                keyword = keyword_obj['word'].lower()
-                if keyword in block_text.lower():
-                    keyword_pos = block_text.lower().find(keyword)
-                    start_pos = max(0, keyword_pos - 100)
-                    end_pos = min(len(block_text), keyword_pos + len(keyword) + 150)
-                    snippet_text = block_text[start_pos:end_pos].strip()
-                    snippet = f"[Keyword: {keyword_obj['word']}] ...{snippet_text}..."
-                    if snippet not in description_snippets:
-                         description_snippets.append(snippet)
-                    break
+            first = matcher.first_occurrences(block_text)
+            if first:
+                # The first keyword of the list that occurs, at its first occurrence
+                index = min(first)
+                hit = first[index]
+                start_pos = max(0, hit.start - 100)
+                end_pos = min(len(block_text), hit.end + 150)
+                snippet_text = block_text[start_pos:end_pos].strip()
+                snippet = f"[Keyword: {keywords[index]['word']}] ...{snippet_text}..."
+                if snippet not in description_snippets:
+                    description_snippets.append(snippet)
             if len(description_snippets) >= 2:
                 break
     description = " | ".join(description_snippets)
     
     # Determine category based on matched keywords in title or description
-    matched_category_id = None
-    text_to_check = (title + " " + description).lower()
-    for keyword_obj in keywords:
-        if keyword_obj['word'].lower() in text_to_check:
-            matched_category_id = keyword_obj.get('category_id')
-            break
+    matched_category_id = _first_keyword_category(matcher, keywords, title + " " + description)
 
     publication_date_str = _find_date(content_area)
     if publication_date_str:
         print(f"Found date: {publication_date_str} in {page_url}")
 
-    if title and (description or any(k['word'].lower() in title.lower() for k in keywords)):
+    if title and (description or matcher.search(title)):
         extracted_items.append({
             'title': title,
             'description': description if description else "Keyword found in title, no separate description snippet.",
             'publication_date': publication_date_str if publication_date_str else "Not found",
+            'publication_date_iso': _iso(publication_date_str),
             'url': page_url,
             'source': source_municipality_name,
             'type': 'HTML Page',
@@ -125,6 +104,7 @@ def extract_data_from_html_page(page_url: str, html_content: str, keywords: list
             'title': f"Notification from {source_municipality_name}",
             'description': description,
             'publication_date': publication_date_str if publication_date_str else "Not found",
+            'publication_date_iso': _iso(publication_date_str),
             'url': page_url,
             'source': source_municipality_name,
             'type': 'HTML Page',
@@ -132,8 +112,10 @@ def extract_data_from_html_page(page_url: str, html_content: str, keywords: list
         })
     return extracted_items
 
+@metrics.EXTRACTION_SECONDS.time(source="pdf")
 def extract_data_from_pdf_text(pdf_url: str, pdf_text: str, keywords: list[dict], source_municipality_name: str) -> list[dict]:
     """Extracts relevant data from the text of a PDF."""
+    matcher = keyword_matcher(keywords)
     extracted_items = []
     lines = [line.strip() for line in pdf_text.split('\n') if line.strip()]
     title_candidate = ""
@@ -144,48 +126,41 @@ def extract_data_from_pdf_text(pdf_url: str, pdf_text: str, keywords: list[dict]
                 continue
             if 5 < len(potential_title) < 200:
                 title_candidate = potential_title
-                if any(k['word'].lower() in title_candidate.lower() for k in keywords) or any(x in title_candidate.lower() for x in ["bekanntmachung", "amtsblatt", "information", "satzung", "verordnung"]):
+                if matcher.search(title_candidate) or any(x in title_candidate.lower() for x in ["bekanntmachung", "amtsblatt", "information", "satzung", "verordnung"]):
                     break
         if not title_candidate and lines:
             title_candidate = lines[0][:150] + "..." if len(lines[0]) > 150 else lines[0]
 
     description_snippets = []
-    text_lower = pdf_text.lower()
-    found_keywords_in_pdf_body = False
-    for keyword_obj in keywords:
-        keyword = keyword_obj['word'].lower()
-        if keyword in text_lower:
-            found_keywords_in_pdf_body = True
-            try:
-                keyword_pos = text_lower.find(keyword)
-                start_pos = max(0, keyword_pos - 150)
-                end_pos = min(len(pdf_text), keyword_pos + len(keyword) + 250)
-                snippet_raw = pdf_text[start_pos:end_pos].replace('\n', ' ').strip()
-                snippet = f"[Keyword: {keyword_obj['word']}] ...{re.sub(r'\s+', ' ', snippet_raw)}..."
-                if snippet not in description_snippets:
-                    description_snippets.append(snippet)
-                if len(description_snippets) >= 3:
-                    break
-            except Exception: pass
+    # One pass over the whole text; snippets at the first occurrence, in keyword list order
+    first = matcher.first_occurrences(pdf_text)
+    found_keywords_in_pdf_body = bool(first)
+    for index in sorted(first):
+        hit = first[index]
+        start_pos = max(0, hit.start - 150)
+        end_pos = min(len(pdf_text), hit.end + 250)
+        snippet_raw = pdf_text[start_pos:end_pos].replace('\n', ' ').strip()
+        snippet_text = re.sub(r'\s+', ' ', snippet_raw)
+        snippet = f"[Keyword: {keywords[index]['word']}] ...{snippet_text}..."
+        if snippet not in description_snippets:
+            description_snippets.append(snippet)
+        if len(description_snippets) >= MAX_PDF_SNIPPETS:
+            break
     description = " | ".join(description_snippets)
 
     # Determine category
-    matched_category_id = None
-    text_to_check = (title_candidate + " " + description).lower()
-    for keyword_obj in keywords:
-        if keyword_obj['word'].lower() in text_to_check:
-            matched_category_id = keyword_obj.get('category_id')
-            break
+    matched_category_id = _first_keyword_category(matcher, keywords, title_candidate + " " + description)
 
     publication_date_str = _find_date(pdf_text)
     if publication_date_str:
         print(f"Found date string in PDF '{publication_date_str}' for {pdf_url}")
 
-    if found_keywords_in_pdf_body or any(k['word'].lower() in title_candidate.lower() for k in keywords):
+    if found_keywords_in_pdf_body or matcher.search(title_candidate):
         extracted_items.append({
             'title': title_candidate if title_candidate else "PDF Content (Title not reliably extracted)",
             'description': description if description else "Keyword found in PDF.",
             'publication_date': publication_date_str if publication_date_str else "Not found",
+            'publication_date_iso': _iso(publication_date_str),
             'url': pdf_url,
             'source': source_municipality_name,
             'type': 'PDF',
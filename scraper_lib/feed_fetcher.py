@@ -8,6 +8,8 @@ import re
 from datetime import datetime
 from typing import Optional
 
+from .keyword_matcher import keyword_matcher
+
 try:
     import feedparser
     _FEEDPARSER_OK = True
@@ -54,8 +56,7 @@ def fetch_feed(url: str, keywords: list[dict], source_name: str) -> list[dict]:
     if feed.bozo and not feed.entries:
         raise ValueError(f"Failed to parse feed at {url}: {feed.bozo_exception}")
 
-    kw_list = [k["word"].lower() for k in keywords]
-    kw_map = {k["word"].lower(): k.get("category_id") for k in keywords}
+    matcher = keyword_matcher(keywords)
 
     results: list[dict] = []
     for entry in feed.entries:
@@ -66,14 +67,11 @@ def fetch_feed(url: str, keywords: list[dict], source_name: str) -> list[dict]:
         if not link:
             continue
 
-        combined = (title + " " + summary).lower()
-
-        matched_kw = next(
-            (kw for kw in kw_list if kw in combined),
-            None,
-        )
-        if not matched_kw:
+        # First keyword of the list that occurs in title or summary
+        matched = {hit.index for hit in matcher.find_all(title + " " + summary)}
+        if not matched:
             continue
+        matched_kw = keywords[min(matched)]
 
         # Publication date
         pub_date = ""
@@ -99,7 +97,8 @@ def fetch_feed(url: str, keywords: list[dict], source_name: str) -> list[dict]:
             "source": source_name,
             "type": "rss",
             "publication_date": pub_date,
-            "category_id": kw_map.get(matched_kw),
+            "publication_date_iso": pub_date or None,
+            "category_id": matched_kw.get("category_id"),
         })
 
     return results
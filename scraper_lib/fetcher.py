@@ -1,61 +1,197 @@
+import io
+from typing import Iterable, Iterator
+
 import requests
-import tempfile
-import os
+import threading
+import time
 from PyPDF2 import PdfReader
 
+from .dates import DATE_SEARCH_LIMIT
+from .extractor import MAX_PDF_SNIPPETS
+from .keyword_matcher import keyword_matcher
 from .ocr import extract_text_with_ocr
+from .rate_limiter import HostRateLimiter
+from .http_cache import HttpCache
+from .target_stats import TargetStats
+from . import metrics
+
+class PdfTooLarge(Exception):
+    """The response is larger than the configured limit; it is not downloaded (further)."""
+
+class PdfUnreadable(Exception):
+    """The PDF cannot be read (e.g. encrypted with a password)."""
+
+def _limited_get(session: requests.Session, url: str, timeout: int,
+                 rate_limiter: HostRateLimiter | None, headers: dict | None = None,
+                 stream: bool = False, cancel_event: threading.Event | None = None) -> requests.Response:
+    """GET through the per-host rate limiter, reporting latency and status back to it."""
+    if rate_limiter is not None:
+        rate_limiter.acquire(url, cancel_event)
+    start = time.monotonic()
+    try:
+        response = session.get(url, timeout=timeout, headers=headers, stream=stream)
+    except requests.exceptions.RequestException:
+        metrics.HTTP_RESPONSES.inc(engine="requests", status="error")
+        if rate_limiter is not None:
+            rate_limiter.record(url, time.monotonic() - start)
+        raise
+    metrics.HTTP_RESPONSES.inc(engine="requests", status=response.status_code)
+    if rate_limiter is not None:
+        rate_limiter.record(url, time.monotonic() - start, response.status_code,
+                            response.headers.get("Retry-After"))
+    return response
+
+def check_content_length(headers, url: str, max_bytes: int | None) -> None:
+    """Raise PdfTooLarge if the announced Content-Length exceeds ``max_bytes``."""
+    if max_bytes is None:
+        return
+    announced = headers.get("Content-Length")
+    if announced and announced.isdigit() and int(announced) > max_bytes:
+        raise PdfTooLarge(f"{url} is {int(announced) / 1048576:.1f} MB (limit {max_bytes / 1048576:.0f} MB)")
+
+def read_capped(chunks: Iterable[bytes], url: str, max_bytes: int | None) -> bytes:
+    """Join streamed body chunks, aborting as soon as more than ``max_bytes`` arrived."""
+    buffer = io.BytesIO()
+    for chunk in chunks:
+        buffer.write(chunk)
+        if max_bytes is not None and buffer.tell() > max_bytes:
+            raise PdfTooLarge(f"{url} exceeds the limit of {max_bytes / 1048576:.0f} MB")
+    return buffer.getvalue()
 
-def fetch_html(session: requests.Session, url: str) -> str | None:
+def _get_body(session: requests.Session, url: str, timeout: int, rate_limiter: HostRateLimiter | None,
+              cache: HttpCache | None, stats: TargetStats | None = None,
+              kind: str = "html", max_bytes: int | None = None,
+              cancel_event: threading.Event | None = None) -> tuple[bytes, str | None]:
+    """
+    GETs a URL, revalidating against the HTTP cache when one is given.
+    Returns (body, encoding); a 304 answer is served from the cache.
+    With ``max_bytes`` the body is streamed: a response whose Content-Length is
+    over the limit is closed before its body is read, one without
+    Content-Length is aborted as soon as it exceeds the limit (PdfTooLarge).
+    """
+    stream = max_bytes is not None
+    if cache is not None:
+        response = _limited_get(session, url, timeout, rate_limiter, cache.conditional_headers(url), stream,
+                                cancel_event)
+        if response.status_code == 304:
+            response.close()
+            cached = cache.get(url)
+            if cached is not None:
+                if stats:
+                    stats.record_fetch(0, cached=True)
+                return cached
+            # Entry vanished between revalidation and read: fetch it in full
+            response = _limited_get(session, url, timeout, rate_limiter, stream=stream, cancel_event=cancel_event)
+    else:
+        response = _limited_get(session, url, timeout, rate_limiter, stream=stream, cancel_event=cancel_event)
+    with response:
+        response.raise_for_status()
+        check_content_length(response.headers, url, max_bytes)
+        body = read_capped(response.iter_content(64 * 1024), url, max_bytes) if stream else response.content
+        encoding = response.encoding or (response.apparent_encoding if not stream else None)
+    if cache is not None:
+        cache.store(url, response.headers, body, encoding)
+    metrics.FETCH_BYTES.observe(len(body), engine="requests", kind=kind)
+    if stats:
+        stats.record_fetch(len(body))
+    return body, encoding
+
+def fetch_html(session: requests.Session, url: str, rate_limiter: HostRateLimiter | None = None,
+               cache: HttpCache | None = None, stats: TargetStats | None = None,
+               cancel_event: threading.Event | None = None) -> str | None:
     """Fetches HTML content from a URL."""
     print(f"Fetching: {url}")
     try:
-        response = session.get(url, timeout=20)
-        response.raise_for_status()
-        return response.text
+        with metrics.FETCH_SECONDS.time(engine="requests", kind="html"):
+            body, encoding = _get_body(session, url, 20, rate_limiter, cache, stats, cancel_event=cancel_event)
+        return body.decode(encoding or 'utf-8', errors='replace')
     except requests.exceptions.RequestException as e:
         print(f"Error fetching {url}: {e}")
+        if stats:
+            stats.record_error()
         return None
 
-def download_pdf_to_text(session: requests.Session, pdf_url: str) -> str | None:
+def iter_pdf_page_texts(content: bytes, pdf_url: str, max_pages: int | None = None) -> Iterator[str]:
     """
-    Downloads a PDF, extracts text, and uses OCR as a fallback.
-    Returns the extracted text or None on failure.
+    Yields the text of the PDF's pages one at a time, reading the PDF from
+    memory; stops after ``max_pages``. Raises PdfUnreadable for encrypted PDFs.
     """
-    print(f"Downloading PDF: {pdf_url}")
-    temp_pdf_path = None
+    reader = PdfReader(io.BytesIO(content))
+    if reader.is_encrypted:
+        try:
+            reader.decrypt('')
+        except Exception:
+            raise PdfUnreadable(f"Could not decrypt PDF {pdf_url}")
+    for number, page in enumerate(reader.pages):
+        if max_pages is not None and number >= max_pages:
+            print(f"Page limit reached: read {max_pages} of {len(reader.pages)} pages of {pdf_url}")
+            metrics.PDF_SKIPPED.inc(reason="page_limit")
+            return
+        metrics.PDF_PAGES.inc()
+        yield page.extract_text() or ""
+
+def pdf_bytes_to_text(content: bytes, pdf_url: str, keywords: list[dict] | None = None,
+                      max_pages: int | None = None) -> str | None:
+    """
+    Extracts text from raw PDF bytes, using OCR as a fallback.
+    With ``keywords``, pages are read only until enough keyword snippets (and
+    the text the date search looks at) are available, so a match on page 2 of
+    a 300-page protocol does not cost all 300 pages.
+    Returns the extracted text or None if nothing could be extracted.
+    """
+    with metrics.PDF_TEXT_SECONDS.time():
+        return _pdf_bytes_to_text(content, pdf_url, keywords, max_pages)
+
+def _pdf_bytes_to_text(content: bytes, pdf_url: str, keywords: list[dict] | None,
+                       max_pages: int | None) -> str | None:
+    matcher = keyword_matcher(keywords) if keywords else None
+    found: set[int] = set()
+    pages: list[str] = []
+    length = 0
     try:
-        response = session.get(pdf_url, timeout=45)
-        response.raise_for_status()
+        page_texts = iter_pdf_page_texts(content, pdf_url, max_pages)
+        for page_text in page_texts:
+            if page_text:
+                pages.append(page_text + "\n")
+                length += len(page_text) + 1
+            if matcher is None:
+                continue
+            found.update(matcher.first_occurrences(page_text))
+            if len(found) >= MAX_PDF_SNIPPETS and length >= DATE_SEARCH_LIMIT:
+                print(f"Enough keyword matches after {len(pages)} pages, not reading the rest of {pdf_url}")
+                metrics.PDF_SKIPPED.inc(reason="early_exit")
+                page_texts.close()
+                break
+    except PdfUnreadable as e:
+        print(e)
+        return None
+    except Exception as e:
+        print(f"PyPDF2 error while reading {pdf_url}: {e}.")
+    text = "".join(pages)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(response.content)
-            temp_pdf_path = tmp_file.name
+    if not text.strip():
+        print(f"Warning: No text extracted from PDF, using OCR fallback: {pdf_url}")
+        text = extract_text_with_ocr(content, max_pages)
 
-        text = ""
-        try:
-            with open(temp_pdf_path, 'rb') as f:
-                reader = PdfReader(f)
-                if reader.is_encrypted:
-                    try:
-                        reader.decrypt('')
-                    except Exception:
-                        print(f"Could not decrypt PDF {pdf_url}")
-                        return None
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            print(f"PyPDF2 error while reading {pdf_url}: {e}.")
-
-        if not text.strip():
-            print(f"Warning: No text extracted from PDF, using OCR fallback: {pdf_url}")
-            text = extract_text_with_ocr(temp_pdf_path)
-
-        return text if text.strip() else None
+    return text if text.strip() else None
+
+def fetch_pdf_bytes(session: requests.Session, pdf_url: str,
+                    rate_limiter: HostRateLimiter | None = None,
+                    cache: HttpCache | None = None, stats: TargetStats | None = None,
+                    max_bytes: int | None = None, cancel_event: threading.Event | None = None) -> bytes | None:
+    """Downloads a PDF and returns its raw bytes, or None on failure or if it is over ``max_bytes``."""
+    print(f"Downloading PDF: {pdf_url}")
+    try:
+        with metrics.FETCH_SECONDS.time(engine="requests", kind="pdf"):
+            content, _ = _get_body(session, pdf_url, 45, rate_limiter, cache, stats, kind="pdf",
+                                   max_bytes=max_bytes, cancel_event=cancel_event)
+        return content
+    except PdfTooLarge as e:
+        print(f"Skipping PDF: {e}")
+        metrics.PDF_SKIPPED.inc(reason="too_large")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Error downloading PDF {pdf_url}: {e}")
+        if stats:
+            stats.record_error()
         return None
-    finally:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Content fingerprints for skipping unchanged pages.
+
+A page or PDF whose body hash *and* keyword-set version match the previous run
+cannot yield anything new: its results were already extracted and stored. The
+scrapers consult a ``FingerprintTracker`` right after fetching and skip parsing
+and extraction for such URLs.
+"""
+
+from __future__ import annotations
+import hashlib
+
+
+def content_hash(body: str | bytes) -> str:
+    """SHA-256 of a response body."""
+    if isinstance(body, str):
+        body = body.encode("utf-8", errors="replace")
+    return hashlib.sha256(body).hexdigest()
+
+
+def keyword_set_version(keywords: list[dict]) -> str:
+    """Stable version string of a keyword set; changes whenever a word or its category does."""
+    canonical = "\n".join(sorted(f"{k['word'].lower()}|{k.get('category_id')}" for k in keywords))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class FingerprintTracker:
+    """Per-target view of the fingerprint table used during one scrape.
+
+    ``known`` maps URL -> (content_hash, keyword_version) from the previous
+    runs. New or changed fingerprints are collected in ``changed`` so the
+    caller can persist them together with the results.
+    """
+
+    def __init__(self, known: dict[str, tuple[str, str]] | None, keyword_version: str):
+        self.known = known or {}
+        self.keyword_version = keyword_version
+        self.changed: dict[str, str] = {}
+        self.pages_skipped = 0
+        self.pages_processed = 0
+
+    def unchanged(self, url: str, body: str | bytes) -> bool:
+        """True if the body was already processed with the current keyword set."""
+        digest = content_hash(body)
+        if self.known.get(url) == (digest, self.keyword_version):
+            self.pages_skipped += 1
+            return True
+        self.known[url] = (digest, self.keyword_version)
+        self.changed[url] = digest
+        self.pages_processed += 1
+        return False
+
+    def discard(self, url: str) -> None:
+        """Drop the fingerprint taken for ``url`` in this scrape, so the next run processes it again
+        (its text could not be extracted, e.g. after a PDF or OCR error)."""
+        if self.changed.pop(url, None) is not None:
+            self.known.pop(url, None)
@@ -0,0 +1,191 @@
+"""
+The crawl frontier of one target site: the HTML pages and PDFs still to fetch.
+
+Links are deduplicated by their canonical form (``canonicalize_url``), so
+``/aktuelles/``, ``/aktuelles#top`` and ``/aktuelles;jsessionid=…`` cost one
+fetch, not three. Membership is a set lookup, so adding the hundreds of links
+of a large hub page stays linear.
+
+Budgets:
+
+* ``max_html`` / ``max_pdf`` — pages and PDFs fetched per site,
+* ``max_hub_depth`` — hub pages (``NAV_KEYWORDS`` in the URL) are expanded up
+  to this many levels below the start page; links on the start page have
+  depth 1, 0 turns hub expansion off,
+* ``max_per_external_host`` — fetches (pages and PDFs) per host other than
+  the site's own, so a link list pointing at the district's or the state's
+  portal cannot use up the site's budget (0/None = unlimited).
+
+Links are taken best first: ``add_links`` ranks them with a ``LinkScorer``
+(see link_scoring.py), so a fixed budget reaches the pages and PDFs that name
+the keywords before generic overview pages.
+
+The URL that is fetched is the first spelling seen, not the canonical form:
+dropping a trailing slash could turn a relative link on that page into a
+different URL.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .constants import NAV_KEYWORDS
+from .parser import FoundLink
+
+if TYPE_CHECKING:
+    from .link_scoring import LinkScorer
+
+# Query parameters that identify a session or a campaign, not a document
+SESSION_PARAMS = frozenset({
+    "jsessionid", "phpsessid", "sid", "sessionid", "session_id", "cfid", "cftoken",
+    "fbclid", "gclid", "mc_cid", "mc_eid",
+})
+_TRACKING_PREFIXES = ("utm_",)
+# ";jsessionid=…" path parameters (Java/ColdFusion CMS)
+_PATH_SESSION = re.compile(r";(?:jsessionid|phpsessid|sid)=[^/?#]*", re.IGNORECASE)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def is_session_param(name: str) -> bool:
+    name = name.lower()
+    return name in SESSION_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    The dedup key of a URL: lower-case scheme and host, no default port, no
+    fragment, no session/tracking parameters, sorted query, no trailing slash.
+    Pagination and other query parameters are kept (``?page=2`` is another page).
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if ":" in host:  # IPv6 literal
+        host = f"[{host}]"
+    netloc = host if port is None or _DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    path = _PATH_SESSION.sub("", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_session_param(name)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def host_of(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").removeprefix("www.")
+    except ValueError:
+        return ""
+
+
+def is_hub_url(url: str) -> bool:
+    """Overview pages (news, announcements, …) whose links are followed as well."""
+    lowered = url.lower()
+    return any(nav in lowered for nav in NAV_KEYWORDS)
+
+
+class Frontier:
+    """HTML and PDF links of one site still to fetch, best score first (ties in discovery order)."""
+
+    def __init__(self, site_url: str, max_html: int, max_pdf: int, max_hub_depth: int = 2,
+                 max_per_external_host: int | None = None, scorer: LinkScorer | None = None):
+        self.site_host = host_of(site_url)
+        self.max_html = max_html
+        self.max_pdf = max_pdf
+        self.max_hub_depth = max_hub_depth
+        self.max_per_external_host = max_per_external_host or None
+        self.scorer = scorer
+        self._seen: set[str] = {canonicalize_url(site_url)}
+        # Heaps of (-score, seq, url, depth); seq keeps equal scores in discovery order
+        self._html: list[tuple[float, int, str, int]] = []
+        self._pdf: list[tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._host_fetches: Counter[str] = Counter()
+        self.html_taken = 0
+        self.pdf_taken = 0
+        self.duplicates = 0
+        self.over_host_budget = 0
+
+    def __len__(self) -> int:
+        return len(self._html) + len(self._pdf)
+
+    def _is_new(self, url: str) -> bool:
+        key = canonicalize_url(url)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        return True
+
+    def _push(self, heap: list, url: str, depth: int, score: float) -> bool:
+        if not self._is_new(url):
+            return False
+        heapq.heappush(heap, (-score, next(self._seq), url, depth))
+        return True
+
+    def add_html(self, urls: Iterable[str], depth: int = 1, score: float = 0.0) -> int:
+        """Queue HTML links found at ``depth``; returns how many were new."""
+        return sum(self._push(self._html, url, depth, score) for url in urls)
+
+    def add_pdfs(self, urls: Iterable[str], score: float = 0.0) -> int:
+        """Queue PDF links; returns how many were new."""
+        return sum(self._push(self._pdf, url, 0, score) for url in urls)
+
+    def add_links(self, links: Iterable[FoundLink], depth: int = 1) -> int:
+        """Queue the links of a page found at ``depth``, ranked by the scorer; returns how many were new."""
+        added = 0
+        for link in links:
+            score = self.scorer.score(link) if self.scorer is not None else 0.0
+            added += self._push(self._pdf if link.is_pdf else self._html, link.url, depth, score)
+        return added
+
+    def should_expand(self, url: str, depth: int) -> bool:
+        """Whether the links of the page at ``url`` (found at ``depth``) are followed."""
+        return depth <= self.max_hub_depth and is_hub_url(url)
+
+    def _within_host_budget(self, url: str) -> bool:
+        host = host_of(url)
+        if self.max_per_external_host is None or host == self.site_host:
+            return True
+        if self._host_fetches[host] >= self.max_per_external_host:
+            self.over_host_budget += 1
+            return False
+        self._host_fetches[host] += 1
+        return True
+
+    def _take(self, heap: list, budget: int, limit: int | None) -> list[tuple[str, int]]:
+        taken: list[tuple[str, int]] = []
+        while heap and len(taken) < budget and (limit is None or len(taken) < limit):
+            _, _, url, depth = heapq.heappop(heap)
+            if self._within_host_budget(url):
+                taken.append((url, depth))
+        return taken
+
+    def take_html(self, limit: int | None = None) -> list[tuple[str, int]]:
+        """Up to ``limit`` best queued pages as (url, depth), within the page and host budgets."""
+        taken = self._take(self._html, self.max_html - self.html_taken, limit)
+        self.html_taken += len(taken)
+        return taken
+
+    def next_html(self) -> tuple[str, int] | None:
+        taken = self.take_html(1)
+        return taken[0] if taken else None
+
+    def take_pdfs(self, limit: int | None = None) -> list[str]:
+        """Up to ``limit`` best queued PDFs, within the PDF and host budgets."""
+        taken = self._take(self._pdf, self.max_pdf - self.pdf_taken, limit)
+        self.pdf_taken += len(taken)
+        return [url for url, _ in taken]
+
+    def summary(self) -> str:
+        return (f"{self.html_taken} pages and {self.pdf_taken} PDFs fetched, "
+                f"{self.duplicates} duplicate links skipped, "
+                f"{self.over_host_budget} over the per-host budget")
@@ -0,0 +1,185 @@
+"""
+Persistent HTTP cache for conditional GETs.
+
+Stores the body and the validators (``ETag`` / ``Last-Modified``) of every
+response that has at least one of them. On the next request the fetcher sends
+``If-None-Match`` / ``If-Modified-Since``; a ``304 Not Modified`` answer is
+served from disk instead of downloading the page or PDF again.
+
+Layout inside the cache directory::
+
+    index.sqlite3       url -> validators, encoding, size, last access
+    bodies/<sha256>     raw response bodies
+
+The cache is bounded by ``max_bytes``: when a store pushes it over the limit,
+the least recently used entries are evicted.
+
+The index is shared by the web app and the standalone scrape workers. Writers
+wait up to ``BUSY_TIMEOUT_SECONDS`` for each other; if the index still cannot
+be read or written, the request is treated as a cache miss and fetched in full.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Mapping, Optional
+
+BUSY_TIMEOUT_SECONDS = 10
+
+
+class HttpCache:
+    """Thread-safe on-disk cache of response bodies and their validators."""
+
+    def __init__(self, directory: str, max_bytes: int = 500 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False,
+                                   timeout=BUSY_TIMEOUT_SECONDS)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " encoding TEXT, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, "bodies", key)
+
+    def _failed(self, action: str, url: str, error: sqlite3.Error) -> None:
+        print(f"HTTP cache unavailable ({action} {url}): {error}; fetching without cache")
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Request headers that let the server answer 304 for a cached URL."""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT etag, last_modified FROM entries WHERE key = ?", (self._key(url),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._failed("lookup", url, e)
+                return {}
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, url: str) -> Optional[tuple[bytes, Optional[str]]]:
+        """Return ``(body, encoding)`` for a cached URL after a 304 and count the hit."""
+        key = self._key(url)
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT encoding FROM entries WHERE key = ?", (key,)).fetchone()
+                if not row:
+                    return None
+                try:
+                    with open(self._body_path(key), "rb") as f:
+                        body = f.read()
+                except OSError:
+                    self._delete(key)
+                    self._db.commit()
+                    return None
+                self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._failed("read", url, e)
+                return None
+            self.hits += 1
+            self.bytes_saved += len(body)
+        return body, row[0]
+
+    def store(self, url: str, headers: Mapping[str, str], body: bytes, encoding: Optional[str] = None) -> None:
+        """Record a full (200) download; cache it if the server sent validators."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        key = self._key(url)
+        with self._lock:
+            self.misses += 1
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                return
+            with open(self._body_path(key), "wb") as f:
+                f.write(body)
+            total_bytes = self._total_bytes
+            try:
+                old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._total_bytes += len(body) - (old[0] if old else 0)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, url, etag, last_modified, encoding, size, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, etag, last_modified, encoding, len(body), time.time()),
+                )
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error as e:
+                # Not cached this time; the body file is overwritten by the next store
+                self._total_bytes = total_bytes
+                self._failed("store", url, e)
+
+    def _delete(self, key: str) -> None:
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._total_bytes -= row[0]
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits into max_bytes."""
+        while self._total_bytes > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT key FROM entries ORDER BY last_access LIMIT 50"
+            ).fetchall()
+            if not oldest:
+                break
+            for (key,) in oldest:
+                self._delete(key)
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def reset_counters(self) -> None:
+        """Start a fresh hit/miss count, e.g. at the beginning of a scrape run."""
+        with self._lock:
+            self.hits = self.misses = self.bytes_saved = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+            }
+
+    def summary(self) -> str:
+        """One-line summary for the scrape log."""
+        s = self.stats()
+        return (
+            f"HTTP cache: {s['hits']} hits / {s['misses']} misses, "
+            f"{s['bytes_saved'] / 1_048_576:.1f} MB saved, "
+            f"{s['entries']} entries ({s['size_bytes'] / 1_048_576:.1f} MB)"
+        )
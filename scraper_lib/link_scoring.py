@@ -0,0 +1,99 @@
+"""
+Priorities for the crawl frontier: which links a site's fetch budget goes to.
+
+A link's score combines
+
+* the keywords in its anchor text (``ANCHOR_WEIGHT``) and URL (``URL_WEIGHT``),
+  each weighted by the keyword's category weight (``weight`` in the keyword
+  dicts, default 1),
+* its type: overview pages matched only by ``NAV_KEYWORDS`` get ``NAV_SCORE``,
+  below any link that names a keyword in its text,
+* the past yield of its URL pattern: the smoothed share of fetched pages of
+  that pattern that produced results, as a factor between 0.5 (never) and
+  1.5 (always); unseen patterns keep their score.
+
+A URL pattern is the host, the directory with digit runs replaced by ``#``,
+the file extension and the names of the query parameters
+("example.de/aktuelles/#/*.html", "example.de/*.php?id"). CMS templates put
+the pages of one kind under one pattern, so what the last runs learned about
+"/bekanntmachungen/#/*" applies to tomorrow's new notice as well.
+
+``PatternYield`` holds the counts of one target; like the fingerprints, the
+webapp loads it before and stores ``changed`` after a scrape.
+"""
+
+from __future__ import annotations
+import re
+from urllib.parse import parse_qsl, urlsplit
+
+from .frontier import host_of, is_session_param
+from .keyword_matcher import keyword_matcher
+from .parser import FoundLink
+
+ANCHOR_WEIGHT = 2.0
+URL_WEIGHT = 1.0
+NAV_SCORE = 1.0
+
+_DIGITS = re.compile(r"\d+")
+
+
+def url_pattern(url: str) -> str:
+    """The template a URL belongs to, e.g. "example.de/aktuelles/#/*.html"."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    directory, _, last = parts.path.rpartition("/")
+    extension = last.rsplit(".", 1)[1].lower() if "." in last else ""
+    pattern = f"{host_of(url)}{_DIGITS.sub('#', directory.lower())}/*"
+    if extension:
+        pattern += f".{extension}"
+    names = sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)
+                    if not is_session_param(name)})
+    if names:
+        pattern += "?" + "&".join(names)
+    return pattern
+
+
+class PatternYield:
+    """Per-target counts of fetched pages and pages with results, by URL pattern.
+
+    ``known`` maps pattern -> (fetched, matched) from previous runs; patterns
+    updated during this scrape are collected in ``changed``.
+    """
+
+    def __init__(self, known: dict[str, tuple[int, int]] | None = None):
+        self.known = known or {}
+        self.changed: set[str] = set()
+
+    def record(self, url: str, matched: bool) -> None:
+        pattern = url_pattern(url)
+        fetched, hits = self.known.get(pattern, (0, 0))
+        self.known[pattern] = (fetched + 1, hits + int(matched))
+        self.changed.add(pattern)
+
+    def factor(self, url: str) -> float:
+        """Score factor: 1.0 for unseen patterns, towards 0.5 / 1.5 for barren / productive ones."""
+        fetched, hits = self.known.get(url_pattern(url), (0, 0))
+        return 0.5 + (hits + 1) / (fetched + 2)
+
+
+class LinkScorer:
+    """Scores ``FoundLink``s for one keyword set and one target's yield history."""
+
+    def __init__(self, keywords: list[dict], yields: PatternYield | None = None):
+        self.matcher = keyword_matcher(keywords)
+        self.weights = [float(k.get("weight") or 1.0) for k in keywords]
+        self.yields = yields
+
+    def score(self, link: FoundLink) -> float:
+        parts = urlsplit(link.url.lower())
+        in_text = self.matcher.first_occurrences(link.text)
+        in_url = self.matcher.first_occurrences(f"{parts.path}?{parts.query}")
+        score = (sum(ANCHOR_WEIGHT * self.weights[index] for index in in_text)
+                 + sum(URL_WEIGHT * self.weights[index] for index in in_url))
+        if link.is_nav:
+            score += NAV_SCORE
+        if self.yields is not None:
+            score *= self.yields.factor(link.url)
+        return score
@@ -0,0 +1,144 @@
+"""
+Link-only parsing: the ``<a href>`` targets and anchor texts of a page without
+building a tree.
+
+Hub pages ("aktuelles", "bekanntmachungen") are long listings of which link
+discovery needs nothing but the anchors. ``extract_anchors`` runs the same
+tokenizer as the BeautifulSoup tree builder of ``document.DEFAULT_PARSER``
+(lxml's libxml2 parser when installed, else ``html.parser``) with a parser
+target that only tracks the open elements and the text inside anchors; no
+node objects are created. It returns what
+
+    [(a["href"], a.get_text(separator=" ", strip=True)) for a in soup.find_all("a", href=True)]
+
+returns for the tree, including the tree builders' quirks: the first of two
+duplicate ``href`` attributes with lxml, the last with html.parser; text of
+``<script>``/``<style>`` and comments left out; an unclosed anchor ending where
+the tree builder would close it.
+"""
+
+from __future__ import annotations
+from html.parser import HTMLParser
+
+from .document import DEFAULT_PARSER
+
+# Elements without content; html.parser never sends an end tag for them
+_VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image",
+    "isindex", "nextid", "spacer",
+})
+_NO_TEXT = frozenset({"script", "style", "template"})
+
+
+class _AnchorCollector:
+    """Parser target (lxml interface) collecting (href, text parts) of every anchor."""
+
+    def __init__(self):
+        self.anchors: list[tuple[str, list[str]]] = []
+        # Open elements as (tag, text parts if it is an <a href>, else None)
+        self._open: list[tuple[str, list[str] | None]] = []
+        self._open_anchors = 0
+        self._no_text = 0
+        self._text: list[str] = []
+
+    def flush(self) -> None:
+        # Adjacent data events form one text node in the tree; strip() applies to the node
+        if not self._text:
+            return
+        text = "".join(self._text).strip()
+        self._text.clear()
+        if text:
+            for _, parts in self._open:
+                if parts is not None:
+                    parts.append(text)
+
+    def start(self, tag: str, attrib) -> None:
+        self.flush()
+        if tag in _VOID_ELEMENTS:
+            return
+        parts = None
+        if tag == "a":
+            href = attrib.get("href", False)
+            if href is not False:
+                parts = []
+                self.anchors.append((href or "", parts))
+                self._open_anchors += 1
+        elif tag in _NO_TEXT:
+            self._no_text += 1
+        self._open.append((tag, parts))
+
+    def end(self, tag: str) -> None:
+        self.flush()
+        # Like the tree builders: close everything up to the innermost open element
+        # of that name; an end tag without a matching start tag is ignored
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index][0] == tag:
+                break
+        else:
+            return
+        for closed, parts in self._open[index:]:
+            if parts is not None:
+                self._open_anchors -= 1
+            elif closed in _NO_TEXT:
+                self._no_text -= 1
+        del self._open[index:]
+
+    def data(self, data: str) -> None:
+        if self._open_anchors and not self._no_text:
+            self._text.append(data)
+
+    def comment(self, text: str) -> None:
+        self.flush()
+
+    def close(self) -> list[tuple[str, str]]:
+        self.flush()
+        return [(href, " ".join(parts)) for href, parts in self.anchors]
+
+
+class _StdlibAnchorParser(HTMLParser):
+    """Drives an _AnchorCollector from html.parser events."""
+
+    def __init__(self, target: _AnchorCollector):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        # dict(): the last of duplicate attributes wins, as in BeautifulSoup's html.parser builder
+        self.target.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def handle_comment(self, data):
+        self.target.comment(data)
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> is text for BeautifulSoup's html.parser builder
+        self.target.flush()
+        if data.startswith("CDATA["):
+            self.target.data(data[6:])
+        self.target.flush()
+
+
+def extract_anchors(html: str, parser: str | None = None) -> list[tuple[str, str]]:
+    """(href, anchor text) of every ``<a href>`` of ``html``, in document order."""
+    collector = _AnchorCollector()
+    if (parser or DEFAULT_PARSER) == "lxml":
+        from lxml import etree
+
+        lxml_parser = etree.HTMLParser(target=collector)
+        lxml_parser.feed(html)
+        return lxml_parser.close()
+    stdlib_parser = _StdlibAnchorParser(collector)
+    stdlib_parser.feed(html)
+    stdlib_parser.close()
+    return collector.close()
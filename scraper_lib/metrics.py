@@ -0,0 +1,220 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A tiny registry of labelled counters and histograms; ``render()`` produces the
+text that ``GET /api/metrics`` returns. Nothing is pushed anywhere and there is
+no client library dependency: a Prometheus server simply scrapes the endpoint.
+
+The scraper hot paths (fetches, PDF text, OCR, extraction) are instrumented
+with the metrics defined at the bottom of this module; the webapp registers
+its own (route latency, DB inserts, notifications) through the same helpers.
+"""
+
+from __future__ import annotations
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Iterable
+
+# Latency buckets in seconds, from a cached 304 up to a long OCR run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000, 100_000_000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class _Timer(ContextDecorator):
+    """Observes the duration of a block (or a decorated function) into a histogram."""
+
+    def __init__(self, histogram: "Histogram", labels: dict):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels) -> _Timer:
+        """``with hist.time(kind="html"):`` or ``@hist.time(kind="html")``."""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, series):
+                    cumulative += bucket_count
+                    le = _format_labels(self.labelnames, key, f'le="{_format_number(float(bound))}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {int(series[-1])}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_number(float(series[-2]))}")
+                lines.append(f"{self.name}_count{labels} {int(series[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Re-imports (e.g. uvicorn --reload) get the already registered metric
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+
+
+# ---------------------------------------------------------------------------
+# Scraper metrics
+# ---------------------------------------------------------------------------
+
+FETCH_SECONDS = histogram(
+    "scraper_fetch_seconds", "Duration of page and PDF downloads, incl. rate-limit waits.",
+    ("engine", "kind"),
+)
+FETCH_BYTES = histogram(
+    "scraper_fetch_bytes", "Response sizes of downloaded pages and PDFs (not counting 304 revalidations).",
+    ("engine", "kind"), buckets=BYTES_BUCKETS,
+)
+HTTP_RESPONSES = counter(
+    "scraper_http_responses_total", "HTTP responses by status code; status=\"error\" for transport errors.",
+    ("engine", "status"),
+)
+PDF_TEXT_SECONDS = histogram(
+    "scraper_pdf_text_seconds", "Duration of PDF text extraction incl. the OCR fallback.",
+)
+OCR_SECONDS = histogram(
+    "scraper_ocr_seconds", "Duration of OCR runs (pdf2image + tesseract) per PDF.",
+)
+OCR_RUNS = counter("scraper_ocr_runs_total", "PDFs that needed the OCR fallback.")
+EXTRACTION_SECONDS = histogram(
+    "scraper_extraction_seconds", "Duration of keyword/data extraction per page or PDF text.", ("source",),
+)
+PDF_PAGES = counter("scraper_pdf_pages_total", "PDF pages whose text was extracted (PyPDF2, not OCR).")
+PDF_SKIPPED = counter(
+    "scraper_pdf_skipped_total", "PDFs not downloaded in full (reason=\"too_large\") or read only partly.",
+    ("reason",),
+)
+OCR_PAGES = counter("scraper_ocr_pages_total", "PDF pages rasterised and OCR'd.")
+OCR_CACHE = counter("scraper_ocr_cache_total", "OCR text cache lookups by result (hit/miss).", ("result",))
+EXTRACTION_TEMPLATES = counter(
+    "scraper_extraction_templates_total",
+    "Per-host extraction template lookups by result (hit/miss, none = host without template).", ("result",),
+)
@@ -1,13 +1,154 @@
+"""
+OCR for image-only PDFs.
+
+Scanned documents (an Amtsblatt, signed minutes) have no text layer, so their
+pages are rasterised (pdf2image/poppler) and read by tesseract. That costs
+seconds per page, so the OCR stage
+
+* runs the pages of a PDF in parallel in a process pool shared by all scrape
+  threads (OCR is CPU-bound; threads would serialise on the GIL),
+* reads at most ``max_pages`` pages, rendered at ``dpi``,
+* keeps the text in a persistent cache keyed by the SHA-256 of the PDF, so the
+  same document is never OCR'd twice, across runs and municipalities.
+
+``configure_ocr`` sets the worker count, DPI, page cap and cache directory;
+the webapp calls it when it builds a run context.
+
+Cache layout: ``<cache_dir>/<sha256>-<dpi>dpi-<pages>p.txt``.
+"""
+
+from __future__ import annotations
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
 import pytesseract
 from pdf2image import convert_from_path
+from PyPDF2 import PdfReader
+
+from . import metrics
+
+
+@dataclass(frozen=True)
+class OcrSettings:
+    workers: int = 2
+    dpi: int = 200
+    max_pages: int = 20
+    cache_dir: str | None = None
+
+
+def _ocr_page(pdf_path: str, page_number: int, dpi: int) -> str:
+    """Rasterise and OCR one page (runs in a pool process)."""
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    return "\n".join(pytesseract.image_to_string(image) for image in images)
+
+
+def _page_count(pdf_path: str) -> int:
+    with open(pdf_path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+class OcrEngine:
+    """Process pool plus text cache; one instance per process (see ``configure_ocr``)."""
+
+    def __init__(self, settings: OcrSettings = OcrSettings()):
+        self.settings = settings
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_workers = 0
+        self._lock = threading.Lock()
+
+    def configure(self, settings: OcrSettings) -> None:
+        with self._lock:
+            self.settings = settings
+            if settings.cache_dir:
+                os.makedirs(settings.cache_dir, exist_ok=True)
+            if self._pool is not None and self._pool_workers != settings.workers:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn": forking the multi-threaded API process could copy held locks
+                self._pool = ProcessPoolExecutor(max_workers=max(1, self.settings.workers),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+                self._pool_workers = self.settings.workers
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _cache_path(self, digest: str, pages: int) -> str | None:
+        if not self.settings.cache_dir:
+            return None
+        return os.path.join(self.settings.cache_dir, f"{digest}-{self.settings.dpi}dpi-{pages}p.txt")
+
+    def _ocr_pages(self, pdf_path: str, page_count: int) -> str:
+        pool = self._executor()
+        futures = [pool.submit(_ocr_page, pdf_path, number, self.settings.dpi)
+                   for number in range(1, page_count + 1)]
+        metrics.OCR_PAGES.inc(page_count)
+        return "\n".join(future.result() for future in futures)
+
+    def extract_text(self, pdf_bytes: bytes, max_pages: int | None = None) -> str:
+        pages = self.settings.max_pages if max_pages is None else min(max_pages, self.settings.max_pages)
+        cache_path = self._cache_path(hashlib.sha256(pdf_bytes).hexdigest(), pages)
+        if cache_path and os.path.exists(cache_path):
+            metrics.OCR_CACHE.inc(result="hit")
+            with open(cache_path, encoding="utf-8") as f:
+                return f.read()
+        metrics.OCR_CACHE.inc(result="miss")
+
+        metrics.OCR_RUNS.inc()
+        # The pool processes read the PDF from a file instead of receiving the bytes once per page
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            with metrics.OCR_SECONDS.time():
+                page_count = min(_page_count(pdf_path), pages)
+                text = self._ocr_pages(pdf_path, page_count)
+        except BrokenProcessPool as e:
+            print(f"OCR failed: {e}")
+            self._reset_pool()
+            return ""
+        except Exception as e:
+            print(f"OCR failed: {e}")
+            return ""
+        finally:
+            os.remove(pdf_path)
+
+        if cache_path:
+            # Write-then-rename: concurrent readers never see a half-written file
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Could not write OCR cache entry: {e}")
+        return text
+
+
+_engine = OcrEngine()
+
+
+def configure_ocr(settings: OcrSettings) -> None:
+    """Apply worker count, DPI, page cap and cache directory to this process's OCR stage."""
+    _engine.configure(settings)
+
 
-def extract_text_with_ocr(pdf_path: str) -> str:
+def extract_text_with_ocr(pdf_bytes: bytes, max_pages: int | None = None) -> str:
     """
     Extracts text from a PDF using OCR if it's an image-based PDF.
+    Reads at most ``max_pages`` pages (and never more than the configured OCR page cap).
     """
-    try:
-        images = convert_from_path(pdf_path)
-        return "\n".join(pytesseract.image_to_string(img) for img in images)
-    except Exception as e:
-        print(f"OCR failed: {e}")
-        return ""
\ No newline at end of file
+    return _engine.extract_text(pdf_bytes, max_pages)
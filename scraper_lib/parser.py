@@ -1,18 +1,41 @@
-from bs4 import BeautifulSoup
+from typing import Iterable, NamedTuple
 from urllib.parse import urljoin
 from .constants import NAV_KEYWORDS, SKIP_PATTERNS
+from .document import ParsedPage
+from .keyword_matcher import KeywordMatcher, keyword_matcher
+from .link_stream import extract_anchors
 
-def find_relevant_links(html_content: str, base_url: str, keywords: list[str]) -> tuple[list[str], list[str]]:
+_NAV_MATCHER = KeywordMatcher(NAV_KEYWORDS)
+
+class FoundLink(NamedTuple):
+    """A relevant link with what the frontier needs to rank it."""
+    url: str
+    text: str           # anchor text, lower-cased
+    is_pdf: bool
+    is_content: bool    # a keyword occurs in the anchor text or the URL
+    is_nav: bool        # a NAV_KEYWORDS overview page (HTML only)
+
+def _tree_anchors(page: ParsedPage) -> Iterable[tuple[str, str]]:
+    for a_tag in page.soup.find_all('a', href=True):
+        yield a_tag['href'], a_tag.get_text(separator=' ', strip=True)
+
+def collect_links(html_content: str | ParsedPage, base_url: str,
+                  keywords: list[str] | KeywordMatcher) -> list[FoundLink]:
     """
-    Parses HTML to find relevant links based on keywords and PDF extension.
-    Returns a tuple of (html_page_links, pdf_links).
+    The relevant links of a page in document order, one entry per URL: links
+    whose anchor text or URL contains a keyword, and navigation links to
+    overview pages.
+    Raw HTML is scanned for anchors without building a tree (link_stream.py);
+    a ParsedPage's tree is used, since the extractor needs it anyway.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    html_page_links = set()
-    pdf_links = set()
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else keyword_matcher(keywords)
+    if isinstance(html_content, ParsedPage):
+        anchors = _tree_anchors(html_content)
+    else:
+        anchors = extract_anchors(html_content)
+    links: dict[str, FoundLink] = {}
 
-    for a_tag in soup.find_all('a', href=True):
-        href = a_tag['href']
+    for href, link_text in anchors:
         if not href or href.startswith('#') or href.startswith('javascript:'):
             continue
 
@@ -24,23 +47,40 @@ def find_relevant_links(html_content: str, base_url: str, keywords: list[str]) -
         if not (absolute_url.startswith('http://') or absolute_url.startswith('https://')):
             continue
 
-        link_text = a_tag.get_text(separator=' ', strip=True).lower()
+        link_text = link_text.lower()
         url_path_query = absolute_url.lower().replace(base_url.lower(), '')
+        is_pdf = absolute_url.lower().endswith('.pdf')
 
         # Check for primary keywords
-        if any(keyword in link_text or keyword in url_path_query for keyword in keywords):
-            if absolute_url.lower().endswith('.pdf'):
-                pdf_links.add(absolute_url)
-            else:
-                html_page_links.add(absolute_url)
-        
-        # Check for navigational keywords (only for HTML pages)
-        if any(nav in link_text or nav in url_path_query for nav in NAV_KEYWORDS):
-            if not absolute_url.lower().endswith('.pdf'):
-                # Avoid adding if already added
-                if absolute_url not in html_page_links:
-                     # Check skip patterns again just in case
-                    if not any(skip_word in absolute_url.lower() for skip_word in SKIP_PATTERNS):
-                        html_page_links.add(absolute_url)
-
-    return list(html_page_links), list(pdf_links)
\ No newline at end of file
+        is_content = matcher.search(link_text) or matcher.search(url_path_query)
+
+        # Check for navigational keywords (only for HTML pages, never the skip patterns)
+        is_nav = (not is_pdf
+                  and (_NAV_MATCHER.search(link_text) or _NAV_MATCHER.search(url_path_query))
+                  and not any(skip_word in absolute_url.lower() for skip_word in SKIP_PATTERNS))
+
+        if not (is_content or is_nav):
+            continue
+        known = links.get(absolute_url)
+        if known is not None:
+            # The same target linked twice (teaser image + headline): merge what both say
+            link_text = known.text if not link_text or link_text in known.text else f"{known.text} {link_text}".strip()
+            is_content = is_content or known.is_content
+            is_nav = is_nav or known.is_nav
+        links[absolute_url] = FoundLink(absolute_url, link_text, is_pdf, bool(is_content), bool(is_nav))
+
+    return list(links.values())
+
+def find_relevant_links(html_content: str | ParsedPage, base_url: str,
+                        keywords: list[str] | KeywordMatcher) -> tuple[list[str], list[str]]:
+    """
+    Parses HTML to find relevant links based on keywords and PDF extension.
+    Accepts raw HTML (scanned without building a tree) or a ParsedPage whose
+    tree is shared with the extractor.
+    Returns a tuple of (html_page_links, pdf_links), in document order.
+    """
+    html_page_links = []
+    pdf_links = []
+    for link in collect_links(html_content, base_url, keywords):
+        (pdf_links if link.is_pdf else html_page_links).append(link.url)
+    return html_page_links, pdf_links
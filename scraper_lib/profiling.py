@@ -0,0 +1,135 @@
+"""
+Profiling of a single call (one target scrape, one page extraction).
+
+Two modes, both from the standard library:
+
+- ``cprofile``: deterministic, exact call counts, stored as a ``.pstats`` file
+  (open with ``python -m pstats`` or snakeviz). Adds overhead to every call.
+- ``sample``: a background thread snapshots the calling thread's stack every
+  few milliseconds; stored as collapsed stacks (``a;b;c 42``) that
+  flamegraph.pl / speedscope render directly. Low overhead, shows where
+  wall time goes including waits on the network.
+
+Only the calling thread is profiled: work handed to other threads (the async
+engine's PDF extraction, the worker pool) does not show up.
+"""
+
+from __future__ import annotations
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+
+def _cprofile_hotspots(profiler: cProfile.Profile, top: int) -> list[dict]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "file": filename,
+            "calls": ncalls,
+            "self_seconds": round(tottime, 4),
+            "cumulative_seconds": round(cumtime, 4),
+        })
+    rows.sort(key=lambda r: r["self_seconds"], reverse=True)
+    return rows[:top]
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True, name="profile-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _sample_hotspots(stacks: Counter, interval: float, top: int) -> list[dict]:
+    """Self (leaf) and inclusive sample counts per function."""
+    self_samples: Counter[str] = Counter()
+    inclusive: Counter[str] = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_samples[frames[-1]] += count
+        for label in set(frames):
+            inclusive[label] += count
+    total = sum(stacks.values()) or 1
+    return [
+        {
+            "function": label,
+            "self_samples": count,
+            "self_seconds": round(count * interval, 4),
+            "self_share": round(count / total, 3),
+            "inclusive_share": round(inclusive[label] / total, 3),
+        }
+        for label, count in self_samples.most_common(top)
+    ]
+
+
+def profile_call(func: Callable[..., Any], *args, mode: str = "cprofile", output_path: str | None = None,
+                 top: int = 25, interval: float = SAMPLE_INTERVAL, **kwargs) -> tuple[Any, dict]:
+    """
+    Run ``func(*args, **kwargs)`` under the chosen profiler.
+    Returns ``(result, report)``; the report holds the wall time, the top
+    hotspots and the path of the stored profile (``output_path`` plus
+    ``.pstats`` or ``.collapsed``). Exceptions of ``func`` propagate after the
+    profile was stored.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {MODES}")
+    report: dict = {"mode": mode}
+    start = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func, *args, **kwargs)
+        finally:
+            report["wall_seconds"] = round(time.perf_counter() - start, 4)
+            report["hotspots"] = _cprofile_hotspots(profiler, top)
+            if output_path:
+                report["profile_file"] = output_path + ".pstats"
+                os.makedirs(os.path.dirname(report["profile_file"]) or ".", exist_ok=True)
+                profiler.dump_stats(report["profile_file"])
+    else:
+        sampler = _StackSampler(threading.get_ident(), interval)
+        sampler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            report["wall_seconds"] = round(time.perf_counter() - start, 4)
+            report["samples"] = sum(sampler.stacks.values())
+            report["hotspots"] = _sample_hotspots(sampler.stacks, interval, top)
+            if output_path:
+                report["profile_file"] = output_path + ".collapsed"
+                os.makedirs(os.path.dirname(report["profile_file"]) or ".", exist_ok=True)
+                with open(report["profile_file"], "w", encoding="utf-8") as f:
+                    for stack, count in sampler.stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+    return result, report
@@ -0,0 +1,133 @@
+"""
+Per-host adaptive rate limiting for scraper_lib.
+
+Every fetcher asks the limiter for permission before sending a request and
+reports the outcome afterwards. Each hostname has its own token bucket; its
+refill interval (the per-host delay) adapts AutoThrottle-style:
+
+- after every successful response the delay moves halfway towards
+  ``latency / target_concurrency``, so fast servers are crawled quickly and
+  slow ones are given more room;
+- a 429/503 response doubles the delay (or honours ``Retry-After``) and error
+  responses never make the delay smaller.
+
+One instance is shared by all scrapers of a run, so parallel targets that live
+on the same (e.g. Landkreis) host share one budget. A backed-off host can mean
+a wait of up to ``max_delay``; with the run's cancel event the wait ends as
+soon as the run is stopped (``ScrapeCancelled``).
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from .cancellation import ScrapeCancelled, raise_if_cancelled
+
+BACKOFF_STATUS_CODES = {429, 503}
+# How often an async wait checks the (thread-side) cancel event
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def _host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class _HostBucket:
+    __slots__ = ("delay", "tokens", "updated")
+
+    def __init__(self, delay: float, burst: int):
+        self.delay = delay
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+
+class HostRateLimiter:
+    """Thread-safe token-bucket limiter keyed by hostname."""
+
+    def __init__(
+        self,
+        start_delay: float = 0.5,
+        min_delay: float = 0.0,
+        max_delay: float = 60.0,
+        target_concurrency: float = 1.0,
+        burst: int = 1,
+    ):
+        self.start_delay = max(start_delay, min_delay)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_concurrency = max(target_concurrency, 0.1)
+        self.burst = max(1, burst)
+        self._buckets: dict[str, _HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> _HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.start_delay, self.burst)
+        return bucket
+
+    def _reserve(self, url: str) -> float:
+        """Take one token for the URL's host and return how long to wait for it."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(_host_of(url))
+            if bucket.delay <= 0:
+                bucket.tokens = float(self.burst)
+            else:
+                refill = max(0.0, now - bucket.updated) / bucket.delay
+                bucket.tokens = min(float(self.burst), bucket.tokens + refill)
+            bucket.updated = now
+            # Tokens may go negative: concurrent callers queue up behind each other
+            bucket.tokens -= 1
+            return 0.0 if bucket.tokens >= 0 else -bucket.tokens * bucket.delay
+
+    def acquire(self, url: str, cancel_event: Optional[threading.Event] = None) -> None:
+        """Block until a request to the URL's host is allowed; raise ScrapeCancelled if the run stops meanwhile."""
+        wait = self._reserve(url)
+        if wait <= 0:
+            return
+        if cancel_event is None:
+            time.sleep(wait)
+        elif cancel_event.wait(wait):
+            raise ScrapeCancelled()
+
+    async def acquire_async(self, url: str, cancel_event: Optional[threading.Event] = None) -> None:
+        """Async variant of ``acquire``."""
+        wait = self._reserve(url)
+        if cancel_event is None:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            return
+        # A threading.Event cannot be awaited: sleep in short slices and check it in between
+        deadline = time.monotonic() + wait
+        while wait > 0:
+            await asyncio.sleep(min(wait, CANCEL_POLL_INTERVAL))
+            raise_if_cancelled(cancel_event)
+            wait = deadline - time.monotonic()
+
+    def record(self, url: str, latency: float, status_code: Optional[int] = None,
+               retry_after: Optional[str] = None) -> None:
+        """Adapt the host's delay to an observed response."""
+        with self._lock:
+            bucket = self._bucket(_host_of(url))
+            if status_code in BACKOFF_STATUS_CODES:
+                new_delay = max(bucket.delay * 2, self.start_delay, 1.0)
+                try:
+                    new_delay = max(new_delay, float(retry_after)) if retry_after else new_delay
+                except ValueError:
+                    pass  # HTTP-date form of Retry-After: keep the doubled delay
+            else:
+                target = latency / self.target_concurrency
+                new_delay = (bucket.delay + target) / 2.0
+                if status_code is None or status_code >= 400:
+                    # Errors are often fast; never let them speed the crawl up
+                    new_delay = max(new_delay, bucket.delay)
+            bucket.delay = min(max(new_delay, self.min_delay), self.max_delay)
+
+    def current_delay(self, url: str) -> float:
+        """Current delay for the URL's host (mainly for logging)."""
+        with self._lock:
+            return self._bucket(_host_of(url)).delay
@@ -0,0 +1,49 @@
+"""
+Recrawl scheduling: which targets are worth a slot in the per-run budget.
+
+Each target carries a few running statistics, updated after every scrape:
+
+- ``yield_score``:  EWMA of new results per scrape;
+- ``change_score``: EWMA of the share of its pages that changed;
+- ``failure_count``: consecutive scrapes that failed or fetched nothing.
+
+The priority is the expected value of scraping a target *now*: the time since
+its last scrape multiplied by how much a scrape usually brings, halved for
+every consecutive failure. Productive, frequently changing Gemeinden thus
+become due again after hours, dormant ones only after weeks. Targets that were
+never scraped always come first.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+
+EWMA_ALPHA = 0.3
+# Value of a scrape that has never found anything: dormant targets are still
+# revisited eventually instead of starving forever.
+BASE_VALUE = 0.1
+CHANGE_WEIGHT = 0.5
+MAX_FAILURE_PENALTY = 6
+
+
+def ewma(previous: Optional[float], sample: float, alpha: float = EWMA_ALPHA) -> float:
+    """Exponentially weighted moving average; the first sample is taken as is."""
+    if previous is None:
+        return sample
+    return alpha * sample + (1 - alpha) * previous
+
+
+def target_priority(
+    last_scraped_at: Optional[datetime],
+    yield_score: Optional[float],
+    change_score: Optional[float],
+    failure_count: Optional[int],
+    now: datetime,
+) -> float:
+    """Scheduling priority of a target; higher is scraped first."""
+    if last_scraped_at is None:
+        return float("inf")
+    hours_stale = max((now - last_scraped_at).total_seconds() / 3600.0, 0.0)
+    value = BASE_VALUE + (yield_score or 0.0) + CHANGE_WEIGHT * (change_score or 0.0)
+    penalty = 0.5 ** min(failure_count or 0, MAX_FAILURE_PENALTY)
+    return hours_stale * value * penalty
@@ -0,0 +1,159 @@
+"""
+TITLE_SELECTORS and CONTENT_SELECTORS compiled into one single-pass lookup.
+
+The extractor used to run one ``soup.find`` per selector (up to 26 full-tree
+scans per page) and to split and ``re.compile`` the selector strings on every
+call. The selector lists are now compiled once at import time into per-tag
+rule tables, and ``select_title_and_content`` walks the tree once, remembering
+the first element (in document order) matched by each selector. The winner is
+the matched selector with the highest priority, exactly as with the old loop.
+
+Selector semantics are those of the old loop:
+  title   ``tag.cls``         class contains ``cls`` (regex search, case-insensitive)
+  content ``tag.cls``/``.cls`` class contains the word ``cls``; ``.cls`` means ``div.cls``
+  content ``tag#id``          id equals ``id``
+  both    ``tag[key="val"]``  attribute ``key`` contains ``val`` (case-insensitive)
+  both    ``tag``             any element with that name
+"""
+
+from __future__ import annotations
+import re
+from typing import Callable, NamedTuple
+
+from bs4 import BeautifulSoup, Tag
+
+from .constants import TITLE_SELECTORS, CONTENT_SELECTORS
+
+_ANY_TAG = "*"
+
+
+def _attribute_text(element: Tag, key: str) -> str | None:
+    value = element.get(key)
+    if isinstance(value, list):  # multi-valued attributes such as class
+        return " ".join(value)
+    return value
+
+
+def _contains(key: str, pattern: re.Pattern) -> Callable[[Tag], bool]:
+    def test(element: Tag) -> bool:
+        value = _attribute_text(element, key)
+        return value is not None and pattern.search(value) is not None
+    return test
+
+
+def _equals(key: str, expected: str) -> Callable[[Tag], bool]:
+    def test(element: Tag) -> bool:
+        return element.get(key) == expected
+    return test
+
+
+def _matches_all(element: Tag) -> bool:
+    return True
+
+
+def _attribute_rule(selector: str) -> tuple[str, Callable[[Tag], bool]]:
+    tag, attr_full = selector.split("[", 1)
+    key, val = attr_full.split("]", 1)[0].split("=")
+    return tag or _ANY_TAG, _contains(key, re.compile(val.strip("\"'"), re.I))
+
+
+def _title_rule(selector: str) -> tuple[str, Callable[[Tag], bool]]:
+    if "." in selector:
+        tag, cls = selector.split(".", 1)
+        return tag or _ANY_TAG, _contains("class", re.compile(cls, re.I))
+    if "[" in selector:
+        return _attribute_rule(selector)
+    return selector, _matches_all
+
+
+def _content_rule(selector: str) -> tuple[str, Callable[[Tag], bool]]:
+    if "#" in selector:
+        tag, elem_id = selector.split("#", 1)
+        return tag or _ANY_TAG, _equals("id", elem_id)
+    if "." in selector:
+        tag, cls = selector.split(".", 1)
+        return tag or "div", _contains("class", re.compile(r"\b" + re.escape(cls) + r"\b", re.I))
+    if "[" in selector:
+        return _attribute_rule(selector)
+    return selector, _matches_all
+
+
+class SelectorMatch(NamedTuple):
+    title: Tag | None
+    content: Tag | None
+    title_tag: Tag | None          # first <title>
+    body_tag: Tag | None           # first <body>
+    title_selector: str | None     # the selectors that picked title / content
+    content_selector: str | None
+
+
+class _Rule(NamedTuple):
+    slot: int       # 0 = title, 1 = content
+    priority: int   # position in the selector list, lower wins
+    test: Callable[[Tag], bool]
+
+
+class SelectorPlan:
+    """Title and content selector lists compiled into rule tables keyed by tag name."""
+
+    def __init__(self, title_selectors: list[str], content_selectors: list[str]):
+        self.title_selectors = tuple(title_selectors)
+        self.content_selectors = tuple(content_selectors)
+        rules: dict[str, list[_Rule]] = {}
+        for slot, selectors, compile_rule in ((0, self.title_selectors, _title_rule),
+                                              (1, self.content_selectors, _content_rule)):
+            for priority, selector in enumerate(selectors):
+                tag, test = compile_rule(selector)
+                rules.setdefault(tag, []).append(_Rule(slot, priority, test))
+        self._wildcard_rules = tuple(rules.pop(_ANY_TAG, ()))
+        self._rules = {tag: tuple(tag_rules) + self._wildcard_rules for tag, tag_rules in rules.items()}
+
+    def select(self, soup: BeautifulSoup) -> tuple[Tag | None, Tag | None, Tag | None, Tag | None]:
+        """
+        One traversal of ``soup``. Returns (title_element, content_element,
+        first <title>, first <body>); the first two are the elements the old
+        per-selector ``soup.find`` loop would have picked, or None.
+        """
+        return self.match(soup)[:4]
+
+    def match(self, soup: BeautifulSoup) -> SelectorMatch:
+        """Like ``select``, plus the selectors that matched title and content."""
+        rules_by_tag = self._rules
+        wildcard_rules = self._wildcard_rules
+        # Best priority and element found so far for the title and the content slot
+        best_priority = [len(self.title_selectors), len(self.content_selectors)]
+        best: list[Tag | None] = [None, None]
+        title_tag = body_tag = None
+
+        # Plain iteration over .descendants is several times faster than
+        # find_all(), which runs a SoupStrainer on every node.
+        for element in soup.descendants:
+            name = element.name
+            if name is None:  # text, comments
+                continue
+            if name == "title" and title_tag is None:
+                title_tag = element
+            elif name == "body" and body_tag is None:
+                body_tag = element
+            # Elements come in document order, so the first match of a selector
+            # is the one soup.find would return; only a selector with a higher
+            # priority can replace it.
+            for slot, priority, test in rules_by_tag.get(name, wildcard_rules):
+                if priority < best_priority[slot] and test(element):
+                    best_priority[slot] = priority
+                    best[slot] = element
+            if best_priority == [0, 0] and title_tag is not None and body_tag is not None:
+                break
+        return SelectorMatch(
+            best[0], best[1], title_tag, body_tag,
+            self.title_selectors[best_priority[0]] if best[0] is not None else None,
+            self.content_selectors[best_priority[1]] if best[1] is not None else None,
+        )
+
+
+DEFAULT_PLAN = SelectorPlan(TITLE_SELECTORS, CONTENT_SELECTORS)
+
+
+def select_title_and_content(soup: BeautifulSoup):
+    """Title element, content element, <title> and <body> of a page with the default selectors."""
+    return DEFAULT_PLAN.select(soup)
@@ -0,0 +1,63 @@
+"""
+Cost accounting for scraping one target.
+
+The fetchers count requests, downloaded bytes, cache revalidations and errors;
+the scrapers time PDF text extraction (incl. OCR) and keyword extraction.
+Routes store the totals per target and run so slow or wasteful sites can be
+found afterwards.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TargetStats:
+    """Thread-safe counters of one target scrape (the async engine updates them from several tasks)."""
+
+    def __init__(self):
+        self.fetch_count = 0
+        self.bytes_downloaded = 0
+        self.cache_hits = 0
+        self.error_count = 0
+        self.pdf_seconds = 0.0
+        self.extraction_seconds = 0.0
+        # Set by the scrapers: a site whose start page cannot be fetched counts as failed
+        self.main_page_fetched = False
+        self._lock = threading.Lock()
+
+    def record_fetch(self, nbytes: int, cached: bool = False) -> None:
+        """One completed request; a 304 served from the HTTP cache downloads no body."""
+        with self._lock:
+            self.fetch_count += 1
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.bytes_downloaded += nbytes
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.error_count += 1
+
+    @contextmanager
+    def timer(self, field: str):
+        """Add the duration of the block to ``pdf_seconds`` or ``extraction_seconds``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                setattr(self, field, getattr(self, field) + elapsed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "fetch_count": self.fetch_count,
+                "bytes_downloaded": self.bytes_downloaded,
+                "cache_hits": self.cache_hits,
+                "error_count": self.error_count,
+                "pdf_seconds": round(self.pdf_seconds, 3),
+                "extraction_seconds": round(self.extraction_seconds, 3),
+            }
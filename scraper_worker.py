@@ -0,0 +1,86 @@
+"""
+Standalone scrape worker.
+
+    python -m scraper_worker [--threads 4] [--once] [--poll 5]
+    python -m scraper_worker --profile TARGET_ID [--profile-mode sample]
+
+Claims targets from the scrape queue (ScrapeRunItem leases, see
+webapp/scrape_queue.py) and scrapes them exactly like the worker threads of
+the API process. Any number of workers can share a run; a worker that dies
+loses its leases after a minute and its targets are picked up by the others.
+
+Start it from the project directory so it uses the same database and
+output_data/ as the API. Set "embedded_workers" to off in the scraping config
+if only standalone workers should scrape.
+
+--profile scrapes a single target under the profiler instead, prints the
+hotspots as JSON and exits (see POST /api/targets/{id}/profile).
+"""
+
+import argparse
+import json
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from webapp import models
+from webapp.database import SessionLocal, engine
+from webapp.routes import profile_target, run_queue_worker
+from webapp.scrape_queue import worker_id
+from scraper import Scraper
+from scraper_lib.profiling import MODES as PROFILE_MODES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrape queued targets from the shared run queue.")
+    parser.add_argument("--threads", type=int, default=4, help="targets scraped in parallel (default: 4)")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty instead of polling")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between polls of an empty queue")
+    parser.add_argument("--profile", type=int, metavar="TARGET_ID", help="profile one target scrape and exit")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="cprofile",
+                        help="cprofile (exact call counts) or sample (stack sampling, low overhead)")
+    parser.add_argument("--top", type=int, default=25, help="hotspots to print with --profile")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+
+    if args.profile is not None:
+        profile(args.profile, args.profile_mode, args.top)
+        return
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        Scraper.log("Stopping: unfinished targets go back to the queue...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    threads = max(1, args.threads)
+    idle_wait = None if args.once else args.poll
+    Scraper.log(f"Scrape worker {worker_id('*')} started with {threads} threads.")
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="worker") as pool:
+        futures = [
+            pool.submit(run_queue_worker, SessionLocal, worker_id(f"w{n}"), stop_event, None, idle_wait)
+            for n in range(threads)
+        ]
+        for future in futures:
+            future.result()
+    Scraper.log("Scrape worker stopped.")
+
+
+def profile(target_id: int, mode: str, top: int) -> None:
+    db = SessionLocal()
+    try:
+        target = db.get(models.TargetSite, target_id)
+        if target is None:
+            raise SystemExit(f"Target {target_id} not found")
+        report = profile_target(db, target, mode, top)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -106,6 +106,7 @@ const translations: Translations = {
     'view_cards_large': { de: 'Große Kacheln', en: 'Large Cards' },
     // Scraping limit
     'max_targets_per_run': { de: 'Max. Ziele pro Durchlauf', en: 'Max Targets per Run' },
+    'scrape_concurrency': { de: 'Parallele Abfragen', en: 'Parallel Workers' },
     // RSS feed
     'source_type': { de: 'Quelltyp', en: 'Source Type' },
     'source_website': { de: 'Website', en: 'Website' },
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib import fetcher
+from scraper_lib.fetcher import PdfTooLarge, check_content_length, read_capped
+
+
+def test_pdf_size_limit_uses_content_length_and_streamed_size():
+    check_content_length({"Content-Length": "1000"}, "https://example.com/a.pdf", 1000)
+    with pytest.raises(PdfTooLarge):
+        check_content_length({"Content-Length": "1001"}, "https://example.com/a.pdf", 1000)
+
+    chunks = [b"x" * 400] * 3
+    assert read_capped(iter(chunks[:2]), "https://example.com/b.pdf", 1000) == b"x" * 800
+    with pytest.raises(PdfTooLarge):
+        read_capped(iter(chunks), "https://example.com/b.pdf", 1000)
+
+
+def test_pdf_pages_are_read_only_until_enough_keywords_were_found(monkeypatch):
+    filler = "Beratung über weitere Punkte der Tagesordnung. " * 100
+    pages = [filler, "Baugebiet Nord, Bebauungsplan 12 und Verkauf eines Grundstücks. " + filler] + [filler] * 298
+    read = []
+
+    def fake_pages(content, pdf_url, max_pages=None):
+        for number, text in enumerate(pages[:max_pages]):
+            read.append(number)
+            yield text
+
+    monkeypatch.setattr(fetcher, "iter_pdf_page_texts", fake_pages)
+    keywords = [{"word": w} for w in ("baugebiet", "bebauungsplan", "verkauf")]
+    text = fetcher.pdf_bytes_to_text(b"%PDF-", "https://example.com/protokoll.pdf", keywords, max_pages=100)
+
+    assert read == [0, 1]
+    assert "Baugebiet Nord" in text
+
+    read.clear()
+    fetcher.pdf_bytes_to_text(b"%PDF-", "https://example.com/protokoll.pdf", None, max_pages=100)
+    assert len(read) == 100
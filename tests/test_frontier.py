@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.frontier import Frontier, canonicalize_url
+
+
+def test_canonicalize_url_collapses_spellings_of_the_same_page():
+    variants = [
+        "https://www.Example.com/aktuelles/",
+        "https://www.example.com:443/aktuelles#top",
+        "HTTPS://www.example.com/aktuelles;jsessionid=ABC123",
+        "https://www.example.com/aktuelles?PHPSESSID=xyz&utm_source=newsletter",
+    ]
+    assert {canonicalize_url(url) for url in variants} == {"https://www.example.com/aktuelles"}
+
+    # Query order does not matter, pagination does
+    assert canonicalize_url("https://example.com/list?b=2&a=1") == canonicalize_url("https://example.com/list?a=1&b=2")
+    assert canonicalize_url("https://example.com/list?page=2") != canonicalize_url("https://example.com/list")
+
+
+def test_frontier_dedups_and_keeps_the_first_spelling():
+    frontier = Frontier("https://example.com/", max_html=10, max_pdf=10)
+    assert frontier.add_html(["https://example.com/bauen/", "https://example.com/bauen#a",
+                              "https://example.com/", "https://example.com/plan"]) == 2
+    assert frontier.add_pdfs(["https://example.com/b.pdf", "https://example.com/b.pdf?sid=1"]) == 1
+    assert frontier.take_html() == [("https://example.com/bauen/", 1), ("https://example.com/plan", 1)]
+    assert frontier.take_pdfs() == ["https://example.com/b.pdf"]
+    assert frontier.duplicates == 3
+
+
+def test_frontier_budgets_and_hub_depth():
+    frontier = Frontier("https://www.example.com", max_html=4, max_pdf=1, max_hub_depth=1,
+                        max_per_external_host=1)
+    frontier.add_html([
+        "https://example.com/a",  # same site without "www."
+        "https://kreis.de/1", "https://kreis.de/2",
+        "https://example.com/b", "https://example.com/c", "https://example.com/d",
+    ])
+    frontier.add_pdfs(["https://example.com/x.pdf", "https://example.com/y.pdf"])
+    assert [url for url, _ in frontier.take_html()] == [
+        "https://example.com/a", "https://kreis.de/1", "https://example.com/b", "https://example.com/c",
+    ]
+    assert frontier.take_html() == []
+    assert frontier.take_pdfs() == ["https://example.com/x.pdf"]
+    assert frontier.over_host_budget == 1
+
+    assert frontier.should_expand("https://example.com/aktuelles", 1)
+    assert not frontier.should_expand("https://example.com/aktuelles", 2)
+    assert not frontier.should_expand("https://example.com/kontakt", 1)
+
+
+def test_frontier_takes_the_best_scored_links_first():
+    from scraper_lib.link_scoring import LinkScorer, PatternYield, url_pattern
+    from scraper_lib.parser import collect_links
+
+    html = """
+    <a href='/service'>Service</a>
+    <a href='/aktuelles'>Aktuelles</a>
+    <a href='/rathaus/bebauungsplan-nord'>Bebauungsplan Nord</a>
+    <a href='/bauen/grundstueck'>Mehr</a>
+    <a href='/plaene/bp-12.pdf'>Bebauungsplan 12</a>
+    <a href='/plaene/baugebiet.pdf'>Anlage</a>
+    """
+    keywords = [{"word": "bebauungsplan", "weight": 2.0}, {"word": "grundstück"}, {"word": "baugebiet"}]
+    links = collect_links(html, "https://example.com/", [k["word"] for k in keywords])
+    frontier = Frontier("https://example.com/", max_html=3, max_pdf=1, scorer=LinkScorer(keywords))
+    assert frontier.add_links(links) == 6
+    assert [url for url, _ in frontier.take_html()] == [
+        "https://example.com/rathaus/bebauungsplan-nord",  # weighted keyword in text and URL
+        "https://example.com/bauen/grundstueck",            # keyword in the URL only
+        "https://example.com/service",                      # overview pages last, in page order
+    ]
+    assert frontier.take_pdfs() == ["https://example.com/plaene/bp-12.pdf"]
+
+    # Overview pages under a barren pattern sink, under a productive one they rise
+    assert url_pattern("https://www.example.com/aktuelles/2024/meldung-17.html?id=3&sid=x") == \
+        "example.com/aktuelles/#/*.html?id"
+    yields = PatternYield()
+    for n in range(4):
+        yields.record(f"https://example.com/service/{n}", matched=False)
+    yields.record("https://example.com/aktuelles/1", matched=True)
+    scorer = LinkScorer(keywords, yields)
+    nav = collect_links("<a href='/service/5'>Service</a><a href='/aktuelles/2'>Aktuelles</a>",
+                        "https://example.com/", [])
+    assert scorer.score(nav[0]) < 1.0 < scorer.score(nav[1])
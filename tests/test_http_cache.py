@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.http_cache import HttpCache
+
+
+def test_cache_revalidation_headers_and_lru_eviction(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    cache.store('https://a.example/', {'ETag': '"v1"'}, b'12345', 'utf-8')
+    cache.store('https://b.example/', {'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}, b'67890')
+    cache.store('https://c.example/', {}, b'no validators')  # counted, but not cached
+
+    assert cache.conditional_headers('https://a.example/') == {'If-None-Match': '"v1"'}
+    assert cache.get('https://a.example/') == (b'12345', 'utf-8')
+    assert cache.conditional_headers('https://c.example/') == {}
+
+    # 'a' was used most recently, so storing 'd' evicts 'b'
+    cache.store('https://d.example/', {'ETag': '"d"'}, b'abcde')
+    assert cache.get('https://b.example/') is None
+    assert cache.get('https://a.example/') is not None
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 4
+
+
+def test_locked_index_is_a_cache_miss(tmp_path, monkeypatch):
+    import sqlite3
+    from scraper_lib import http_cache
+
+    monkeypatch.setattr(http_cache, "BUSY_TIMEOUT_SECONDS", 0.1)
+    cache = HttpCache(str(tmp_path))
+    cache.store('https://a.example/', {'ETag': '"v1"'}, b'12345')
+
+    # Another process (e.g. a standalone worker) holds a write lock on the shared index
+    other = sqlite3.connect(str(tmp_path / 'index.sqlite3'))
+    other.execute('BEGIN EXCLUSIVE')
+    try:
+        assert cache.conditional_headers('https://a.example/') == {}
+        assert cache.get('https://a.example/') is None
+        cache.store('https://b.example/', {'ETag': '"b"'}, b'67890')
+    finally:
+        other.rollback()
+        other.close()
+
+    assert cache.get('https://a.example/') == (b'12345', None)
+    assert cache.conditional_headers('https://b.example/') == {}
+    cache.store('https://b.example/', {'ETag': '"b"'}, b'67890')
+    assert cache.conditional_headers('https://b.example/') == {'If-None-Match': '"b"'}
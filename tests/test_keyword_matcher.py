@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.keyword_matcher import keyword_matcher
+
+
+def test_overlapping_and_prefix_keywords_are_all_reported():
+    matcher = keyword_matcher(["bau", "baugebiet", "neubaugebiet", "gebiet"])
+    hits = matcher.find_all("Das Neubaugebiet")
+
+    found = {(matcher.keywords[h.index], h.start, h.end) for h in hits}
+    assert found == {
+        ("neubaugebiet", 4, 16),
+        ("bau", 7, 10),
+        ("baugebiet", 7, 16),
+        ("gebiet", 10, 16),
+    }
+
+
+def test_umlaut_folding_maps_back_to_original_offsets():
+    matcher = keyword_matcher([{"word": "Grundstück"}, {"word": "straße"}])
+    text = "Über GRUNDSTUECK und Grundstück an der Hauptstrasse"
+
+    first = matcher.first_occurrences(text)
+    assert text[first[0].start:first[0].end] == "GRUNDSTUECK"
+    assert text[first[1].start:first[1].end] == "strasse"
+
+    hits = [h for h in matcher.find_all(text) if h.index == 0]
+    assert [text[h.start:h.end] for h in hits] == ["GRUNDSTUECK", "Grundstück"]
+    assert matcher.search("grundstueck-info") and not matcher.search("Grund stück")
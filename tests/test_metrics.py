@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.metrics import Registry
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    registry = Registry()
+    responses = registry.counter("t_responses_total", "Responses.", ("engine", "status"))
+    latency = registry.histogram("t_latency_seconds", "Latency.", ("kind",), buckets=(0.1, 1.0))
+
+    responses.inc(engine="requests", status="200")
+    responses.inc(2, engine="requests", status="200")
+    responses.inc(engine="async", status="404")
+    latency.observe(0.05, kind="html")
+    latency.observe(0.5, kind="html")
+    latency.observe(3.0, kind="html")
+
+    text = registry.render()
+    assert "# TYPE t_responses_total counter" in text
+    assert 't_responses_total{engine="requests",status="200"} 3' in text
+    assert 't_responses_total{engine="async",status="404"} 1' in text
+    assert "# TYPE t_latency_seconds histogram" in text
+    assert 't_latency_seconds_bucket{kind="html",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{kind="html",le="1.0"} 2' in text
+    assert 't_latency_seconds_bucket{kind="html",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{kind="html"} 3' in text
+    assert 't_latency_seconds_sum{kind="html"} 3.55' in text
+
+
+def test_timer_and_registration_are_idempotent():
+    registry = Registry()
+    hist = registry.histogram("t_work_seconds", "Work.")
+    assert registry.histogram("t_work_seconds", "Work.") is hist
+
+    @hist.time()
+    def work():
+        return 42
+
+    assert work() == 42
+    with hist.time():
+        pass
+    assert hist.count() == 2
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib import ocr
+from scraper_lib.ocr import OcrEngine, OcrSettings
+
+
+def test_ocr_text_is_cached_by_content_hash_and_page_cap(tmp_path, monkeypatch):
+    engine = OcrEngine()
+    engine.configure(OcrSettings(workers=1, dpi=150, max_pages=5, cache_dir=str(tmp_path)))
+    calls = []
+
+    def fake_ocr_pages(pdf_path, page_count):
+        calls.append(page_count)
+        return "\n".join(f"Seite {n}" for n in range(1, page_count + 1))
+
+    monkeypatch.setattr(ocr, "_page_count", lambda pdf_path: 40)
+    monkeypatch.setattr(engine, "_ocr_pages", fake_ocr_pages)
+
+    first = engine.extract_text(b"%PDF- scanned amtsblatt", max_pages=100)
+    again = engine.extract_text(b"%PDF- scanned amtsblatt", max_pages=100)
+    fewer = engine.extract_text(b"%PDF- scanned amtsblatt", max_pages=2)
+    other = engine.extract_text(b"%PDF- another document")
+
+    assert calls == [5, 2, 5]                       # page cap of the settings applies; cache hit in between
+    assert first == again and first.endswith("Seite 5")
+    assert fewer == "Seite 1\nSeite 2" and other == first
+    assert len(list(tmp_path.glob("*-150dpi-*p.txt"))) == 3
@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.profiling import profile_call
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_cprofile_reports_hotspots_and_stores_pstats(tmp_path):
+    result, report = profile_call(_busy, 20000, output_path=str(tmp_path / "run"), top=5)
+    assert result == _busy(20000)
+    assert report["mode"] == "cprofile"
+    assert len(report["hotspots"]) <= 5
+    assert any("_busy" in h["function"] or "genexpr" in h["function"] for h in report["hotspots"])
+    assert os.path.exists(report["profile_file"])
+
+
+def test_sampler_writes_collapsed_stacks(tmp_path):
+    result, report = profile_call(_busy, 2_000_000, mode="sample", output_path=str(tmp_path / "run"), interval=0.001)
+    assert result == _busy(2_000_000)
+    assert report["samples"] > 0
+    with open(report["profile_file"], encoding="utf-8") as f:
+        line = f.readline()
+    stack, count = line.rsplit(" ", 1)
+    assert "test_profiling.py" in stack and int(count) > 0
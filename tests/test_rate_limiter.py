@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.rate_limiter import HostRateLimiter
+
+
+def test_delay_adapts_per_host_to_latency_and_backoff():
+    limiter = HostRateLimiter(start_delay=1.0, max_delay=30.0)
+
+    # A fast host converges towards its latency
+    for _ in range(10):
+        limiter.record('https://fast.example/page', latency=0.05, status_code=200)
+    assert limiter.current_delay('https://fast.example/other') < 0.1
+
+    # A 429 on another host doubles its delay (or honours Retry-After) without touching the fast one
+    limiter.record('https://slow.example/', latency=0.05, status_code=429, retry_after='5')
+    assert limiter.current_delay('https://slow.example/') == 5.0
+    limiter.record('https://slow.example/', latency=0.05, status_code=503)
+    assert limiter.current_delay('https://slow.example/') == 10.0
+    assert limiter.current_delay('https://fast.example/') < 0.1
+
+    # Fast error responses never speed a host up
+    limiter.record('https://slow.example/', latency=0.01, status_code=404)
+    assert limiter.current_delay('https://slow.example/') == 10.0
+
+
+def test_token_bucket_spaces_requests_to_same_host():
+    limiter = HostRateLimiter(start_delay=2.0)
+    assert limiter._reserve('https://a.example/1') == 0.0
+    # Second and third request to the same host queue up behind the first
+    assert 1.9 < limiter._reserve('https://a.example/2') <= 2.0
+    assert 3.9 < limiter._reserve('https://a.example/3') <= 4.0
+    # Other hosts are unaffected
+    assert limiter._reserve('https://b.example/1') == 0.0
+
+
+def test_stop_request_interrupts_a_backed_off_wait():
+    import asyncio
+    import threading
+    import time
+
+    import pytest
+    from scraper_lib.cancellation import ScrapeCancelled
+
+    limiter = HostRateLimiter(start_delay=30.0)
+    limiter.acquire('https://slow.example/1')
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    start = time.monotonic()
+    with pytest.raises(ScrapeCancelled):
+        limiter.acquire('https://slow.example/2', cancel)
+    with pytest.raises(ScrapeCancelled):
+        asyncio.run(limiter.acquire_async('https://slow.example/3', cancel))
+    assert time.monotonic() - start < 1.0
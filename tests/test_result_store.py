@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from webapp import models
+from webapp.database import Base
+from webapp.routes import _insert_new_results
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'results.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _result(url, title="Bebauungsplan"):
+    return {"title": title, "description": "", "publication_date": "01.02.2024",
+            "publication_date_iso": "2024-02-01", "url": url, "source": "Gemeinde", "type": "HTML"}
+
+
+def test_only_new_urls_per_target_are_inserted_and_returned(db):
+    first = _insert_new_results(db, 1, [_result("https://a.de/1"), _result("https://a.de/2"),
+                                        _result("https://a.de/1", "Duplicate in the same batch")])
+    db.commit()
+    assert [r["url"] for r in first] == ["https://a.de/1", "https://a.de/2"]
+
+    # Known URLs conflict with the unique (target_id, url) index and are skipped
+    again = _insert_new_results(db, 1, [_result("https://a.de/2", "Changed title"), _result("https://a.de/3")])
+    db.commit()
+    assert [r["url"] for r in again] == ["https://a.de/3"]
+    assert db.query(models.ScrapeResult).filter_by(url="https://a.de/2").one().title == "Bebauungsplan"
+
+    # The same URL found for another target is a result of its own
+    assert [r["url"] for r in _insert_new_results(db, 2, [_result("https://a.de/1")])] == ["https://a.de/1"]
+    db.commit()
+    assert db.query(models.ScrapeResult).count() == 4
+    stored = db.query(models.ScrapeResult).filter_by(url="https://a.de/1", target_id=1).one()
+    assert stored.publication_date_iso.isoformat() == "2024-02-01"
+    assert _insert_new_results(db, 1, []) == []
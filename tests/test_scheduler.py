@@ -0,0 +1,86 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scraper_lib.scheduler import ewma, target_priority
+
+
+def test_priority_prefers_new_productive_and_healthy_targets():
+    now = datetime(2024, 6, 1, 12, 0)
+    day_ago = now - timedelta(days=1)
+
+    never = target_priority(None, None, None, 0, now)
+    productive = target_priority(day_ago, 3.0, 0.5, 0, now)
+    dormant = target_priority(day_ago, 0.0, 0.0, 0, now)
+    failing = target_priority(day_ago, 3.0, 0.5, 3, now)
+
+    assert never > productive > failing
+    assert productive > dormant
+    assert failing == productive / 8
+
+    # A dormant target catches up with a productive one once it is stale enough
+    month_ago = now - timedelta(days=40)
+    assert target_priority(month_ago, 0.0, 0.0, 0, now) > productive
+
+
+def test_ewma_starts_at_first_sample():
+    assert ewma(None, 4.0) == 4.0
+    assert ewma(4.0, 0.0, alpha=0.25) == 3.0
+
+
+class _FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+
+    def __init__(self, body: bytes):
+        self.content = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, pages: dict[str, bytes]):
+        self.pages = pages
+
+    def get(self, url, **kwargs):
+        if url not in self.pages:
+            raise requests.exceptions.ConnectionError(url)
+        return _FakeResponse(self.pages[url])
+
+
+def test_site_without_relevant_links_is_quiet_not_failing():
+    from types import SimpleNamespace
+
+    from scraper import Scraper
+    from scraper_lib.target_stats import TargetStats
+    from webapp.routes import _update_schedule_stats
+
+    keywords = [{"word": "bebauungsplan"}]
+    target = SimpleNamespace(failure_count=2, yield_score=1.0, change_score=0.5)
+    stats = TargetStats()
+    session = _FakeSession({"https://example.com/": b"<html><body><a href='/kontakt'>Kontakt</a></body></html>"})
+    scraper = Scraper(keywords, delay=0, session=session, stats=stats)
+    assert scraper.scrape_site("Example", "https://example.com/") == []
+    _update_schedule_stats(target, 0, stats, 0, 0)
+    assert (target.failure_count, target.yield_score, target.change_score) == (0, 0.7, 0.5)
+
+    # A start page that cannot be fetched is a failure
+    stats = TargetStats()
+    Scraper(keywords, delay=0, session=_FakeSession({}), stats=stats).scrape_site("Example", "https://example.com/")
+    _update_schedule_stats(target, 0, stats, 0, 0)
+    assert target.failure_count == 1
@@ -0,0 +1,151 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from webapp import models, scrape_queue
+from webapp.database import Base
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def _age(db, run, seconds):
+    """Move a run and its items ``seconds`` into the past."""
+    past = datetime.utcnow() - timedelta(seconds=seconds)
+    run.started_at = past
+    for item in run.items:
+        if item.started_at:
+            item.started_at = past
+        if item.lease_expires_at:
+            item.lease_expires_at = past + timedelta(seconds=scrape_queue.LEASE_SECONDS)
+    db.commit()
+
+
+def test_expired_lease_is_reclaimed_and_only_the_holder_finishes(db):
+    run = scrape_queue.enqueue_run(db, [11, 12])
+    first = scrape_queue.claim_item(db, "host:1:a")
+    assert first == (first[0], run.id, 11)
+    assert scrape_queue.claim_item(db, "host:1:b")[2] == 12
+    assert scrape_queue.claim_item(db, "host:1:c") is None
+
+    # a's heartbeat stalls past the lease: c takes the item over
+    item = db.get(models.ScrapeRunItem, first[0])
+    item.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert scrape_queue.claim_item(db, "host:1:c") == first
+    assert not scrape_queue.renew_lease(db, first[0], "host:1:a")
+    assert scrape_queue.renew_lease(db, first[0], "host:1:c")
+
+    # a's late outcome is dropped and does not complete the run
+    assert scrape_queue.finish_item(db, first[0], "host:1:a", "done", 5) == (0, 2)
+    db.refresh(item)
+    assert (item.status, item.lease_owner, item.new_results) == ("leased", "host:1:c", 0)
+
+    assert scrape_queue.finish_item(db, first[0], "host:1:c", "done", 2, {"fetch_count": 3}) == (1, 2)
+    assert scrape_queue.finish_item(db, first[0] + 1, "host:1:b", "failed") == (2, 2)
+    db.refresh(item)
+    db.refresh(run)
+    assert (item.status, item.new_results, item.fetch_count) == ("done", 2, 3)
+    assert run.status == "completed"
+
+
+def test_released_item_goes_back_to_the_queue(db):
+    scrape_queue.enqueue_run(db, [11])
+    item_id, _, _ = scrape_queue.claim_item(db, "host:1:a")
+    scrape_queue.release_item(db, item_id, "host:1:b")  # not the holder: no effect
+    assert scrape_queue.claim_item(db, "host:1:b") is None
+    scrape_queue.release_item(db, item_id, "host:1:a")
+    assert scrape_queue.claim_item(db, "host:1:b")[0] == item_id
+
+
+def test_run_of_vanished_workers_on_another_host_stops_blocking(db):
+    run = scrape_queue.enqueue_run(db, [11, 12])
+    scrape_queue.claim_item(db, "old-container:7:w0")
+    # A fresh lease of an unknown host counts as alive
+    assert scrape_queue.active_run(db) is run
+
+    # Once its lease ran out and nobody touched the run, it is interrupted and resumable
+    _age(db, run, scrape_queue.LEASE_SECONDS + 5)
+    assert scrape_queue.active_run(db) is None
+    db.refresh(run)
+    assert run.status == "interrupted"
+    assert {i.status for i in run.items} == {"pending"}
+
+    # A new run is not abandoned before its workers had a chance to claim anything
+    fresh = scrape_queue.enqueue_run(db, [13])
+    assert scrape_queue.active_run(db) is fresh
+
+
+def test_failing_target_is_backed_off_even_if_never_scraped(db, session_factory, monkeypatch):
+    import threading
+
+    from scraper_lib.scheduler import target_priority
+    from webapp import routes
+
+    def broken_scrape(*args, **kwargs):
+        raise RuntimeError("parser crashed")
+
+    monkeypatch.setattr(routes, "get_run_context", lambda db, run_id=None: None)
+    monkeypatch.setattr(routes, "scrape_single_target", broken_scrape)
+    target = models.TargetSite(name="Gemeinde", url="https://example.com/")
+    db.add(target)
+    db.commit()
+    scrape_queue.enqueue_run(db, [target.id])
+    item_id, run_id, _ = scrape_queue.claim_item(db, "host:1:a")
+
+    routes._scrape_queue_item(session_factory, "host:1:a", item_id, run_id, target.id, threading.Event(), None)
+    db.refresh(target)
+    assert target.failure_count == 1 and target.last_scraped_at is not None
+    now = datetime.utcnow() + timedelta(hours=1)
+    assert target_priority(target.last_scraped_at, None, None, target.failure_count, now) < float("inf")
+    assert db.get(models.ScrapeRunItem, item_id).status == "failed"
+
+
+def test_restart_recovers_runs_of_dead_workers_and_resume_reopens_them(db):
+    import os
+    import socket
+
+    dead = f"{socket.gethostname()}:{os.getpid()}:w0"  # our pid: the process that held it restarted
+    orphaned = scrape_queue.enqueue_run(db, [11, 12, 13])
+    item_id, _, _ = scrape_queue.claim_item(db, dead)
+    scrape_queue.finish_item(db, item_id, dead, "done", 1)
+    scrape_queue.claim_item(db, dead)
+    external = scrape_queue.enqueue_run(db, [21])
+    db.query(models.ScrapeRunItem).filter_by(run_id=external.id).update(
+        {"status": "leased", "lease_owner": "worker-host:42:w0",
+         "lease_expires_at": datetime.utcnow() + timedelta(seconds=30)}
+    )
+    db.commit()
+
+    scrape_queue.recover_interrupted_runs(db)
+    db.refresh(orphaned)
+    db.refresh(external)
+    assert orphaned.status == "interrupted"
+    assert [i.status for i in sorted(orphaned.items, key=lambda i: i.position)] == ["done", "pending", "pending"]
+    assert external.status == "running"  # a live lease of a standalone worker on another host
+
+    external.status = "completed"
+    db.commit()
+    assert scrape_queue.resume_run(db, orphaned.id) == 2
+    db.refresh(orphaned)
+    assert orphaned.status == "running" and orphaned.finished_at is None
+    assert db.query(models.GlobalState).filter_by(key="global_scrape_status").one().scrape_status == "running"
+    assert scrape_queue.claim_item(db, "host:1:a")[2] == 12
@@ -29,3 +29,168 @@ def test_find_relevant_links_separates_html_and_pdf_links():
     }
     assert set(html_links) == expected_html
     assert set(pdf_links) == expected_pdfs
+
+
+def test_log_cursor_returns_only_new_lines_and_flags_dropped_ones():
+    from scraper import Scraper
+
+    Scraper.clear_logs()
+    _, start, _ = Scraper.get_log_entries()
+    Scraper.log("first")
+    Scraper.log("Completed 1/2 targets.", progress=(1, 2))
+
+    entries, last_seq, truncated = Scraper.get_log_entries(start)
+    assert [message.split("] ", 1)[1] for _, message, _ in entries] == ["first", "Completed 1/2 targets."]
+    assert entries[-1][2] == (1, 2) and last_seq == start + 2 and not truncated
+    assert Scraper.get_log_entries(last_seq) == ([], last_seq, False)
+
+    for n in range(Scraper._log_buffer.maxlen):
+        Scraper.log(f"line {n}")
+    entries, _, truncated = Scraper.get_log_entries(last_seq)
+    assert not truncated and len(entries) == Scraper._log_buffer.maxlen
+    entries, _, truncated = Scraper.get_log_entries(start)
+    assert truncated and entries[0][1].endswith("line 0")
+    Scraper.clear_logs()
+
+
+def test_log_stream_resumes_from_last_event_id_and_ends_on_disconnect():
+    import asyncio
+    from scraper import Scraper
+    from webapp import routes
+
+    class Client:
+        """Stays connected for ``polls`` checks."""
+        def __init__(self, polls):
+            self.polls = polls
+
+        async def is_disconnected(self):
+            self.polls -= 1
+            return self.polls < 0
+
+    async def read(client, **params):
+        response = await routes.stream_scrape_logs(client, **params)
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    Scraper.clear_logs()
+    _, start, _ = Scraper.get_log_entries()
+    for n in range(Scraper._log_buffer.maxlen + 1):
+        Scraper.log(f"line {n}")
+    stream = asyncio.run(read(Client(1), since=start, last_event_id=None))
+    assert stream.startswith(f'event: truncated\ndata: {{"since": {start}}}')
+    assert stream.count("event: log") == Scraper._log_buffer.maxlen
+
+    # A reconnect resumes after its Last-Event-ID, not at ?since
+    stream = asyncio.run(read(Client(1), since=start, last_event_id=str(start + 1000)))
+    assert stream.count("event: log") == 1 and stream.rstrip().endswith("line 1000")
+    Scraper.clear_logs()
+
+
+def test_parsed_page_is_parsed_once_and_shared():
+    from scraper_lib.document import ParsedPage
+    from scraper_lib.extractor import extract_data_from_html_page
+
+    html = "<html><head><title>Baugebiet Nord</title></head><body><main><p>" \
+           "Der Bebauungsplan für das Baugebiet Nord liegt ab sofort im Rathaus aus.</p>" \
+           "<a href='/news/baugebiet-nord'>Baugebiet Nord</a></main></body></html>"
+    page = ParsedPage(html, "https://example.com/")
+    assert not page.parsed
+    links, _ = find_relevant_links(page, "https://example.com/", ["baugebiet"])
+    soup = page.soup
+    items = extract_data_from_html_page("https://example.com/", page, [{"word": "baugebiet"}], "Test")
+    assert page.soup is soup
+    assert links == ["https://example.com/news/baugebiet-nord"]
+    assert items and items[0]["title"] == "Baugebiet Nord"
+
+
+def test_selector_plan_keeps_selector_priority_over_document_order():
+    from bs4 import BeautifulSoup
+    from scraper_lib.selector_plan import select_title_and_content
+
+    soup = BeautifulSoup(
+        "<html><head><title>Gemeinde</title></head><body>"
+        "<h1>Willkommen</h1><div class='text'>Intro</div>"
+        "<h2 class='Entry-Title'>Neues Baugebiet</h2>"
+        "<main id='main'><h1 itemprop='headline'>Aktuelles</h1></main>"
+        "<div class='news-detail'>Meldung</div></body></html>", "html.parser")
+    title, content, title_tag, body_tag = select_title_and_content(soup)
+    assert title.get_text() == "Neues Baugebiet"   # h2.title beats the earlier plain h1
+    assert content.get("class") == ["news-detail"]  # div.news-detail beats main#main and .text
+    assert title_tag.string == "Gemeinde" and body_tag.name == "body"
+
+
+def test_publication_dates_are_found_in_pattern_order_and_normalised():
+    from datetime import date
+    from scraper_lib.dates import find_date, parse_date
+
+    assert find_date("Stand: 3. März 2024, Sitzung am 05.03.24") == "05.03.24"
+    assert find_date("Veröffentlicht am 3. Mrz. 2024") == "3. Mrz. 2024"
+    assert find_date("keine Angabe") is None
+    # Overlapping matches: the higher-ranked date wins even if a lower-ranked one starts earlier
+    assert find_date("Az. 1/2/03.04.2024") == "03.04.2024"
+    assert find_date("Datei 12-05-2024-06-07") == "2024-06-07"
+    assert parse_date("3. März 2024") == date(2024, 3, 3)
+    assert parse_date("05.03.24") == date(2024, 3, 5)
+    assert parse_date("2024-3-5") == date(2024, 3, 5)
+    assert parse_date("05/03/2024") == date(2024, 3, 5)
+    assert parse_date("31.02.2024") is None and parse_date("Not found") is None
+
+
+def test_host_template_is_learned_then_tried_first():
+    from bs4 import BeautifulSoup
+    from scraper_lib.extraction_templates import ExtractionTemplate, TemplateCache
+    from scraper_lib.selector_plan import select_title_and_content
+
+    page = ("<html><head><title>Gemeinde</title></head><body><h1>Rathaus</h1>"
+            "<h2 class='headline'>{title}</h2><div class='news-detail'>{text}</div></body></html>")
+    templates = TemplateCache()
+    first = BeautifulSoup(page.format(title="Neues Baugebiet", text="Meldung"), "html.parser")
+    assert templates.select(first, "https://www.example.com/a") == select_title_and_content(first)
+    assert templates.known == {"example.com": ExtractionTemplate("h2.headline", "div.news-detail")}
+
+    second = BeautifulSoup(page.format(title="Bebauungsplan", text="Auslegung"), "html.parser")
+    title, content, _, _ = templates.select(second, "https://example.com/b")
+    assert title.get_text() == "Bebauungsplan" and content.get_text() == "Auslegung"
+    assert templates.hits["example.com"] == 1 and not templates.misses
+
+    # Another kind of page: the cascade runs and its selectors replace the template
+    other = BeautifulSoup("<html><body><main id='main'><h1>Termine</h1></main></body></html>", "html.parser")
+    assert templates.select(other, "https://example.com/c") == select_title_and_content(other)
+    assert templates.misses["example.com"] == 1
+    assert templates.known["example.com"] == ExtractionTemplate("h1", "main#main")
+
+
+def test_streaming_anchor_scan_matches_the_tree():
+    from bs4 import BeautifulSoup
+    from scraper_lib.document import DEFAULT_PARSER
+    from scraper_lib.link_stream import extract_anchors
+
+    html = """<html><body><ul>
+      <li><a href='/a' href='/dup'>Baugebiet <b>Nord</b><!-- teaser --><br>&amp; Süd</a></li>
+      <li><a href="/b">unclosed <span>anchor</li>
+      <li><a href>empty</a><a name='x'>no href</a><a href='/c'><script>var s = "<a href='/s'>";</script>Plan</a></li>
+    </ul><p><a href='/d'>eins<a href='/e'>zwei</a>drei</a></p></body></html>"""
+    for parser in {"html.parser", DEFAULT_PARSER}:
+        soup = BeautifulSoup(html, parser)
+        tree = [(a["href"], a.get_text(separator=" ", strip=True)) for a in soup.find_all("a", href=True)]
+        assert extract_anchors(html, parser) == tree
+
+
+def test_pdf_without_extracted_text_is_not_fingerprinted(monkeypatch):
+    import scraper
+    from scraper_lib.fingerprint import FingerprintTracker
+
+    main_page = "<html><body><a href='/plan.pdf'>Bebauungsplan 12</a></body></html>"
+    monkeypatch.setattr(scraper, "fetch_html", lambda session, url, *args: main_page)
+    monkeypatch.setattr(scraper, "fetch_pdf_bytes", lambda session, url, *args: b"%PDF-1.4")
+    texts = iter([None, "Bebauungsplan 12: Auslegung"])  # OCR fails on the first run only
+    monkeypatch.setattr(scraper, "pdf_bytes_to_text", lambda *args: next(texts))
+
+    keywords = [{"word": "bebauungsplan"}]
+    fingerprints = FingerprintTracker({}, "v1")
+    run = scraper.Scraper(keywords, delay=0, fingerprints=fingerprints)
+    assert run.scrape_site("Example", "https://example.com/") == []
+    assert not fingerprints.changed
+
+    results = scraper.Scraper(keywords, delay=0, fingerprints=fingerprints).scrape_site("Example", "https://example.com/")
+    assert [r["url"] for r in results] == ["https://example.com/plan.pdf"]
+    assert list(fingerprints.changed) == ["https://example.com/plan.pdf"]
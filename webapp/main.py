@@ -1,7 +1,8 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 import os
+import time
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -9,13 +10,34 @@ from datetime import datetime
 
 from . import models, schemas
 from .database import SessionLocal, engine
-from .routes import router as api_router
+from .routes import router as api_router, backfill_publication_dates
+from .scrape_queue import recover_interrupted_runs
 from .ai_routes import ai_router
+from scraper_lib import metrics
 
 models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Scraper Web API", docs_url="/api/docs", openapi_url="/api/openapi.json")
 
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds", "API request latency by route template.", ("method", "route"),
+)
+REQUESTS = metrics.counter("http_requests_total", "API requests by route template and status.",
+                           ("method", "route", "status"))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # The route template keeps the label set small (/targets/{target_id}, not every id)
+    path = getattr(request.scope.get("route"), "path", None)
+    if path is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=path)
+        REQUESTS.inc(method=request.method, route=path, status=response.status_code)
+    return response
+
+
 # API routers
 app.include_router(api_router, prefix="/api")
 app.include_router(ai_router, prefix="/api")
@@ -31,12 +53,44 @@ def get_db():
 
 def run_migrations():
     """Add new columns to existing tables without dropping data."""
+    with engine.connect() as conn:
+        result_columns = {row[1] for row in conn.execute(text("PRAGMA table_info(scrape_results)"))}
     migrations = [
         "ALTER TABLE scraping_configs ADD COLUMN scraper_engine TEXT DEFAULT 'requests'",
         "ALTER TABLE scraping_configs ADD COLUMN crawl4ai_server_url TEXT",
         "ALTER TABLE scraping_configs ADD COLUMN crawl4ai_fallback INTEGER DEFAULT 1",
         "ALTER TABLE scraping_configs ADD COLUMN max_targets_per_run INTEGER DEFAULT 500",
         "ALTER TABLE target_sites ADD COLUMN source_type TEXT DEFAULT 'website'",
+        "ALTER TABLE scraping_configs ADD COLUMN scrape_concurrency INTEGER DEFAULT 4",
+        "ALTER TABLE scraping_configs ADD COLUMN site_concurrency INTEGER DEFAULT 5",
+        "ALTER TABLE scraping_configs ADD COLUMN http_cache_enabled INTEGER DEFAULT 1",
+        "ALTER TABLE scraping_configs ADD COLUMN http_cache_max_mb INTEGER DEFAULT 500",
+        "ALTER TABLE target_sites ADD COLUMN yield_score FLOAT",
+        "ALTER TABLE target_sites ADD COLUMN change_score FLOAT",
+        "ALTER TABLE target_sites ADD COLUMN failure_count INTEGER DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN lease_owner TEXT",
+        "ALTER TABLE scrape_run_items ADD COLUMN lease_expires_at DATETIME",
+        "ALTER TABLE scraping_configs ADD COLUMN embedded_workers INTEGER DEFAULT 1",
+        "CREATE INDEX IF NOT EXISTS ix_scrape_run_items_queue ON scrape_run_items (run_id, status, position)",
+        "ALTER TABLE scrape_run_items ADD COLUMN started_at DATETIME",
+        "ALTER TABLE scrape_run_items ADD COLUMN wall_seconds FLOAT",
+        "ALTER TABLE scrape_run_items ADD COLUMN fetch_count INTEGER DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN bytes_downloaded INTEGER DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN cache_hits INTEGER DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN pdf_seconds FLOAT DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN extraction_seconds FLOAT DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN error_count INTEGER DEFAULT 0",
+        "ALTER TABLE scrape_run_items ADD COLUMN error TEXT",
+        "ALTER TABLE scrape_results ADD COLUMN publication_date_iso DATE",
+        "ALTER TABLE scraping_configs ADD COLUMN max_pdf_mb INTEGER DEFAULT 25",
+        "ALTER TABLE scraping_configs ADD COLUMN max_pdf_pages INTEGER DEFAULT 100",
+        "ALTER TABLE scraping_configs ADD COLUMN ocr_workers INTEGER DEFAULT 2",
+        "ALTER TABLE scraping_configs ADD COLUMN ocr_dpi INTEGER DEFAULT 200",
+        "ALTER TABLE scraping_configs ADD COLUMN ocr_max_pages INTEGER DEFAULT 20",
+        "ALTER TABLE scraping_configs ADD COLUMN hub_depth INTEGER DEFAULT 2",
+        "ALTER TABLE scraping_configs ADD COLUMN external_host_budget INTEGER DEFAULT 3",
+        "ALTER TABLE categories ADD COLUMN weight FLOAT DEFAULT 1.0",
+        "CREATE INDEX IF NOT EXISTS ix_scrape_results_publication_date_iso ON scrape_results (publication_date_iso)",
     ]
     with engine.begin() as conn:
         for stmt in migrations:
@@ -45,6 +99,30 @@ def run_migrations():
             except Exception:
                 pass  # column already exists – safe to ignore
 
+    # Unique (target_id, url) index for set-based dedup. Older databases may hold
+    # duplicates, which would make the index creation fail: keep the oldest row.
+    with engine.begin() as conn:
+        has_index = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_scrape_results_target_url'"
+        )).first()
+        if not has_index:
+            conn.execute(text(
+                "DELETE FROM scrape_results WHERE id NOT IN "
+                "(SELECT MIN(id) FROM scrape_results GROUP BY target_id, url)"
+            ))
+            conn.execute(text(
+                "CREATE UNIQUE INDEX ux_scrape_results_target_url ON scrape_results (target_id, url)"
+            ))
+
+    # publication_date_iso was just added to an existing table: parse the stored dates once
+    if result_columns and "publication_date_iso" not in result_columns:
+        db = SessionLocal()
+        try:
+            counts = backfill_publication_dates(db)
+            print(f"Backfilled publication_date_iso: {counts['updated']} parsed, {counts['unparsed']} unparseable.")
+        finally:
+            db.close()
+
 
 def init_db(db: Session) -> None:
     """Initialize database with predefined keywords if they don't exist."""
@@ -70,6 +148,7 @@ def startup_populate():
     db = SessionLocal()
     try:
         init_db(db)
+        recover_interrupted_runs(db)
     finally:
         db.close()
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -21,6 +21,10 @@ class TargetSite(Base):
     source_type = Column(String, default="website")  # "website" | "rss"
     added_at = Column(DateTime, default=datetime.utcnow)
     last_scraped_at = Column(DateTime, nullable=True)
+    # Recrawl scheduling statistics (see scraper_lib/scheduler.py)
+    yield_score = Column(Float, nullable=True)  # EWMA of new results per scrape
+    change_score = Column(Float, nullable=True)  # EWMA of the share of changed pages
+    failure_count = Column(Integer, default=0)  # consecutive failed scrapes
 
     results = relationship("ScrapeResult", back_populates="target")
     region = relationship("Region", back_populates="targets")
@@ -28,13 +32,16 @@ class TargetSite(Base):
 
 class ScrapeResult(Base):
     __tablename__ = "scrape_results"
+    # One row per URL and target; dedup happens in the INSERT (ON CONFLICT DO NOTHING)
+    __table_args__ = (Index("ux_scrape_results_target_url", "target_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     target_id = Column(Integer, ForeignKey("target_sites.id"))
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     title = Column(String)
     description = Column(Text)
-    publication_date = Column(String)
+    publication_date = Column(String)  # as written on the page
+    publication_date_iso = Column(Date, nullable=True, index=True)  # parsed, for sorting/filtering in SQL
     url = Column(String)
     source = Column(String)
     type = Column(String)
@@ -45,11 +52,52 @@ class ScrapeResult(Base):
     category = relationship("Category")
 
 
+class PageFingerprint(Base):
+    """Content hash of a fetched page/PDF, used to skip re-extracting unchanged documents."""
+    __tablename__ = "page_fingerprints"
+    __table_args__ = (UniqueConstraint("target_id", "url", name="uq_page_fingerprints_target_url"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("target_sites.id"), index=True, nullable=False)
+    url = Column(String, nullable=False)
+    content_hash = Column(String, nullable=False)
+    keyword_version = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UrlPatternYield(Base):
+    """Fetched pages and pages with results per URL pattern of a target; ranks the crawl frontier."""
+    __tablename__ = "url_pattern_yields"
+    __table_args__ = (UniqueConstraint("target_id", "pattern", name="uq_url_pattern_yields_target_pattern"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("target_sites.id"), index=True, nullable=False)
+    pattern = Column(String, nullable=False)  # see scraper_lib/link_scoring.url_pattern
+    fetched = Column(Integer, default=0)
+    matched = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ExtractionTemplate(Base):
+    """Title/content selectors learned per host (scraper_lib/extraction_templates.py) and how often they hit."""
+    __tablename__ = "extraction_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    host = Column(String, unique=True, index=True, nullable=False)
+    title_selector = Column(String, nullable=False)
+    content_selector = Column(String, nullable=False)
+    hits = Column(Integer, default=0)    # pages extracted with the template alone
+    misses = Column(Integer, default=0)  # pages that needed the full selector cascade
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Category(Base):
     __tablename__ = "categories"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    # Links naming keywords of heavier categories are fetched first
+    weight = Column(Float, default=1.0)
     keywords = relationship("Keyword", back_populates="category")
 
 
@@ -74,6 +122,52 @@ class GlobalState(Base):
     scrape_status = Column(String, default="idle")
 
 
+class ScrapeRun(Base):
+    """One background scrape: the queued targets are checkpointed as ScrapeRunItems."""
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "running" | "completed" | "cancelled" | "interrupted" (process died mid-run)
+    status = Column(String, default="running", index=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    total_targets = Column(Integer, default=0)
+
+    items = relationship("ScrapeRunItem", back_populates="run", cascade="all, delete-orphan")
+
+
+class ScrapeRunItem(Base):
+    __tablename__ = "scrape_run_items"
+    __table_args__ = (
+        UniqueConstraint("run_id", "target_id", name="uq_scrape_run_items_run_target"),
+        Index("ix_scrape_run_items_queue", "run_id", "status", "position"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("scrape_runs.id"), index=True, nullable=False)
+    target_id = Column(Integer, ForeignKey("target_sites.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # scrape order within the run
+    status = Column(String, default="pending")  # "pending" | "leased" | "done" | "failed"
+    # Worker currently holding the item and when its lease runs out (see scrape_queue.py)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    new_results = Column(Integer, default=0)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Cost of the last attempt (scraper_lib/target_stats.py)
+    wall_seconds = Column(Float, nullable=True)
+    fetch_count = Column(Integer, default=0)
+    bytes_downloaded = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+    pdf_seconds = Column(Float, default=0.0)
+    extraction_seconds = Column(Float, default=0.0)
+    error_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    run = relationship("ScrapeRun", back_populates="items")
+    target = relationship("TargetSite")
+
+
 class NotificationConfig(Base):
     __tablename__ = "notification_configs"
 
@@ -91,7 +185,8 @@ class ScrapingConfig(Base):
     max_html_links = Column(Integer, default=15)
     max_pdf_links = Column(Integer, default=10)
     request_delay = Column(Float, default=0.5)
-    # "requests" = classic BeautifulSoup engine; "crawl4ai" = JS-rendering engine
+    # "requests" = classic BeautifulSoup engine; "crawl4ai" = JS-rendering engine;
+    # "async" = httpx engine fetching a site's links concurrently
     scraper_engine = Column(String, default="requests")
     # Crawl4AI: optional remote server URL (e.g. http://192.168.1.100:11235); empty = local browser
     crawl4ai_server_url = Column(String, nullable=True)
@@ -99,6 +194,27 @@ class ScrapingConfig(Base):
     crawl4ai_fallback = Column(Integer, default=1)
     # Limit how many targets are scraped per run (0 = unlimited)
     max_targets_per_run = Column(Integer, default=500)
+    # Number of targets scraped in parallel by the background run
+    scrape_concurrency = Column(Integer, default=4)
+    # Async engine: max concurrent requests per site
+    site_concurrency = Column(Integer, default=5)
+    # Conditional-GET cache for pages and PDFs (ETag / Last-Modified)
+    http_cache_enabled = Column(Integer, default=1)
+    http_cache_max_mb = Column(Integer, default=500)
+    # Scrape queued runs with worker threads inside the API process; turn off when
+    # only standalone workers (python -m scraper_worker) should do the work
+    embedded_workers = Column(Integer, default=1)
+    # PDFs above max_pdf_mb are not downloaded; only the first max_pdf_pages pages are read
+    max_pdf_mb = Column(Integer, default=25)
+    max_pdf_pages = Column(Integer, default=100)
+    # OCR of image-only PDFs: pool processes, render resolution, pages per PDF
+    ocr_workers = Column(Integer, default=2)
+    ocr_dpi = Column(Integer, default=200)
+    ocr_max_pages = Column(Integer, default=20)
+    # Hub pages are followed this many levels below the start page; fetches per
+    # host other than the target's own (0 = unlimited)
+    hub_depth = Column(Integer, default=2)
+    external_host_budget = Column(Integer, default=3)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
@@ -1,13 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import List, Optional, Union
+import asyncio
+import json
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import os
+import threading
+import time
 
 from . import models, schemas
 from .database import SessionLocal
 from scraper import Scraper
 from scraper_crawl4ai import Crawl4AIScraper
+from scraper_async import AsyncScraper
 from scraper_lib.feed_fetcher import fetch_feed, detect_feed_url
+from scraper_lib.fingerprint import FingerprintTracker
+from scraper_lib.link_scoring import PatternYield
+from scraper_lib.extraction_templates import ExtractionTemplate, TemplateCache
+from scraper_lib.frontier import host_of
+from scraper_lib.cancellation import ScrapeCancelled
+from scraper_lib.scheduler import ewma, target_priority
+from scraper_lib.target_stats import TargetStats
+from scraper_lib import metrics
+from scraper_lib.extractor import extract_data_from_html_page
+from scraper_lib.dates import parse_date
+from scraper_lib.profiling import MODES as PROFILE_MODES, profile_call
+from .scrape_context import (PROFILE_DIR, ScrapeRunContext, get_run_context, invalidate_run_context,
+                             scrape_control)
+from . import scrape_queue
 from .geocoding import geocode_location
 from .utils import haversine_distance
 from .security import get_api_key
@@ -15,10 +40,85 @@ from .notifications import send_notifications
 
 router = APIRouter(dependencies=[Depends(get_api_key)])
 
-@router.get("/scrape/logs", response_model=List[str])
-def get_scrape_logs():
-    """Retrieve current scrape logs."""
-    return Scraper.get_logs()
+DB_INSERT_SECONDS = metrics.histogram(
+    "webapp_result_insert_seconds", "Duration of deduplicating and inserting one target's results.",
+)
+NOTIFICATION_SECONDS = metrics.histogram(
+    "webapp_notification_seconds", "Duration of sending the notifications for one target's new results.",
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Fetch, OCR, extraction, DB and API latency metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/scrape/logs", response_model=Union[schemas.ScrapeLogPage, List[str]])
+def get_scrape_logs(since: Optional[int] = None):
+    """
+    Retrieve current scrape logs. With ?since=<seq> (0 for everything) only the
+    lines after that sequence number are returned, plus the cursor for the next poll.
+    """
+    if since is None:
+        return Scraper.get_logs()
+    entries, last_seq, truncated = Scraper.get_log_entries(since)
+    progress = next((p for _, _, p in reversed(entries) if p), None)
+    return schemas.ScrapeLogPage(
+        lines=[message for _, message, _ in entries], last_seq=last_seq, truncated=truncated,
+        progress=schemas.ScrapeProgress(done=progress[0], total=progress[1]) if progress else None,
+    )
+
+
+LOG_STREAM_KEEPALIVE_SECONDS = 15
+# How long one wait for new lines may hold a thread; also how fast a disconnect is noticed
+LOG_STREAM_POLL_SECONDS = 1.0
+
+
+@router.get("/scrape/logs/stream")
+async def stream_scrape_logs(request: Request, since: Optional[int] = None,
+                             last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events: ``log`` events with one line each and ``progress``
+    events ({"done": i, "total": N}) as they happen. The event id is the log
+    sequence number, so a reconnecting EventSource resumes where it stopped:
+    its Last-Event-ID wins over ``since``, which only applies to the first
+    connection (EventSource reconnects to the same URL). A ``truncated`` event
+    ({"since": seq}) precedes the lines when some after ``seq`` were already
+    dropped from the buffer.
+    """
+    if (last_event_id or "").isdigit():
+        cursor = int(last_event_id)
+    else:
+        cursor = since or 0
+
+    async def events():
+        nonlocal cursor
+        idle_since = time.monotonic()
+        while not await request.is_disconnected():
+            # Short waits in a worker thread: the event loop stays free and the
+            # stream ends within a poll interval after the client went away
+            entries, last_seq, truncated = await asyncio.to_thread(
+                Scraper.get_log_entries, cursor, LOG_STREAM_POLL_SECONDS)
+            if not entries:
+                cursor = last_seq
+                if time.monotonic() - idle_since >= LOG_STREAM_KEEPALIVE_SECONDS:
+                    idle_since = time.monotonic()
+                    yield ": keepalive\n\n"
+                continue
+            if truncated:
+                yield f"event: truncated\ndata: {json.dumps({'since': cursor})}\n\n"
+            for seq, message, progress in entries:
+                data = "\ndata: ".join(message.splitlines())  # multi-line messages become one event
+                yield f"id: {seq}\nevent: log\ndata: {data}\n\n"
+                if progress:
+                    data = json.dumps({"done": progress[0], "total": progress[1]})
+                    yield f"id: {seq}\nevent: progress\ndata: {data}\n\n"
+            cursor = last_seq
+            idle_since = time.monotonic()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @router.delete("/scrape/logs")
@@ -27,73 +127,251 @@ def clear_scrape_logs():
     Scraper.clear_logs()
     return {"message": "Logs cleared"}
 
-def run_background_scrape(db_session_factory, region_id: Optional[int] = None, target_id: Optional[int] = None, target_ids: Optional[str] = None):
-    """Background task to run the scrape."""
+def _interleave_by_host(targets: list[models.TargetSite]) -> list[int]:
+    """Order target IDs round-robin by hostname so parallel workers rarely share a host."""
+    by_host: dict[str, list[int]] = {}
+    for target in targets:
+        host = (urlparse(target.url).hostname or "").lower()
+        by_host.setdefault(host, []).append(target.id)
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop(0))
+        queues = [q for q in queues if q]
+    return ordered
+
+
+class _RunSummary:
+    """Thread-safe page counters aggregated over all targets of a run."""
+
+    def __init__(self):
+        self.pages_processed = 0
+        self.pages_skipped = 0
+        self._lock = threading.Lock()
+
+    def add_pages(self, processed: int, skipped: int) -> None:
+        with self._lock:
+            self.pages_processed += processed
+            self.pages_skipped += skipped
+
+
+class _Lease(threading.Thread):
+    """
+    Heartbeat of one claimed queue item: renews its lease and sets ``cancel``
+    once the worker is stopped or the item's run is no longer running.
+    """
+
+    def __init__(self, db_session_factory, item_id: int, owner: str, stop_event: threading.Event):
+        super().__init__(name=f"lease-{item_id}", daemon=True)
+        self.cancel = threading.Event()
+        self._db_session_factory = db_session_factory
+        self._item_id = item_id
+        self._owner = owner
+        self._stop_event = stop_event
+        self._done = threading.Event()
+
+    def run(self):
+        next_renewal = time.monotonic() + scrape_queue.HEARTBEAT_SECONDS
+        # Short wait: a stop in this process reaches the scraper well within a second
+        while not self._done.wait(0.2):
+            if self._stop_event.is_set():
+                self.cancel.set()
+            if time.monotonic() < next_renewal:
+                continue
+            next_renewal = time.monotonic() + scrape_queue.HEARTBEAT_SECONDS
+            db = self._db_session_factory()
+            try:
+                if not scrape_queue.renew_lease(db, self._item_id, self._owner):
+                    self.cancel.set()
+            except Exception as e:
+                Scraper.log(f"  [WARN] Could not renew lease of queue item {self._item_id}: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _scrape_queue_item(db_session_factory, owner: str, item_id: int, run_id: int, target_id: int,
+                       stop_event: threading.Event, summary: Optional[_RunSummary]) -> None:
+    """Scrape one claimed target in its own DB session and record the outcome in the queue."""
+    lease = _Lease(db_session_factory, item_id, owner, stop_event)
+    lease.start()
+    stats = TargetStats()
+    error = None
+    started = time.perf_counter()
     db = db_session_factory()
-    state = db.query(models.GlobalState).filter_by(key="global_scrape_status").first()
-    if not state:
-        state = models.GlobalState(key="global_scrape_status", scrape_status="idle")
-        db.add(state)
-        db.commit()
+    try:
+        try:
+            ctx = get_run_context(db, run_id)
+            target = db.get(models.TargetSite, target_id)
+            new_count = scrape_single_target(target, db, ctx, summary, cancel_event=lease.cancel,
+                                             stats=stats) if target else 0
+            status = "done"
+        except ScrapeCancelled:
+            # Partial results of an interrupted target are dropped; it is scraped again on resume
+            db.rollback()
+            scrape_queue.release_item(db, item_id, owner)
+            return
+        except Exception as e:
+            Scraper.log(f"  [ERROR] Target {target_id} failed: {type(e).__name__}: {e}")
+            db.rollback()
+            # last_scraped_at records the attempt: a never-scraped target would otherwise keep
+            # its top priority and the failure backoff would never apply
+            db.query(models.TargetSite).filter_by(id=target_id).update(
+                {"failure_count": func.coalesce(models.TargetSite.failure_count, 0) + 1,
+                 "last_scraped_at": datetime.utcnow()}
+            )
+            new_count = 0
+            status = "failed"
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            lease.stop()
+        cost = stats.as_dict()
+        cost.update(wall_seconds=round(time.perf_counter() - started, 3), error=error)
+        done, total = scrape_queue.finish_item(db, item_id, owner, status, new_count, cost)
+        Scraper.log(f"Completed {done}/{total} targets.", progress=(done, total))
+    finally:
+        db.close()
 
-    # Reset cancel flag at start
-    cancel_flag = db.query(models.GlobalState).filter_by(key="should_cancel_scrape").first()
-    if cancel_flag:
-        cancel_flag.scrape_status = "0"
-        db.commit()
 
-    state.scrape_status = "running"
-    state.last_scrape_start = datetime.utcnow()
-    db.commit()
+def run_queue_worker(db_session_factory, owner: str, stop_event: threading.Event,
+                     summary: Optional[_RunSummary] = None, idle_wait: Optional[float] = None) -> None:
+    """
+    Claim and scrape queued targets one by one. Returns once the queue is empty,
+    or, with ``idle_wait`` (standalone workers), polls until stop_event is set.
+    """
+    while not stop_event.is_set():
+        db = db_session_factory()
+        try:
+            claim = scrape_queue.claim_item(db, owner)
+        finally:
+            db.close()
+        if claim is None:
+            if idle_wait is None:
+                return
+            stop_event.wait(idle_wait)
+            continue
+        item_id, run_id, target_id = claim
+        _scrape_queue_item(db_session_factory, owner, item_id, run_id, target_id, stop_event, summary)
+
+
+def _select_targets(db: Session, region_id: Optional[int], target_id: Optional[int],
+                    target_ids: Optional[str]) -> list[models.TargetSite]:
+    query = db.query(models.TargetSite)
+    if target_ids:
+        id_list = [int(i.strip()) for i in target_ids.split(",") if i.strip().isdigit()]
+        if id_list:
+            query = query.filter(models.TargetSite.id.in_(id_list))
+    elif target_id:
+        query = query.filter(models.TargetSite.id == target_id)
+    elif region_id:
+        query = query.filter(models.TargetSite.region_id == region_id)
+    return query.all()
+
+
+def _schedule_targets(targets: list[models.TargetSite], budget: int) -> list[models.TargetSite]:
+    """Order targets by recrawl priority and keep the top `budget` (0 = all)."""
+    now = datetime.utcnow()
+    ranked = sorted(
+        targets,
+        key=lambda t: target_priority(t.last_scraped_at, t.yield_score, t.change_score, t.failure_count, now),
+        reverse=True,
+    )
+    if budget > 0 and len(ranked) > budget:
+        Scraper.log(f"Scheduling the {budget}/{len(ranked)} highest-priority targets (max_targets_per_run).")
+        ranked = ranked[:budget]
+    return ranked
+
 
+def _update_schedule_stats(target: models.TargetSite, new_results: int, stats: TargetStats,
+                           pages_seen: int, pages_changed: int) -> None:
+    """
+    Feed the outcome of one scrape into the target's scheduling statistics.
+    ``pages_seen``/``pages_changed`` (the linked pages and PDFs) only give the
+    change ratio: a site without relevant links is quiet, not failing.
+    """
+    if stats.fetch_count == 0 or not stats.main_page_fetched:
+        # The start page could not be fetched: the site is down or moved
+        target.failure_count = (target.failure_count or 0) + 1
+        return
+    target.failure_count = 0
+    target.yield_score = ewma(target.yield_score, new_results)
+    if pages_seen:
+        target.change_score = ewma(target.change_score, pages_changed / pages_seen)
+
+
+def run_background_scrape(db_session_factory, region_id: Optional[int] = None, target_id: Optional[int] = None, target_ids: Optional[str] = None):
+    """Background task: queue the selected targets as a new ScrapeRun and scrape them."""
+    db = db_session_factory()
     try:
-        query = db.query(models.TargetSite)
-        if target_ids:
-            id_list = [int(i.strip()) for i in target_ids.split(",") if i.strip().isdigit()]
-            if id_list:
-                query = query.filter(models.TargetSite.id.in_(id_list))
-        elif target_id:
-            query = query.filter(models.TargetSite.id == target_id)
-        elif region_id:
-            query = query.filter(models.TargetSite.region_id == region_id)
-        
-        targets = query.all()
+        if scrape_queue.active_run(db):
+            Scraper.log("A scrape is already in progress.")
+            return
+        targets = _select_targets(db, region_id, target_id, target_ids)
         if not targets:
             Scraper.log(f"No targets found for filter (region_id: {region_id}, target_id: {target_id})")
-            state.scrape_status = "idle"
-            state.last_scrape_end = datetime.utcnow()
-            db.commit()
             return
+        config = get_run_context(db).config
+        targets = _schedule_targets(targets, config.max_targets_per_run)
+        # The queue is checkpointed before anything is fetched, so a run survives restarts
+        run_id = scrape_queue.enqueue_run(db, _interleave_by_host(targets)).id
+    finally:
+        db.close()
+    _work_on_run(db_session_factory, run_id, config)
 
-        config = db.query(models.ScrapingConfig).first()
-        max_targets = (config.max_targets_per_run if config else 500) or 0
-        if max_targets > 0 and len(targets) > max_targets:
-            Scraper.log(f"Limiting to {max_targets}/{len(targets)} targets (max_targets_per_run).")
-            targets = targets[:max_targets]
-
-        Scraper.log(f"Starting scrape for {len(targets)} targets...")
-        for i, target in enumerate(targets):
-            # Check for cancellation every loop
-            db.refresh(state) # Refresh to get latest DB state
-            cancel_flag = db.query(models.GlobalState).filter_by(key="should_cancel_scrape").first()
-            if cancel_flag and cancel_flag.scrape_status == "1":
-                Scraper.log("Scrape cancelled by user.")
-                cancel_flag.scrape_status = "0"
-                db.commit()
-                break
-
-            scrape_single_target(target, db)
-            Scraper.log(f"Completed {i+1}/{len(targets)} targets.")
-        
-        state.scrape_status = "idle"
-        state.last_scrape_end = datetime.utcnow()
-        db.commit()
-    except Exception as e:
-        Scraper.log(f"Critical error in background scrape: {e}")
-        state.scrape_status = "idle"
-        db.commit()
+
+def resume_scrape_run(db_session_factory, run_id: int):
+    """Background task: reopen an earlier run and scrape its unfinished targets."""
+    db = db_session_factory()
+    try:
+        remaining = scrape_queue.resume_run(db, run_id)
+        config = get_run_context(db).config
     finally:
         db.close()
+    Scraper.log(f"Resuming run #{run_id} with {remaining} remaining targets.")
+    _work_on_run(db_session_factory, run_id, config)
+
+
+def _work_on_run(db_session_factory, run_id: int, config) -> None:
+    """Drain the queue with worker threads in this process, unless standalone workers do the work."""
+    if not config.embedded_workers:
+        Scraper.log(f"Run #{run_id} queued for the standalone scrape workers.")
+        return
+    if not scrape_control.begin():
+        return  # this process' workers are already draining the queue
+    try:
+        concurrency = max(1, config.scrape_concurrency)
+        Scraper.log(f"Starting scrape run #{run_id} with {concurrency} workers...")
+        db = db_session_factory()
+        try:
+            ctx = get_run_context(db, run_id)
+        finally:
+            db.close()
+        if ctx.http_cache:
+            ctx.http_cache.reset_counters()
+        summary = _RunSummary()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrape") as pool:
+            futures = [
+                pool.submit(run_queue_worker, db_session_factory, scrape_queue.worker_id(f"api-{n}"),
+                            scrape_control.cancel_event, summary)
+                for n in range(concurrency)
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    Scraper.log(f"Critical error in scrape worker: {type(e).__name__}: {e}")
+
+        Scraper.log(f"Pages processed: {summary.pages_processed}, skipped (unchanged): {summary.pages_skipped}")
+        if ctx.http_cache:
+            Scraper.log(ctx.http_cache.summary())
+        if scrape_control.cancel_event.is_set():
+            Scraper.log(f"Scrape cancelled by user. Resume run #{run_id} to finish the remaining targets.")
+    finally:
+        scrape_control.end()
 
 
 def get_db():
@@ -106,17 +384,149 @@ def get_db():
 
 @router.post("/scrape/stop")
 def stop_scrape(db: Session = Depends(get_db)):
-    """Stop the current background scrape."""
-    cancel_flag = db.query(models.GlobalState).filter_by(key="should_cancel_scrape").first()
-    if not cancel_flag:
-        cancel_flag = models.GlobalState(key="should_cancel_scrape", scrape_status="1")
-        db.add(cancel_flag)
-    else:
-        cancel_flag.scrape_status = "1"
-    db.commit()
+    """
+    Stop the current scrape: workers in this process stop before their next page
+    fetch, standalone workers on their next lease heartbeat.
+    """
+    stopped_here = scrape_control.request_cancel()
+    if not scrape_queue.cancel_runs(db) and not stopped_here:
+        return {"message": "No scrape in progress"}
+    Scraper.log("Cancellation requested...")
     return {"message": "Cancellation requested"}
 
 
+_RUN_TARGET_SORTS = {
+    "position": models.ScrapeRunItem.position,
+    "wall_seconds": models.ScrapeRunItem.wall_seconds,
+    "bytes_downloaded": models.ScrapeRunItem.bytes_downloaded,
+    "fetch_count": models.ScrapeRunItem.fetch_count,
+    "pdf_seconds": models.ScrapeRunItem.pdf_seconds,
+    "extraction_seconds": models.ScrapeRunItem.extraction_seconds,
+    "new_results": models.ScrapeRunItem.new_results,
+    "error_count": models.ScrapeRunItem.error_count,
+    # Cost per new result: high values are the wasteful Gemeinden
+    "seconds_per_result": models.ScrapeRunItem.wall_seconds / func.max(models.ScrapeRunItem.new_results, 1),
+    "bytes_per_result": models.ScrapeRunItem.bytes_downloaded / func.max(models.ScrapeRunItem.new_results, 1),
+}
+
+
+@router.get("/scrape/runs", response_model=List[schemas.ScrapeRunSummary])
+def list_scrape_runs(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+    """Scrape runs, newest first, with their per-target metrics summed up."""
+    runs = db.query(models.ScrapeRun).order_by(models.ScrapeRun.id.desc()).offset(skip).limit(limit).all()
+    Item = models.ScrapeRunItem
+    totals = {
+        row.run_id: row for row in db.query(
+            Item.run_id,
+            func.sum(case((Item.status == "done", 1), else_=0)).label("targets_done"),
+            func.sum(case((Item.status == "failed", 1), else_=0)).label("targets_failed"),
+            func.sum(case((Item.status.in_(("pending", "leased")), 1), else_=0)).label("targets_open"),
+            func.sum(Item.new_results).label("new_results"),
+            func.sum(Item.wall_seconds).label("wall_seconds"),
+            func.sum(Item.fetch_count).label("fetch_count"),
+            func.sum(Item.bytes_downloaded).label("bytes_downloaded"),
+            func.sum(Item.pdf_seconds).label("pdf_seconds"),
+            func.sum(Item.extraction_seconds).label("extraction_seconds"),
+            func.sum(Item.error_count).label("error_count"),
+        ).filter(Item.run_id.in_([r.id for r in runs])).group_by(Item.run_id)
+    }
+    summaries = []
+    for run in runs:
+        row = totals.get(run.id)
+        sums = {k: round(v or 0, 3) for k, v in row._mapping.items() if k != "run_id"} if row else {}
+        summaries.append(schemas.ScrapeRunSummary(
+            id=run.id, status=run.status, started_at=run.started_at, finished_at=run.finished_at,
+            total_targets=run.total_targets or 0, **sums,
+        ))
+    return summaries
+
+
+@router.get("/extraction-templates/stats", response_model=List[schemas.ExtractionTemplateStats])
+def extraction_template_stats(db: Session = Depends(get_db)):
+    """Learned extraction templates grouped by selector pair (≈ CMS), most widespread first."""
+    T = models.ExtractionTemplate
+    rows = db.query(
+        T.title_selector, T.content_selector,
+        func.count(T.id).label("hosts"),
+        func.sum(T.hits).label("hits"),
+        func.sum(T.misses).label("misses"),
+    ).group_by(T.title_selector, T.content_selector).order_by(func.count(T.id).desc(), func.sum(T.hits).desc()).all()
+    stats = []
+    for row in rows:
+        hits, misses = row.hits or 0, row.misses or 0
+        stats.append(schemas.ExtractionTemplateStats(
+            title_selector=row.title_selector, content_selector=row.content_selector, hosts=row.hosts,
+            hits=hits, misses=misses, hit_rate=round(hits / (hits + misses), 3) if hits + misses else None,
+        ))
+    return stats
+
+
+@router.get("/scrape/runs/{run_id}/targets", response_model=List[schemas.ScrapeRunTarget])
+def list_scrape_run_targets(
+    run_id: int,
+    sort: str = "wall_seconds",
+    order: str = "desc",
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    """
+    Per-target metrics of a run.
+    - sort: position, wall_seconds, bytes_downloaded, fetch_count, pdf_seconds,
+      extraction_seconds, new_results, error_count, seconds_per_result, bytes_per_result
+    - order: asc | desc
+    - status: only items with this status (pending, leased, done, failed)
+    """
+    if not db.get(models.ScrapeRun, run_id):
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    if sort not in _RUN_TARGET_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key. Use one of: {', '.join(_RUN_TARGET_SORTS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Unknown order. Use asc or desc")
+    column = _RUN_TARGET_SORTS[sort]
+    column = column.asc() if order == "asc" else column.desc()
+
+    query = db.query(models.ScrapeRunItem, models.TargetSite.name, models.TargetSite.url).join(
+        models.TargetSite, models.TargetSite.id == models.ScrapeRunItem.target_id
+    ).filter(models.ScrapeRunItem.run_id == run_id)
+    if status:
+        query = query.filter(models.ScrapeRunItem.status == status)
+    rows = query.order_by(column.nulls_last(), models.ScrapeRunItem.position).offset(skip).limit(limit).all()
+    return [
+        schemas.ScrapeRunTarget(
+            target_id=item.target_id, target_name=name, target_url=url, status=item.status,
+            position=item.position, lease_owner=item.lease_owner, started_at=item.started_at,
+            finished_at=item.finished_at, wall_seconds=item.wall_seconds,
+            fetch_count=item.fetch_count or 0, bytes_downloaded=item.bytes_downloaded or 0,
+            cache_hits=item.cache_hits or 0, pdf_seconds=item.pdf_seconds or 0.0,
+            extraction_seconds=item.extraction_seconds or 0.0, new_results=item.new_results or 0,
+            error_count=item.error_count or 0, error=item.error,
+        )
+        for item, name, url in rows
+    ]
+
+
+@router.post("/scrape/runs/{run_id}/resume")
+def resume_scrape(run_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Continue an interrupted or cancelled run with the targets it has not finished yet."""
+    run = db.get(models.ScrapeRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    if scrape_control.running or scrape_queue.active_run(db):
+        raise HTTPException(status_code=409, detail="A scrape is already in progress.")
+    pending = db.query(models.ScrapeRunItem).filter(
+        models.ScrapeRunItem.run_id == run_id,
+        models.ScrapeRunItem.status.in_(("pending", "leased")),
+    ).count()
+    if not pending:
+        raise HTTPException(status_code=400, detail="Scrape run has no unfinished targets")
+
+    Scraper.clear_logs()
+    background_tasks.add_task(resume_scrape_run, SessionLocal, run_id)
+    return {"message": f"Resuming run {run_id} with {pending} remaining targets"}
+
+
 @router.post("/targets", response_model=schemas.TargetSite)
 def create_target(target: schemas.TargetSiteCreate, db: Session = Depends(get_db)):
     db_target = db.query(models.TargetSite).filter(models.TargetSite.url == target.url).first()
@@ -169,30 +579,191 @@ def get_scrape_status(db: Session = Depends(get_db)):
     return get_or_create_global_state(db)
 
 
-from datetime import datetime
+_RESULT_FIELDS = ("title", "description", "publication_date", "url", "source", "type", "category_id")
 
-def scrape_single_target(target: models.TargetSite, db: Session) -> int:
-    """Scrape a single target site using the Scraper class and return the number of new results."""
-    keywords = db.query(models.Keyword).all()
-    if not keywords:
-        # Don't raise an exception, just return 0 results if no keywords are set.
-        # This allows the timestamp to still be updated.
-        pass
 
-    keyword_list = [{"word": k.word, "category_id": k.category_id} for k in keywords]
-
-    # Fetch global scraping config
-    config = db.query(models.ScrapingConfig).first()
-    engine = config.scraper_engine if config else "requests"
-    server_url = (config.crawl4ai_server_url or "").strip() if config else ""
-    fallback_enabled = bool(config.crawl4ai_fallback) if config else True
-
-    scraper_kwargs = dict(
-        keywords=keyword_list,
-        max_html_links=config.max_html_links if config else 15,
-        max_pdf_links=config.max_pdf_links if config else 10,
-        delay=config.request_delay if config else 0.5,
+@DB_INSERT_SECONDS.time()
+def _insert_new_results(db: Session, target_id: int, results: list[dict]) -> list[dict]:
+    """
+    Insert a target's results in one INSERT ... ON CONFLICT DO NOTHING statement
+    and return only the items that were actually new (for notifications).
+    """
+    unique: dict[str, dict] = {}
+    for item in results:
+        unique.setdefault(item['url'], item)
+    if not unique:
+        return []
+
+    now = datetime.utcnow()
+    rows = [
+        {**{field: item.get(field) for field in _RESULT_FIELDS},
+         "publication_date_iso": parse_date(item.get("publication_date_iso")),
+         "target_id": target_id, "scraped_at": now, "is_ignored": 0}
+        for item in unique.values()
+    ]
+    stmt = (
+        sqlite_insert(models.ScrapeResult)
+        .on_conflict_do_nothing(index_elements=["target_id", "url"])
+        .returning(models.ScrapeResult.url)
     )
+    inserted = {row.url for row in db.execute(stmt, rows)}
+    return [item for url, item in unique.items() if url in inserted]
+
+
+def backfill_publication_dates(db: Session, batch_size: int = 1000) -> dict:
+    """
+    Fill publication_date_iso for rows stored before the column existed (or
+    stored with a raw date that could not be parsed back then). Works through
+    the table in id order, one UPDATE batch per ``batch_size`` rows.
+    """
+    Result = models.ScrapeResult
+    updated = unparsed = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(Result.id, Result.publication_date)
+            .filter(Result.id > last_id, Result.publication_date_iso.is_(None),
+                    Result.publication_date.isnot(None), Result.publication_date.notin_(("", "Not found")))
+            .order_by(Result.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        changes = []
+        for row in rows:
+            parsed = parse_date(row.publication_date)
+            if parsed:
+                changes.append({"id": row.id, "publication_date_iso": parsed})
+            else:
+                unparsed += 1
+        if changes:
+            db.bulk_update_mappings(Result, changes)
+            db.commit()
+            updated += len(changes)
+    return {"updated": updated, "unparsed": unparsed}
+
+
+def _notify(new_items: list[dict], db: Session) -> None:
+    if not new_items:
+        return
+    try:
+        with NOTIFICATION_SECONDS.time():
+            send_notifications(new_items, db)
+    except Exception as e:
+        print(f"Error sending notifications: {e}")
+
+
+def _load_fingerprints(db: Session, target_id: int, keyword_version: str) -> FingerprintTracker:
+    """Build a fingerprint tracker from the hashes stored for a target."""
+    known = {
+        fp.url: (fp.content_hash, fp.keyword_version)
+        for fp in db.query(models.PageFingerprint).filter_by(target_id=target_id)
+    }
+    return FingerprintTracker(known, keyword_version)
+
+
+def _save_fingerprints(db: Session, target_id: int, fingerprints: FingerprintTracker) -> None:
+    """Upsert the hashes of all pages that were (re-)processed during this scrape."""
+    if not fingerprints.changed:
+        return
+    existing = {
+        fp.url: fp
+        for fp in db.query(models.PageFingerprint).filter(
+            models.PageFingerprint.target_id == target_id,
+            models.PageFingerprint.url.in_(list(fingerprints.changed)),
+        )
+    }
+    for url, digest in fingerprints.changed.items():
+        fp = existing.get(url)
+        if fp:
+            fp.content_hash = digest
+            fp.keyword_version = fingerprints.keyword_version
+        else:
+            db.add(models.PageFingerprint(
+                target_id=target_id, url=url, content_hash=digest,
+                keyword_version=fingerprints.keyword_version,
+            ))
+
+
+def _load_link_yields(db: Session, target_id: int) -> PatternYield:
+    """Build the URL-pattern yield counts stored for a target."""
+    return PatternYield({
+        row.pattern: (row.fetched or 0, row.matched or 0)
+        for row in db.query(models.UrlPatternYield).filter_by(target_id=target_id)
+    })
+
+
+def _save_link_yields(db: Session, target_id: int, yields: PatternYield) -> None:
+    """Upsert the counts of all URL patterns fetched during this scrape."""
+    if not yields.changed:
+        return
+    existing = {
+        row.pattern: row
+        for row in db.query(models.UrlPatternYield).filter(
+            models.UrlPatternYield.target_id == target_id,
+            models.UrlPatternYield.pattern.in_(list(yields.changed)),
+        )
+    }
+    for pattern in yields.changed:
+        fetched, matched = yields.known[pattern]
+        row = existing.get(pattern)
+        if row:
+            row.fetched, row.matched = fetched, matched
+        else:
+            db.add(models.UrlPatternYield(target_id=target_id, pattern=pattern, fetched=fetched, matched=matched))
+
+
+def _load_templates(db: Session, target: models.TargetSite) -> TemplateCache:
+    """Template cache primed with the selectors learned for the target's host."""
+    row = db.query(models.ExtractionTemplate).filter_by(host=host_of(target.url)).first()
+    return TemplateCache({row.host: ExtractionTemplate(row.title_selector, row.content_selector)} if row else {})
+
+
+def _save_templates(db: Session, templates: TemplateCache) -> None:
+    """Upsert learned templates and add this scrape's hit/miss counts."""
+    hosts = templates.changed | set(templates.hits) | set(templates.misses)
+    hosts &= set(templates.known)
+    if not hosts:
+        return
+    existing = {
+        row.host: row
+        for row in db.query(models.ExtractionTemplate).filter(models.ExtractionTemplate.host.in_(list(hosts)))
+    }
+    for host in hosts:
+        template = templates.known[host]
+        row = existing.get(host)
+        if row is None:
+            row = models.ExtractionTemplate(host=host, hits=0, misses=0)
+            db.add(row)
+        row.title_selector, row.content_selector = template
+        row.hits = (row.hits or 0) + templates.hits[host]
+        row.misses = (row.misses or 0) + templates.misses[host]
+
+
+def scrape_single_target(target: models.TargetSite, db: Session,
+                         ctx: Optional[ScrapeRunContext] = None,
+                         summary: Optional[_RunSummary] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         stats: Optional[TargetStats] = None,
+                         reprocess: bool = False) -> int:
+    """
+    Scrape a single target site using the Scraper class and return the number of new results.
+    Raises ScrapeCancelled (before anything is stored) once cancel_event is set.
+    With reprocess, pages are extracted even if their fingerprint is unchanged.
+    """
+    if ctx is None:
+        ctx = get_run_context(db)
+    # No keywords is not an error: the scrapers will refuse to run, but the
+    # timestamp is still updated.
+    keyword_list = ctx.keyword_list
+
+    engine = ctx.config.scraper_engine
+    server_url = ctx.config.crawl4ai_server_url
+    fallback_enabled = ctx.config.crawl4ai_fallback
+    scraper_kwargs = ctx.scraper_kwargs()
+    stats = stats or TargetStats()
 
     site_name = target.name or target.url
 
@@ -202,63 +773,78 @@ def scrape_single_target(target: models.TargetSite, db: Session) -> int:
         Scraper.log(f"Using engine: rss (feedparser)")
         try:
             results = fetch_feed(target.url, keyword_list, site_name)
+            stats.record_fetch(0)  # feedparser does not expose the response size
+            stats.main_page_fetched = True
             Scraper.log(f"  RSS: {len(results)} matching entries found.")
         except Exception as e:
             Scraper.log(f"  [RSS ERROR] {type(e).__name__}: {e}")
             results = []
-        # Skip to dedup/save below
-        new_count = 0
-        new_items = []
-        for item in results:
-            exists = db.query(models.ScrapeResult).filter_by(url=item['url'], target_id=target.id).first()
-            if not exists:
-                db_item = models.ScrapeResult(target_id=target.id, **item)
-                db.add(db_item)
-                new_count += 1
-                new_items.append(item)
-        if new_items:
-            try:
-                send_notifications(new_items, db)
-            except Exception as e:
-                print(f"Error sending notifications: {e}")
+            stats.record_error()
+        new_items = _insert_new_results(db, target.id, results)
+        new_count = len(new_items)
+        _notify(new_items, db)
+        _update_schedule_stats(target, new_count, stats, 1, int(bool(new_items)))
         target.last_scraped_at = datetime.utcnow()
         db.add(target)
         db.commit()
         return new_count
 
+    fingerprints = (FingerprintTracker({}, ctx.keyword_version) if reprocess
+                    else _load_fingerprints(db, target.id, ctx.keyword_version))
+    scraper_kwargs["fingerprints"] = fingerprints
+    link_yields = _load_link_yields(db, target.id)
+    scraper_kwargs["link_yields"] = link_yields
+    templates = _load_templates(db, target)
+    scraper_kwargs["templates"] = templates
+    scraper_kwargs["cancel_event"] = cancel_event
+    scraper_kwargs["stats"] = stats
+
     if engine == "crawl4ai":
         mode_label = f"remote ({server_url})" if server_url else "local"
         Scraper.log(f"Using engine: crawl4ai/{mode_label}")
         try:
-            scraper_instance = Crawl4AIScraper(**scraper_kwargs, server_url=server_url or None)
+            scraper_instance = Crawl4AIScraper(**scraper_kwargs, server_url=server_url or None,
+                                               session=ctx.session())
             results = scraper_instance.scrape_site(site_name, target.url)
+        except ScrapeCancelled:
+            raise
         except Exception as e:
             Scraper.log(f"  [CRAWL4AI ERROR] {type(e).__name__}: {e}")
             if fallback_enabled:
                 Scraper.log("  [FALLBACK] Switching to requests engine…")
-                results = Scraper(**scraper_kwargs).scrape_site(site_name, target.url)
+                # Results of the failed attempt are discarded, so start from the stored hashes again
+                fingerprints = (FingerprintTracker({}, ctx.keyword_version) if reprocess
+                                else _load_fingerprints(db, target.id, ctx.keyword_version))
+                scraper_kwargs["fingerprints"] = fingerprints
+                link_yields = _load_link_yields(db, target.id)
+                scraper_kwargs["link_yields"] = link_yields
+                templates = _load_templates(db, target)
+                scraper_kwargs["templates"] = templates
+                results = Scraper(**scraper_kwargs, session=ctx.session()).scrape_site(site_name, target.url)
             else:
                 Scraper.log("  [FALLBACK DISABLED] Returning empty result for this target.")
                 results = []
+    elif engine == "async":
+        Scraper.log("Using engine: async (httpx)")
+        results = AsyncScraper(**scraper_kwargs, max_concurrency=ctx.config.site_concurrency).scrape_site(
+            site_name, target.url)
     else:
         Scraper.log("Using engine: requests")
-        results = Scraper(**scraper_kwargs).scrape_site(site_name, target.url)
-
-    new_count = 0
-    new_items = []
-    for item in results:
-        exists = db.query(models.ScrapeResult).filter_by(url=item['url'], target_id=target.id).first()
-        if not exists:
-            db_item = models.ScrapeResult(target_id=target.id, **item)
-            db.add(db_item)
-            new_count += 1
-            new_items.append(item)
-    
-    if new_items:
-        try:
-            send_notifications(new_items, db)
-        except Exception as e:
-            print(f"Error sending notifications: {e}")
+        results = Scraper(**scraper_kwargs, session=ctx.session()).scrape_site(site_name, target.url)
+
+    new_items = _insert_new_results(db, target.id, results)
+    new_count = len(new_items)
+    _notify(new_items, db)
+
+    _save_fingerprints(db, target.id, fingerprints)
+    _save_link_yields(db, target.id, link_yields)
+    _save_templates(db, templates)
+    Scraper.log(f"  Pages processed: {fingerprints.pages_processed}, skipped (unchanged): {fingerprints.pages_skipped}")
+    if summary:
+        summary.add_pages(fingerprints.pages_processed, fingerprints.pages_skipped)
+    _update_schedule_stats(target, new_count, stats,
+                           fingerprints.pages_processed + fingerprints.pages_skipped,
+                           fingerprints.pages_processed)
 
     # Update the last_scraped_at timestamp for the target
     target.last_scraped_at = datetime.utcnow()
@@ -281,8 +867,7 @@ def trigger_scrape(
     - target_id: Optional filter for a specific target.
     - target_ids: Optional comma-separated list of target IDs.
     """
-    state = get_or_create_global_state(db)
-    if state.scrape_status == "running":
+    if scrape_control.running or scrape_queue.active_run(db):
         raise HTTPException(status_code=409, detail="A scrape is already in progress.")
     
     # Clear logs before starting
@@ -294,6 +879,78 @@ def trigger_scrape(
     return {"message": "Scrape started in background"}
 
 
+def profile_target(db: Session, target: models.TargetSite, mode: str = "cprofile", top: int = 25,
+                   cancel_event: Optional[threading.Event] = None, reprocess: bool = True) -> dict:
+    """
+    Scrape one target (results are stored as usual) under the profiler and
+    return the report with the hottest functions. The profile is kept in
+    PROFILE_DIR for closer inspection. By default unchanged pages are
+    extracted again, otherwise fingerprint skips hide the parsing cost.
+    """
+    stats = TargetStats()
+    name = f"target-{target.id}-{datetime.utcnow():%Y%m%d-%H%M%S-%f}"
+    Scraper.log(f"Profiling ({mode}) {target.name or target.url}...")
+    new_count, report = profile_call(
+        scrape_single_target, target, db, get_run_context(db), cancel_event=cancel_event, stats=stats,
+        reprocess=reprocess, mode=mode, output_path=os.path.join(PROFILE_DIR, name), top=top,
+    )
+    Scraper.log(f"Profile stored in {report.get('profile_file')} ({report['wall_seconds']}s).")
+    return {"target_id": target.id, "new_results": new_count, **stats.as_dict(), **report}
+
+
+@router.post("/targets/{target_id}/profile")
+def profile_target_scrape(target_id: int, mode: str = "cprofile", top: int = 25, reprocess: bool = True,
+                          db: Session = Depends(get_db)):
+    """
+    Scrape a single target under cProfile (mode=cprofile) or the stack sampler
+    (mode=sample) and return the top hotspots. Blocks until the scrape is done;
+    reprocess=false keeps the fingerprint skips of a normal run.
+    """
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    target = db.get(models.TargetSite, target_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="Target not found")
+    if scrape_queue.active_run(db) or not scrape_control.begin():
+        raise HTTPException(status_code=409, detail="A scrape is already in progress.")
+    try:
+        return profile_target(db, target, mode, top, scrape_control.cancel_event, reprocess)
+    except ScrapeCancelled:
+        raise HTTPException(status_code=409, detail="Profiling was cancelled.")
+    finally:
+        scrape_control.end()
+
+
+@router.post("/profile/extract")
+def profile_extraction(url: str, target_id: Optional[int] = None, mode: str = "cprofile",
+                       repeat: int = 20, top: int = 25, db: Session = Depends(get_db)):
+    """
+    Offline profile of the HTML extraction: runs extract_data_from_html_page
+    ``repeat`` times on the copy of ``url`` stored in the HTTP cache, without
+    any network access.
+    """
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    ctx = get_run_context(db)
+    cached = ctx.http_cache.get(url) if ctx.http_cache else None
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Page is not in the HTTP cache; scrape its target first")
+    body, encoding = cached
+    html = body.decode(encoding or "utf-8", errors="replace")
+    target = db.get(models.TargetSite, target_id) if target_id else None
+    source_name = (target.name or target.url) if target else urlparse(url).netloc
+
+    def extract_repeatedly():
+        items = []
+        for _ in range(max(1, repeat)):
+            items = extract_data_from_html_page(url, html, ctx.keyword_list, source_name)
+        return items
+
+    name = f"extract-{datetime.utcnow():%Y%m%d-%H%M%S-%f}"
+    items, report = profile_call(extract_repeatedly, mode=mode, output_path=os.path.join(PROFILE_DIR, name), top=top)
+    return {"url": url, "html_bytes": len(body), "repeat": max(1, repeat), "items": len(items), **report}
+
+
 @router.get("/crawl4ai/test")
 def test_crawl4ai_connection(server_url: str = ""):
     """Test connectivity to an external Crawl4AI server."""
@@ -369,22 +1026,46 @@ def scrape_target_endpoint(target_id: int, db: Session = Depends(get_db)):
     return {"target_id": target_id, "new_results": new_count, "timestamp": timestamp}
 
 
+_RESULT_SORTS = {
+    "scraped_at": models.ScrapeResult.scraped_at,
+    "publication_date": models.ScrapeResult.publication_date_iso,
+}
+
+
 @router.get("/results", response_model=List[schemas.ScrapeResult])
 def read_results(
     skip: int = 0,
     limit: int = 100,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    pub_from: Optional[date] = None,
+    pub_to: Optional[date] = None,
     target_id: Optional[int] = None,
     target_ids: Optional[str] = None,
     search: Optional[str] = None,
+    sort: str = "scraped_at",
+    order: str = "desc",
     db: Session = Depends(get_db),
 ):
+    """
+    - start_date / end_date: scrape time window
+    - pub_from / pub_to: publication date window (YYYY-MM-DD, inclusive); results
+      without a recognised publication date are left out when either is set
+    - sort: scraped_at | publication_date (undated results last); order: asc | desc
+    """
+    if sort not in _RESULT_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key. Use one of: {', '.join(_RESULT_SORTS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Unknown order. Use asc or desc")
     query = db.query(models.ScrapeResult).filter(models.ScrapeResult.is_ignored == 0)
     if start_date:
         query = query.filter(models.ScrapeResult.scraped_at >= start_date)
     if end_date:
         query = query.filter(models.ScrapeResult.scraped_at <= end_date)
+    if pub_from:
+        query = query.filter(models.ScrapeResult.publication_date_iso >= pub_from)
+    if pub_to:
+        query = query.filter(models.ScrapeResult.publication_date_iso <= pub_to)
     if target_id:
         query = query.filter(models.ScrapeResult.target_id == target_id)
     if target_ids:
@@ -397,14 +1078,22 @@ def read_results(
             models.ScrapeResult.title.ilike(like)
             | models.ScrapeResult.description.ilike(like)
         )
+    column = _RESULT_SORTS[sort]
+    column = column.asc() if order == "asc" else column.desc()
     return (
-        query.order_by(models.ScrapeResult.scraped_at.desc())
+        query.order_by(column.nulls_last(), models.ScrapeResult.id.desc())
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
+@router.post("/results/backfill-dates")
+def backfill_result_dates(db: Session = Depends(get_db)):
+    """Parse the stored publication dates of older results into publication_date_iso."""
+    return backfill_publication_dates(db)
+
+
 @router.post("/results/bulk-ignore")
 def bulk_ignore_results(result_ids: List[int], db: Session = Depends(get_db)):
     """Mark multiple results as ignored (deleted from UI but kept in DB to avoid re-scrape)."""
@@ -433,6 +1122,7 @@ def create_keyword(keyword: schemas.KeywordCreate, db: Session = Depends(get_db)
     db_keyword = models.Keyword(word=keyword.word, category_id=keyword.category_id)
     db.add(db_keyword)
     db.commit()
+    invalidate_run_context()
     db.refresh(db_keyword)
     return db_keyword
 
@@ -449,6 +1139,7 @@ def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Keyword not found")
     db.delete(keyword)
     db.commit()
+    invalidate_run_context()
     return {"message": f"Keyword {keyword_id} deleted"}
 
 
@@ -457,13 +1148,28 @@ def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_
     db_category = db.query(models.Category).filter(models.Category.name == category.name).first()
     if db_category:
         raise HTTPException(status_code=400, detail="Category already exists")
-    db_category = models.Category(name=category.name)
+    db_category = models.Category(name=category.name, weight=category.weight)
     db.add(db_category)
     db.commit()
+    invalidate_run_context()
     db.refresh(db_category)
     return db_category
 
 
+@router.post("/categories/{category_id}", response_model=schemas.Category)
+def update_category(category_id: int, category_in: schemas.CategoryCreate, db: Session = Depends(get_db)):
+    """Rename a category or change its weight (link priority of its keywords)."""
+    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    category.name = category_in.name
+    category.weight = category_in.weight
+    db.commit()
+    invalidate_run_context()
+    db.refresh(category)
+    return category
+
+
 @router.get("/categories", response_model=List[schemas.Category])
 def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(models.Category).offset(skip).limit(limit).all()
@@ -476,6 +1182,7 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Category not found")
     db.delete(category)
     db.commit()
+    invalidate_run_context()
     return {"message": f"Category {category_id} deleted"}
 
 
@@ -572,6 +1279,7 @@ def get_scraping_config(db: Session = Depends(get_db)):
         config = models.ScrapingConfig()
         db.add(config)
         db.commit()
+        invalidate_run_context()
         db.refresh(config)
     return config
 
@@ -586,6 +1294,7 @@ def update_scraping_config(config_in: schemas.ScrapingConfigCreate, db: Session
         for var, value in config_in.dict().items():
             setattr(config, var, value)
     db.commit()
+    invalidate_run_context()
     db.refresh(config)
     return config
 
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -37,6 +37,9 @@ class TargetSite(TargetSiteBase):
     longitude: Optional[float] = None
     added_at: datetime
     last_scraped_at: Optional[datetime] = None
+    yield_score: Optional[float] = None
+    change_score: Optional[float] = None
+    failure_count: Optional[int] = 0
     region: Optional[Region] = None
 
     class Config:
@@ -57,10 +60,71 @@ class GlobalState(GlobalStateBase):
         from_attributes = True
 
 
+class ScrapeProgress(BaseModel):
+    done: int
+    total: int
+
+
+class ScrapeLogPage(BaseModel):
+    lines: List[str]
+    last_seq: int           # pass as ?since= on the next poll
+    truncated: bool = False  # lines after ?since= were already dropped from the buffer
+    progress: Optional[ScrapeProgress] = None  # latest progress event among the lines
+
+
+class ExtractionTemplateStats(BaseModel):
+    """Hosts sharing one learned selector pair (in practice: one CMS template) and its hit rate."""
+    title_selector: str
+    content_selector: str
+    hosts: int
+    hits: int = 0
+    misses: int = 0
+    hit_rate: Optional[float] = None
+
+
+class ScrapeRunSummary(BaseModel):
+    id: int
+    status: str
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total_targets: int
+    targets_done: int = 0
+    targets_failed: int = 0
+    targets_open: int = 0
+    new_results: int = 0
+    wall_seconds: float = 0.0
+    fetch_count: int = 0
+    bytes_downloaded: int = 0
+    pdf_seconds: float = 0.0
+    extraction_seconds: float = 0.0
+    error_count: int = 0
+
+
+class ScrapeRunTarget(BaseModel):
+    target_id: int
+    target_name: Optional[str] = None
+    target_url: str
+    status: str
+    position: int
+    lease_owner: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    wall_seconds: Optional[float] = None
+    fetch_count: int = 0
+    bytes_downloaded: int = 0
+    cache_hits: int = 0
+    pdf_seconds: float = 0.0
+    extraction_seconds: float = 0.0
+    new_results: int = 0
+    error_count: int = 0
+    error: Optional[str] = None
+
+
 class ScrapeResultBase(BaseModel):
     title: str
     description: str
     publication_date: str
+    publication_date_iso: Optional[date] = None
     url: str
     source: str
     type: str
@@ -86,6 +150,7 @@ class TargetWithResults(TargetSite):
 
 class CategoryBase(BaseModel):
     name: str
+    weight: float = 1.0  # link priority of this category's keywords in the crawl frontier
 
 
 class CategoryCreate(CategoryBase):
@@ -139,10 +204,22 @@ class ScrapingConfigBase(BaseModel):
     max_html_links: int = 15
     max_pdf_links: int = 10
     request_delay: float = 0.5
-    scraper_engine: str = "requests"  # "requests" | "crawl4ai"
+    scraper_engine: str = "requests"  # "requests" | "crawl4ai" | "async"
     crawl4ai_server_url: Optional[str] = None  # e.g. "http://192.168.1.100:11235"
     crawl4ai_fallback: bool = True             # fall back to requests on crawl4ai failure
     max_targets_per_run: int = 500            # 0 = unlimited
+    scrape_concurrency: int = 4               # parallel target workers per run
+    site_concurrency: int = 5                 # async engine: parallel requests per site
+    http_cache_enabled: bool = True           # revalidate pages/PDFs with ETag / Last-Modified
+    http_cache_max_mb: int = 500              # LRU size bound of the on-disk HTTP cache
+    embedded_workers: bool = True             # scrape queued runs inside the API process
+    max_pdf_mb: int = 25                      # larger PDFs are skipped (Content-Length / streamed size)
+    max_pdf_pages: int = 100                  # pages read per PDF (text and OCR)
+    ocr_workers: int = 2                      # processes OCR'ing pages of scanned PDFs in parallel
+    ocr_dpi: int = 200                        # render resolution for OCR
+    ocr_max_pages: int = 20                   # pages OCR'd per scanned PDF
+    hub_depth: int = 2                        # levels of hub pages followed below the start page (0 = none)
+    external_host_budget: int = 3             # fetches per foreign host and target (0 = unlimited)
 
 
 class ScrapingConfigCreate(ScrapingConfigBase):
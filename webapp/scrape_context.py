@@ -0,0 +1,236 @@
+"""
+Run-scoped scrape context.
+
+Everything a target scrape needs that does not depend on the target itself —
+the keyword list and its version, a snapshot of the ScrapingConfig, the HTTP
+sessions, the per-host rate limiter and the HTTP cache — is built once and
+shared by all targets (and worker threads) of a run. Building it also applies
+the OCR settings to the process-wide OCR pool and cache.
+
+The context is rebuilt for every new run (so standalone workers pick up keyword
+and config changes made through the API) and after ``invalidate_run_context``,
+which the keyword, category and config endpoints call on every change. The
+rate limiter and the HTTP cache are process-wide and survive rebuilds: targets
+still running on the old context and those starting on the new one share one
+budget per host, and a host's learned backoff is kept.
+
+``scrape_control`` is the in-process status/cancellation signal of the
+background run: ``/scrape/stop`` sets its event and the scrapers notice it
+before their next fetch, without any DB polling.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import requests
+from sqlalchemy.orm import Session
+
+from . import models
+from scraper_lib.rate_limiter import HostRateLimiter
+from scraper_lib.http_cache import HttpCache
+from scraper_lib.fingerprint import keyword_set_version
+from scraper_lib.ocr import OcrSettings, configure_ocr
+
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join("output_data", "http_cache"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join("output_data", "profiles"))
+OCR_CACHE_DIR = os.environ.get("OCR_CACHE_DIR", os.path.join("output_data", "ocr_cache"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Plain copy of the ScrapingConfig row (defaults when none exists yet)."""
+    max_html_links: int = 15
+    max_pdf_links: int = 10
+    request_delay: float = 0.5
+    scraper_engine: str = "requests"
+    crawl4ai_server_url: str = ""
+    crawl4ai_fallback: bool = True
+    max_targets_per_run: int = 500
+    scrape_concurrency: int = 4
+    site_concurrency: int = 5
+    http_cache_enabled: bool = True
+    http_cache_max_mb: int = 500
+    embedded_workers: bool = True
+    max_pdf_mb: int = 25
+    max_pdf_pages: int = 100
+    ocr_workers: int = 2
+    ocr_dpi: int = 200
+    ocr_max_pages: int = 20
+    hub_depth: int = 2
+    external_host_budget: int = 3
+
+    @classmethod
+    def from_model(cls, config: Optional[models.ScrapingConfig]) -> "ConfigSnapshot":
+        if config is None:
+            return cls()
+        defaults = cls()
+        return cls(
+            max_html_links=config.max_html_links if config.max_html_links is not None else defaults.max_html_links,
+            max_pdf_links=config.max_pdf_links if config.max_pdf_links is not None else defaults.max_pdf_links,
+            request_delay=config.request_delay if config.request_delay is not None else defaults.request_delay,
+            scraper_engine=config.scraper_engine or defaults.scraper_engine,
+            crawl4ai_server_url=(config.crawl4ai_server_url or "").strip(),
+            crawl4ai_fallback=bool(config.crawl4ai_fallback) if config.crawl4ai_fallback is not None else True,
+            max_targets_per_run=config.max_targets_per_run or 0,
+            scrape_concurrency=config.scrape_concurrency or defaults.scrape_concurrency,
+            site_concurrency=config.site_concurrency or defaults.site_concurrency,
+            http_cache_enabled=bool(config.http_cache_enabled) if config.http_cache_enabled is not None else True,
+            http_cache_max_mb=config.http_cache_max_mb or defaults.http_cache_max_mb,
+            embedded_workers=bool(config.embedded_workers) if config.embedded_workers is not None else True,
+            max_pdf_mb=config.max_pdf_mb or defaults.max_pdf_mb,
+            max_pdf_pages=config.max_pdf_pages or defaults.max_pdf_pages,
+            ocr_workers=config.ocr_workers or defaults.ocr_workers,
+            ocr_dpi=config.ocr_dpi or defaults.ocr_dpi,
+            ocr_max_pages=config.ocr_max_pages or defaults.ocr_max_pages,
+            hub_depth=config.hub_depth if config.hub_depth is not None else defaults.hub_depth,
+            external_host_budget=(config.external_host_budget if config.external_host_budget is not None
+                                  else defaults.external_host_budget),
+        )
+
+
+@dataclass
+class ScrapeRunContext:
+    """Shared, read-only inputs of a scrape run plus the per-thread HTTP sessions."""
+    keyword_list: list[dict]
+    keyword_strings: list[str]
+    keyword_version: str
+    config: ConfigSnapshot
+    rate_limiter: HostRateLimiter
+    http_cache: Optional[HttpCache]
+    _sessions: threading.local = field(default_factory=threading.local, repr=False)
+
+    def session(self) -> requests.Session:
+        """HTTP session of the calling thread; reused for every target that thread scrapes."""
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            self._sessions.session = session
+        return session
+
+    def scraper_kwargs(self) -> dict:
+        """Constructor arguments shared by all scraper engines."""
+        return dict(
+            keywords=self.keyword_list,
+            max_html_links=self.config.max_html_links,
+            max_pdf_links=self.config.max_pdf_links,
+            delay=self.config.request_delay,
+            rate_limiter=self.rate_limiter,
+            http_cache=self.http_cache,
+            max_pdf_bytes=self.config.max_pdf_mb * 1024 * 1024,
+            max_pdf_pages=self.config.max_pdf_pages,
+            hub_depth=self.config.hub_depth,
+            max_per_external_host=self.config.external_host_budget or None,
+        )
+
+
+_context: Optional[ScrapeRunContext] = None
+_context_run_id: Optional[int] = None
+_http_cache: Optional[HttpCache] = None
+_rate_limiter: Optional[HostRateLimiter] = None
+_lock = threading.Lock()
+
+
+def _get_http_cache(config: ConfigSnapshot) -> Optional[HttpCache]:
+    """The process-wide HTTP cache (one SQLite index per directory), or None if disabled."""
+    global _http_cache
+    if not config.http_cache_enabled:
+        return None
+    if _http_cache is None:
+        _http_cache = HttpCache(HTTP_CACHE_DIR)
+    _http_cache.max_bytes = config.http_cache_max_mb * 1024 * 1024
+    return _http_cache
+
+
+def _get_rate_limiter(config: ConfigSnapshot) -> HostRateLimiter:
+    """The process-wide rate limiter; a changed request delay applies to hosts not seen yet."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = HostRateLimiter(start_delay=config.request_delay)
+    _rate_limiter.start_delay = max(config.request_delay, _rate_limiter.min_delay)
+    return _rate_limiter
+
+
+def build_run_context(db: Session) -> ScrapeRunContext:
+    """Load keywords and config from the DB and assemble a fresh context around the shared limiter and cache."""
+    keywords = db.query(models.Keyword).all()
+    weights = {c.id: c.weight for c in db.query(models.Category)}
+    keyword_list = [{"word": k.word, "category_id": k.category_id,
+                     "weight": weights.get(k.category_id) or 1.0} for k in keywords]
+    config = ConfigSnapshot.from_model(db.query(models.ScrapingConfig).first())
+    configure_ocr(OcrSettings(workers=config.ocr_workers, dpi=config.ocr_dpi,
+                              max_pages=config.ocr_max_pages, cache_dir=OCR_CACHE_DIR))
+    return ScrapeRunContext(
+        keyword_list=keyword_list,
+        keyword_strings=[k["word"].lower() for k in keyword_list],
+        keyword_version=keyword_set_version(keyword_list),
+        config=config,
+        rate_limiter=_get_rate_limiter(config),
+        http_cache=_get_http_cache(config),
+    )
+
+
+def get_run_context(db: Session, run_id: Optional[int] = None) -> ScrapeRunContext:
+    """
+    Return the cached context, building it on first use, after an invalidation
+    or when a different run asks for it (run_id None accepts any cached context).
+    """
+    global _context, _context_run_id
+    with _lock:
+        if _context is None or (run_id is not None and run_id != _context_run_id):
+            _context = build_run_context(db)
+            _context_run_id = run_id
+        return _context
+
+
+def invalidate_run_context() -> None:
+    """Drop the cached context; the next scrape rebuilds it from the DB."""
+    global _context
+    with _lock:
+        _context = None
+
+
+class ScrapeControl:
+    """Running flag and cancel event of the background scrape in this process."""
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self._running = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def begin(self) -> bool:
+        """Mark a run as started; False if one is already running."""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            self.cancel_event.clear()
+            return True
+
+    def end(self) -> None:
+        with self._lock:
+            self._running = False
+            self.cancel_event.clear()
+
+    def request_cancel(self) -> bool:
+        """Signal the running scrape to stop; False if nothing is running."""
+        with self._lock:
+            if not self._running:
+                return False
+            self.cancel_event.set()
+            return True
+
+
+scrape_control = ScrapeControl()
@@ -0,0 +1,260 @@
+"""
+DB-backed scrape queue with leases.
+
+A run is a ScrapeRun plus one ScrapeRunItem per target. Workers — threads in
+the API process and/or ``python -m scraper_worker`` processes — claim pending
+items one at a time. A claim is a lease: the item is marked "leased" with an
+owner and an expiry that the worker keeps renewing while it scrapes. If a
+worker dies, its lease runs out and another worker picks the item up again.
+
+All state changes are single UPDATE statements, so concurrent workers never
+claim the same item. The last worker to finish an item of a run marks the run
+completed.
+"""
+
+from __future__ import annotations
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# A lease survives a worker missing a few heartbeats, but not a crash
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 10
+
+_OPEN_STATUSES = ("pending", "leased")
+
+
+def worker_id(label: str) -> str:
+    """Unique lease owner name of one worker thread."""
+    return f"{socket.gethostname()}:{os.getpid()}:{label}"
+
+
+def _set_global_status(db: Session, status: str) -> None:
+    state = db.query(models.GlobalState).filter_by(key="global_scrape_status").first()
+    if not state:
+        state = models.GlobalState(key="global_scrape_status")
+        db.add(state)
+    state.scrape_status = status
+    if status == "running":
+        state.last_scrape_start = datetime.utcnow()
+    else:
+        state.last_scrape_end = datetime.utcnow()
+
+
+def active_run(db: Session) -> Optional[models.ScrapeRun]:
+    """
+    The running run, if any. A run that no worker has touched for
+    ``LEASE_SECONDS`` (no live lease, no claim, no finish) is marked
+    interrupted here, so it cannot block new runs until the next restart.
+    """
+    now = datetime.utcnow()
+    for run in db.query(models.ScrapeRun).filter_by(status="running").all():
+        if not _is_abandoned(db, run, now, grace=True):
+            return run
+        _mark_interrupted(db, run)
+        _set_global_status(db, "idle")
+        db.commit()
+    return None
+
+
+def enqueue_run(db: Session, target_ids: list[int]) -> models.ScrapeRun:
+    """Create a running ScrapeRun with one pending item per target, in the given order."""
+    run = models.ScrapeRun(status="running", total_targets=len(target_ids))
+    db.add(run)
+    db.flush()
+    db.add_all(
+        models.ScrapeRunItem(run_id=run.id, target_id=tid, position=pos)
+        for pos, tid in enumerate(target_ids)
+    )
+    _set_global_status(db, "running")
+    db.commit()
+    return run
+
+
+def resume_run(db: Session, run_id: int) -> int:
+    """Reopen a run for the workers; returns the number of targets still to do."""
+    run = db.get(models.ScrapeRun, run_id)
+    run.status = "running"
+    run.finished_at = None
+    _set_global_status(db, "running")
+    db.commit()
+    return db.query(models.ScrapeRunItem).filter(
+        models.ScrapeRunItem.run_id == run_id,
+        models.ScrapeRunItem.status.in_(_OPEN_STATUSES),
+    ).count()
+
+
+def cancel_runs(db: Session) -> int:
+    """Mark all running runs cancelled; workers notice it on their next heartbeat."""
+    count = db.query(models.ScrapeRun).filter_by(status="running").update(
+        {"status": "cancelled", "finished_at": datetime.utcnow()}
+    )
+    if count:
+        _set_global_status(db, "idle")
+    db.commit()
+    return count
+
+
+def claim_item(db: Session, owner: str) -> Optional[tuple[int, int, int]]:
+    """
+    Lease the next pending (or abandoned) item of a running run.
+    Returns (item_id, run_id, target_id), or None if there is nothing to do.
+    """
+    now = datetime.utcnow()
+    Item = models.ScrapeRunItem
+    next_item = (
+        select(Item.id)
+        .join(models.ScrapeRun, models.ScrapeRun.id == Item.run_id)
+        .where(
+            models.ScrapeRun.status == "running",
+            or_(Item.status == "pending", (Item.status == "leased") & (Item.lease_expires_at < now)),
+        )
+        .order_by(Item.run_id, Item.position)
+        .limit(1)
+        .scalar_subquery()
+    )
+    # The subquery is re-checked in the same statement, so two workers can never
+    # win the same row: the loser's UPDATE simply matches nothing.
+    row = db.execute(
+        update(Item)
+        .where(Item.id == next_item)
+        .values(status="leased", lease_owner=owner, started_at=now,
+                lease_expires_at=now + timedelta(seconds=LEASE_SECONDS))
+        .returning(Item.id, Item.run_id, Item.target_id)
+    ).first()
+    db.commit()
+    return tuple(row) if row else None
+
+
+def renew_lease(db: Session, item_id: int, owner: str) -> bool:
+    """Extend a lease; False if it was lost or the run is no longer running."""
+    Item = models.ScrapeRunItem
+    renewed = db.query(Item).filter(Item.id == item_id, Item.lease_owner == owner, Item.status == "leased").update(
+        {"lease_expires_at": datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)}
+    )
+    db.commit()
+    if not renewed:
+        return False
+    run_status = db.query(models.ScrapeRun.status).join(Item, Item.run_id == models.ScrapeRun.id).filter(
+        Item.id == item_id
+    ).scalar()
+    return run_status == "running"
+
+
+def release_item(db: Session, item_id: int, owner: str) -> None:
+    """Hand an unfinished item back to the queue (cancelled or shut down)."""
+    db.query(models.ScrapeRunItem).filter_by(id=item_id, lease_owner=owner).update(
+        {"status": "pending", "lease_owner": None, "lease_expires_at": None}
+    )
+    db.commit()
+
+
+def finish_item(db: Session, item_id: int, owner: str, status: str, new_results: int = 0,
+                metrics: Optional[dict] = None) -> tuple[int, int]:
+    """
+    Record the outcome of an item ("done" or "failed") and its cost metrics, and
+    complete its run if nothing is left. Returns the run's (finished, total) item counts.
+    The outcome is dropped if ``owner`` no longer holds the item's lease.
+    """
+    Item = models.ScrapeRunItem
+    # Only the current lease holder may finish the item; a worker whose lease
+    # expired and was claimed by another one drops its outcome
+    values = {"status": status, "new_results": new_results, "finished_at": datetime.utcnow(),
+              "lease_expires_at": None}  # lease_owner stays as a record of who scraped it
+    values.update(metrics or {})
+    finished = db.query(Item).filter(Item.id == item_id, Item.lease_owner == owner, Item.status == "leased").update(
+        values
+    )
+    db.commit()
+
+    run = db.query(models.ScrapeRun).join(Item, Item.run_id == models.ScrapeRun.id).filter(
+        Item.id == item_id
+    ).one()
+    if not finished:
+        print(f"Lost the lease on scrape run item {item_id}; its outcome was dropped")
+    open_items = db.query(models.ScrapeRunItem).filter(
+        models.ScrapeRunItem.run_id == run.id,
+        models.ScrapeRunItem.status.in_(_OPEN_STATUSES),
+    ).count()
+    if open_items == 0:
+        completed = db.query(models.ScrapeRun).filter_by(id=run.id, status="running").update(
+            {"status": "completed", "finished_at": datetime.utcnow()}
+        )
+        if completed:
+            _set_global_status(db, "idle")
+        db.commit()
+    return run.total_targets - open_items, run.total_targets
+
+
+def _owner_is_dead(owner: str) -> bool:
+    """True for leases of a process on this host that no longer exists (or whose pid we now have)."""
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # exists, but owned by another user
+    return False
+
+
+def _is_abandoned(db: Session, run: models.ScrapeRun, now: datetime, grace: bool = False) -> bool:
+    """
+    True if no worker is left on a running run: no unexpired lease of a live
+    owner and no item finished within ``LEASE_SECONDS``. Owners on other hosts
+    cannot be checked and count as alive while their lease or finish is recent.
+    With ``grace``, a run (or claim) younger than ``LEASE_SECONDS`` is never
+    abandoned: its workers may not have claimed anything yet.
+    """
+    Item = models.ScrapeRunItem
+    since = now - timedelta(seconds=LEASE_SECONDS)
+    if grace and run.started_at and run.started_at > since:
+        return False
+    leased = db.query(Item).filter(Item.run_id == run.id, Item.status == "leased").all()
+    if any(i.lease_expires_at and i.lease_expires_at > now and not _owner_is_dead(i.lease_owner or "")
+           for i in leased):
+        return False
+    if grace and any(i.started_at and i.started_at > since for i in leased):
+        return False
+    # A worker between two items holds no lease; a recent finish still shows it is alive
+    recent = db.query(Item).filter(Item.run_id == run.id, Item.finished_at > since).all()
+    return not any(not _owner_is_dead(i.lease_owner or "") for i in recent)
+
+
+def _mark_interrupted(db: Session, run: models.ScrapeRun) -> None:
+    run.status = "interrupted"
+    db.query(models.ScrapeRunItem).filter_by(run_id=run.id, status="leased").update(
+        {"status": "pending", "lease_owner": None, "lease_expires_at": None}
+    )
+    print(f"Scrape run #{run.id} was interrupted; resume it via POST /api/scrape/runs/{run.id}/resume")
+
+
+def recover_interrupted_runs(db: Session) -> None:
+    """
+    Runs still marked "running" without a single live lease were cut off by a
+    restart and have no worker left: mark them resumable and unblock the global
+    status. Runs that external workers are still processing are left alone;
+    should those turn out to be gone as well, ``active_run`` notices once their
+    leases have run out.
+    """
+    now = datetime.utcnow()
+    for run in db.query(models.ScrapeRun).filter_by(status="running").all():
+        if _is_abandoned(db, run, now):
+            _mark_interrupted(db, run)
+    db.flush()
+    if active_run(db) is None:
+        state = db.query(models.GlobalState).filter_by(key="global_scrape_status").first()
+        if state and state.scrape_status == "running":
+            state.scrape_status = "idle"
+    db.commit()